@@ -0,0 +1,94 @@
+"""Peak memory of parsing large pages through the DOM vs the streaming table parser.
+
+    python -m benchmarks.memory solutions --rows 2000
+    python -m benchmarks.memory contests --rows 500 1000 2000
+
+Each page is generated locally with the layout of `/status/{problem}` or `/contests`, then parsed
+once with `resp.html` + `html_to_list` and once with `stream_tables`; tracemalloc reports the peak
+allocated while parsing.
+"""
+import argparse
+import time
+import tracemalloc
+
+from requests_html import HTML
+
+from codechefcli.helpers import BufferedResponse, html_to_list, print_table, stream_tables
+
+BENCHMARK_TABLE_HEADINGS = ['PAGE', 'ROWS', 'PARSER', 'PAGE BYTES', 'PEAK BYTES', 'SECONDS']
+
+
+def get_table(num_rows, num_cols, prefix):
+    rows = ['<tr>' + ''.join(f'<th>{prefix} {col}</th>' for col in range(num_cols)) + '</tr>']
+    for row in range(num_rows):
+        rows.append(
+            '<tr>' + ''.join(f'<td><span>{prefix}{row}-{col}</span></td>'
+                             for col in range(num_cols)) + '</tr>')
+    return f"<table>{''.join(rows)}</table>"
+
+
+def get_solutions_page(num_rows):
+    return (
+        '<html><body><table><tr><td>filters</td></tr></table>'
+        '<table><tr><td>problem</td></tr></table>'
+        f"{get_table(num_rows, 8, 'S')}<div class='pageinfo'>1 of 100</div></body></html>"
+    ).encode('utf-8')
+
+
+def get_contests_page(num_rows):
+    return (
+        f"<html><body><table></table>{get_table(10, 4, 'P')}{get_table(10, 4, 'F')}"
+        f"{get_table(num_rows, 4, 'C')}</body></html>"
+    ).encode('utf-8')
+
+
+PAGES = {
+    'solutions': (get_solutions_page, 2),
+    'contests': (get_contests_page, -1),
+}
+
+
+def parse_dom(content, index):
+    return html_to_list(HTML(html=content).find('table')[index])
+
+
+def parse_stream(content, index):
+    tables = {}
+    for table_index, data_rows in stream_tables(BufferedResponse(content)):
+        tables[table_index] = tables[-1] = data_rows
+    return tables[index]
+
+
+def measure(parse, content, index):
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        data_rows = parse(content, index)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return data_rows, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('page', choices=PAGES.keys())
+    parser.add_argument('--rows', type=int, nargs='+', default=[500, 2000])
+    args = parser.parse_args()
+
+    get_page, index = PAGES[args.page]
+    data_rows = [BENCHMARK_TABLE_HEADINGS]
+    for num_rows in args.rows:
+        content = get_page(num_rows)
+        for name, parse in [('dom', parse_dom), ('stream', parse_stream)]:
+            table, peak, elapsed = measure(parse, content, index)
+            data_rows.append([
+                args.page, str(len(table) - 1), name, str(len(content)), str(peak),
+                f'{elapsed:.2f}'
+            ])
+    print_table(data_rows, is_pager=False)
+
+
+if __name__ == '__main__':
+    main()
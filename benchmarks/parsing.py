@@ -0,0 +1,60 @@
+"""Parsing throughput of bulk solutions pages on worker threads vs the parse pool.
+
+    python -m benchmarks.parsing --pages 64 --rows 500
+    python -m benchmarks.parsing --pages 64 --rows 500 --processes 2 4 8
+
+Every page is generated locally with the layout of `/status/{problem}` and handed as raw bytes to
+`--workers` threads, the way fetched pages are; they parse it themselves (`threads`) or through
+`parse_content` with a pool of worker processes (`pool`).
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.memory import get_solutions_page
+from codechefcli.helpers import DEFAULT_NUM_WORKERS, print_table
+from codechefcli.parse_pool import (get_default_num_processes, parse_content,
+                                    shutdown_parse_pool, start_parse_pool)
+from codechefcli.problems import parse_solutions_content
+
+BENCHMARK_TABLE_HEADINGS = ['PARSER', 'PROCESSES', 'PAGES', 'ROWS', 'SECONDS', 'PAGES/S']
+
+
+def parse_pages(pages, num_workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        results = list(executor.map(
+            lambda content: parse_content(parse_solutions_content, content), pages))
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=64)
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--processes', type=int, nargs='+', default=[get_default_num_processes()])
+    parser.add_argument('--workers', type=int, default=DEFAULT_NUM_WORKERS)
+    args = parser.parse_args()
+
+    pages = [get_solutions_page(args.rows)] * args.pages
+    runs = [('threads', 1, None)] + [('pool', num, num) for num in args.processes]
+    data_rows = [BENCHMARK_TABLE_HEADINGS]
+    for name, num_processes, pool_size in runs:
+        if pool_size:
+            start_parse_pool(pool_size)
+            # the workers are spawned on demand; warm them up outside the timing
+            parse_pages(pages[:pool_size], pool_size)
+        try:
+            results, elapsed = parse_pages(pages, args.workers)
+        finally:
+            shutdown_parse_pool()
+        num_rows = sum(len(data_rows) - 1 for data_rows, _ in results)
+        data_rows.append([
+            name, str(num_processes), str(len(results)), str(num_rows), f'{elapsed:.2f}',
+            f'{len(results) / elapsed:.1f}'
+        ])
+    print_table(data_rows, is_pager=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Fetch throughput of the default HTTP/1.1 session vs the HTTP/2 transport.
+
+    python -m benchmarks.transports descriptions codes.txt --workers 16
+    python -m benchmarks.transports solutions codes.txt
+    python -m benchmarks.transports profiles usernames.txt
+
+Each transport fetches every name once, with the same number of workers; the table shows
+wall time, requests per second and bytes on the wire.
+"""
+import argparse
+import time
+
+from codechefcli.helpers import (DEFAULT_NUM_WORKERS, SessionTransport, print_table, read_names,
+                                 run_concurrently, set_transport)
+from codechefcli.http2 import HTTP2_MISSING_MSG, Http2Transport, is_http2_available
+from codechefcli.problems import get_problem_json, get_solutions_page
+from codechefcli.stats import REQUEST_STATS, enable_stats, reset_stats
+from codechefcli.users import get_user_record
+
+FETCHERS = {
+    'descriptions': get_problem_json,
+    'solutions': lambda code: get_solutions_page(code, {}),
+    'profiles': get_user_record,
+}
+BENCHMARK_TABLE_HEADINGS = ['TRANSPORT', 'REQUESTS', 'SECONDS', 'REQ/S', 'WIRE BYTES']
+
+
+def run_benchmark(name, transport, fetch, names, num_workers):
+    previous = set_transport(transport)
+    reset_stats()
+    enable_stats()
+    try:
+        start = time.perf_counter()
+        run_concurrently(fetch, names, num_workers=num_workers)
+        elapsed = time.perf_counter() - start
+    finally:
+        set_transport(previous)
+
+    num_requests = len(REQUEST_STATS)
+    return [
+        name, str(num_requests), f'{elapsed:.2f}', f'{num_requests / elapsed:.1f}',
+        str(sum(stat['wire_bytes'] for stat in REQUEST_STATS))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('kind', choices=FETCHERS.keys())
+    parser.add_argument('names', help='File with one problem code / username per line.')
+    parser.add_argument('--workers', type=int, default=DEFAULT_NUM_WORKERS)
+    args = parser.parse_args()
+
+    names = read_names(args.names)
+    fetch = FETCHERS[args.kind]
+    data_rows = [BENCHMARK_TABLE_HEADINGS]
+    data_rows.append(
+        run_benchmark('HTTP/1.1', SessionTransport(), fetch, names, args.workers))
+
+    if is_http2_available():
+        transport = Http2Transport()
+        try:
+            data_rows.append(run_benchmark('HTTP/2', transport, fetch, names, args.workers))
+        finally:
+            transport.close()
+    else:
+        print(HTTP2_MISSING_MSG)
+    print_table(data_rows, is_pager=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,8 @@
 import argparse
+import io
 import sys
+import time
+from contextlib import redirect_stderr, redirect_stdout
 import bs4
 from bs4 import BeautifulSoup
 
@@ -7,19 +10,40 @@ from rich.console import Console
 from rich.style import Style
 from rich.theme import Theme
 
+from codechefcli.archive import query_archive, sync_archive
 from codechefcli.auth import login, logout
-from codechefcli.helpers import print_response
-from problems import (RESULT_CODES, get_contest_problems, get_contests, get_description,
-                                  get_ratings, get_solution, get_solutions, get_tags,
-                                  search_problems, submit_problem)
-from codechefcli.teams import get_team
-from codechefcli.users import get_user
+from codechefcli.batch import read_commands, run_batch
+from codechefcli.cache import get_cached, set_cached
+from codechefcli.contests import parse_duration
+from codechefcli.crawl import CRAWL_KINDS, list_crawls, resume_crawl, start_crawl
+from codechefcli.helpers import DEFAULT_NUM_WORKERS, NetworkError, print_response, style_text
+from codechefcli.http2 import HTTP2_MISSING_MSG, use_http2
+from codechefcli.judge import judge_problem
+from codechefcli.metrics import (enable_metrics, inc, observe, parse_address, send_statsd,
+                                 write_prometheus)
+from codechefcli.parse_pool import is_parse_pool_running, shutdown_parse_pool, start_parse_pool
+from codechefcli.prefetch import PREFETCH_DEFAULT_PAGES, PREFETCH_MAX_PAGES, start_prefetch
+from codechefcli.problems import (CC_PRACTICE, CONTEST_RANGE_MAX_SIZE, RESULT_CODES, SEARCH_TYPES,
+                                  get_contest_problems, get_contest_range, get_contests,
+                                  get_contests_problems, get_description, get_ratings,
+                                  get_solution, get_solutions, get_tags, search_problems,
+                                  submit_problem)
+from codechefcli.ratings_history import get_ratings_delta, list_snapshots, take_snapshot
+from codechefcli.solution_stats import get_solutions_stats
+from codechefcli.statements import get_changed_statements
+from codechefcli.stats import (enable_stats, get_current_stats, get_stats_scopes, get_stats_table,
+                               stats_scope, write_stats_log)
+from codechefcli.tag_index import is_tag_expression, query_tags
+from codechefcli.teams import get_indexed_teams, get_team, get_teams
+from codechefcli.users import get_user, get_users
+from codechefcli.watch import (CONTEST_PROBLEMS_KEY, RATINGS_KEY, SOLUTIONS_KEY, parse_interval,
+                               watch)
 
 GENERIC_RESP = {"code": 500, "data": "Unexpected stuff is happening here"}
-CC_PRACTICE = "PRACTICE"
-SEARCH_TYPES = ['school', 'easy', 'medium', 'hard', 'challenge', 'extcontest']
 INSTITUTION_TYPES = ['School', 'Organization', 'College']
 INVALID_USERNAME = '##no_login##'
+PROBLEMS_CACHE_NAMESPACE = 'problems'
+PROBLEMS_CACHE_TTL = 7 * 24 * 60 * 60
 DEFAULT_PAGE = 1
 DEFAULT_NUM_LINES = 20
 
@@ -43,6 +67,16 @@ def create_parser():
                         help='Get user information. This arg can also be used for filtering data.')
     parser.add_argument('--team', required=False, metavar='<Name>',
                         help='Get team information.')
+    parser.add_argument('--teams-from', required=False, metavar='<File>',
+                        help='Get info of all team names in file (one per line, `-` for stdin) \
+                        as JSON lines and add them to the local teams index.')
+    parser.add_argument('--teams-with-member', required=False, metavar='<Username>',
+                        help='Indexed teams having the user as a member (offline).')
+    parser.add_argument('--teams-with-problem', required=False, metavar='<Problem Code>',
+                        help='Indexed teams that solved the problem (offline).')
+    parser.add_argument('--users-from', required=False, metavar='<File>',
+                        help='Get profiles of all usernames in file (one per line, `-` for \
+                        stdin) as JSON lines. Profiles are cached for a few hours.')
 
     # ratings & its filters
     parser.add_argument('--ratings', required=False, action="store_true", help='Displays user \
@@ -53,27 +87,74 @@ def create_parser():
                         help='Institution Filter')
     parser.add_argument('--institution-type', required=False, metavar='<Type>',
                         choices=INSTITUTION_TYPES, help='Institution Type Filter')
+    parser.add_argument('--ratings-snapshot', required=False, action='store_true',
+                        help='Save every page of the (filtered) ratings board as a local snapshot.')
+    parser.add_argument('--ratings-snapshots', required=False, action='store_true',
+                        help='List saved ratings snapshots.')
+    parser.add_argument('--ratings-delta', required=False, nargs='*', type=int,
+                        metavar='<Snapshot ID>',
+                        help='Rank movement, rating change & new entrants between two snapshots. \
+                        No args: the latest two snapshots of the filtered board.')
 
     # problems: get, submit & search
     parser.add_argument('--problem', required=False, metavar='<Code>',
                         help='Get Problem Description.')
+    parser.add_argument('--refresh', required=False, action='store_true',
+                        help='Fetch the problem description (or the tag index, for tag \
+                        expressions) again instead of using the cached one.')
+    parser.add_argument('--changed-since', required=False, metavar='<Duration>',
+                        type=parse_duration, help='Fetched problems (`--problem`, `--test`, \
+                        the API client) whose statement changed (or was first seen) within \
+                        duration. Eg: 24h, 7d')
     parser.add_argument('--submit', nargs=3, required=False,
                         metavar=('<Problem Code>', '<Solution File Path>', '<Language>'),
                         help='Eg: C++, C, Python, Python3, java, etc. (case-insensitive)')
+    parser.add_argument('--test', nargs=3, required=False,
+                        metavar=('<Problem Code>', '<Solution File Path>', '<Language>'),
+                        help='Run solution locally against the sample cases of the problem. \
+                        Use `--contest` for contest problems.')
     parser.add_argument('--search', required=False, metavar='<Type>', choices=SEARCH_TYPES,
                         help='Search practice problems filter (case-insensitive)')
 
+    # offline problem archive & its filters
+    parser.add_argument('--archive-sync', required=False, action='store_true',
+                        help='Download the practice catalog (all search types & tags) into the \
+                        local problem archive.')
+    parser.add_argument('--archive', required=False, action='store_true',
+                        help='Query the local problem archive. Filters: `--min-accuracy`, \
+                        `--max-submissions`, `--tags`')
+    parser.add_argument('--min-accuracy', required=False, metavar='<Percent>', type=float,
+                        help='Minimum accuracy filter for `--archive` & multi-contest listings.')
+    parser.add_argument('--max-accuracy', required=False, metavar='<Percent>', type=float,
+                        help='Maximum accuracy filter for multi-contest listings.')
+    parser.add_argument('--max-submissions', required=False, metavar='<Number>', type=int,
+                        help='Maximum successful submissions filter for `--archive`.')
+
     # contests and its filters
     parser.add_argument('--contests', required=False, action='store_true',
                         help='Get All Contests')
-    parser.add_argument('--contest', required=False, metavar='<Code>',
-                        help='Get Contest Problems')
+    parser.add_argument('--contest', required=False, nargs='+', metavar='<Code>',
+                        help='Get Contest Problems. Several codes list the problems of all of \
+                        them in one table, with a contest column.')
+    parser.add_argument('--contest-range', required=False, nargs=3,
+                        metavar=('<Prefix>', '<From>', '<To>'),
+                        help='Problems of every contest from <Prefix><From> to <Prefix><To> in \
+                        one table. Eg: START 100 120')
     parser.add_argument('--show-past', required=False, action='store_true',
                         help='Shows only past contests.')
+    parser.add_argument('--starting-within', required=False, metavar='<Duration>',
+                        type=parse_duration, help='Contests starting within duration, served \
+                        from the local contests cache. Eg: 90m, 24h, 7d')
+    parser.add_argument('--code-prefix', required=False, metavar='<Prefix>',
+                        help='Contests whose code starts with prefix, served from the local \
+                        contests cache. Eg: START, COOK')
 
     # solutions & its filters
     parser.add_argument('--solutions', required=False, metavar='<Problem Code>',
                         help='Get problem\'s solutions list')
+    parser.add_argument('--solutions-stats', required=False, metavar='<Problem Code>',
+                        help='Verdict mix, runtime & memory percentiles per language and the \
+                        submission timeline over all pages of a problem\'s solutions.')
     parser.add_argument('--solution', required=False, metavar='<Code>',
                         help='Get specific solution')
     parser.add_argument('--language', required=False,
@@ -83,7 +164,9 @@ def create_parser():
 
     # tags
     parser.add_argument('--tags', required=False, nargs='*', metavar="<Tag Name>",
-                        help='No args: get all tags. Add args to get tagged problems')
+                        help='No args: get all tags. Add args to get tagged problems. \
+                        Expressions like "dp & !greedy" (&, |, ! and parentheses) are answered \
+                        from the local tag index.')
 
     # common
     parser.add_argument('--lines', required=False, metavar='<Lines>', default=DEFAULT_NUM_LINES,
@@ -95,41 +178,259 @@ def create_parser():
                         `asc` for ascending; `desc` for descending')
     parser.add_argument('--page', '-p', required=False, metavar='<Number>', default=DEFAULT_PAGE,
                         type=int, help=f'Gets specific page. Default: {DEFAULT_PAGE}')
+    parser.add_argument('--prefetch', required=False, metavar='<Pages>', nargs='?', type=int,
+                        const=PREFETCH_DEFAULT_PAGES,
+                        help=f'After showing a page of `--solutions` or `--ratings`, fetch \
+                        the next <Pages> (default {PREFETCH_DEFAULT_PAGES}, max \
+                        {PREFETCH_MAX_PAGES}) in the background, so paging on is instant. \
+                        `--prefetch 0` stops a running prefetch.')
+    parser.add_argument('--output', '-o', required=False, metavar='<File>',
+                        help='Write batch & crawl results to file instead of stdout.')
+    parser.add_argument('--workers', required=False, metavar='<Number>', type=int,
+                        default=DEFAULT_NUM_WORKERS,
+                        help=f'Concurrent requests for batch modes. Default: {DEFAULT_NUM_WORKERS}')
+    parser.add_argument('--parse-processes', required=False, metavar='<Number>', nargs='?',
+                        type=int, const=0,
+                        help='Parse the pages of bulk jobs (`--users-from`, `--teams-from`, \
+                        `--solutions-stats`, `--crawl`, `--batch`) in <Number> worker processes \
+                        (default: one per CPU) while the workers keep fetching.')
+    parser.add_argument('--watch', required=False, metavar='<Seconds>', type=parse_interval,
+                        help='Keep polling `--contest`, `--solutions` or `--ratings` every \
+                        <Seconds> and print only the rows that changed.')
+    parser.add_argument('--batch', required=False, metavar='<File>',
+                        help='Run one command per line of <File> (`-` for stdin) in this process, \
+                        sharing one session & cache. Independent commands run concurrently; \
+                        output keeps the order of the lines.')
+    parser.add_argument('--crawl', required=False, nargs='+', metavar='<Kind>',
+                        help=f'Fetch every page of a long listing into a local work queue and \
+                        write it to `--output` as JSON lines. Kinds: {", ".join(CRAWL_KINDS)}. \
+                        Eg: `--crawl ratings --country India`, `--crawl solutions <Problem \
+                        Code>`, `--crawl contests <Code> ...`')
+    parser.add_argument('--resume', required=False, nargs='?', type=int, const=0,
+                        metavar='<Crawl ID>',
+                        help='Continue a crawl where it stopped; no args: the latest unfinished \
+                        one. A finished crawl is only written to `--output`.')
+    parser.add_argument('--crawls', required=False, action='store_true',
+                        help='List crawls and their progress.')
+    parser.add_argument('--http2', required=False, action='store_true',
+                        help='Multiplex concurrent requests over one HTTP/2 connection \
+                        (needs `httpx[http2]`).')
+    parser.add_argument('--stats', required=False, action='store_true',
+                        help='Show bytes transferred (on the wire & decompressed) and time taken \
+                        per endpoint.')
+    parser.add_argument('--stats-log', required=False, metavar='<File>',
+                        help='Append per-request transfer stats to a JSON lines file.')
+    parser.add_argument('--metrics-file', required=False, metavar='<File>',
+                        help='Write request, latency, cache, parse & rendering metrics of this \
+                        run in Prometheus text format (for node_exporter\'s textfile collector).')
+    parser.add_argument('--statsd', required=False, metavar='<Host:Port>', type=parse_address,
+                        help='Send the metrics of this run to a StatsD collector over UDP.')
 
     return parser
 
 
+def render_problem(problem):
+    theme = 'data'
+    if problem.get('code: ') == 404:
+        theme = 'error'
+
+    with c.capture() as capture:
+        remain = []
+        c.print()
+        for ele in problem.keys():
+            if len(ele) > 30 or len(str(problem[ele])) > 30:
+                remain.append(ele)
+            else:
+                c.print(ele.upper(), end="", style=theme)
+                c.print(problem[ele], end="")
+                c.print(" " * 10, end="")
+        c.print()
+        c.print()
+        for ele in remain:
+            c.print(ele.upper(), end="", style=theme)
+            result = problem[ele]
+            if ele == "Description: ":
+                result = BeautifulSoup(result, "html.parser")
+                im_urls = result.find_all('img')
+                c.print(result.text)
+                for url in im_urls:
+                    c.print("image: " + url['src'])
+                continue
+            c.print(result)
+            c.print()
+    return capture.get()
+
+
+def get_problem_cache_key(problem_code, contest_code):
+    # the rendering is laid out for one terminal width & color mode, so each gets its own entry
+    return f'{contest_code}/{problem_code}'.upper() + f'/{c.width}/{c.color_system or "none"}'
+
+
+def show_problem(problem_code, contest_code, refresh=False):
+    # the statement is parsed & laid out once; later views just print the cached rendering, and
+    # once that is stale it's only laid out again when the statement changed (or on `--refresh`)
+    cache_key = get_problem_cache_key(problem_code, contest_code)
+    cached = get_cached(PROBLEMS_CACHE_NAMESPACE, cache_key)
+    if cached and not refresh and time.time() - cached.get('checked_at', 0) <= PROBLEMS_CACHE_TTL:
+        print(cached['rendered'], end="")
+        return [cached['problem']]
+
+    problem = get_description(problem_code, contest_code)
+    if isinstance(problem, list):
+        for resp in problem:
+            print_response(**resp)
+        return problem
+    if 'code: ' in problem:
+        rendered = render_problem(problem)
+        print(rendered, end="")
+        return [problem]
+
+    if cached and not refresh and cached['problem'] == problem:
+        rendered = cached['rendered']
+    else:
+        rendered = render_problem(problem)
+    print(rendered, end="")
+    set_cached(PROBLEMS_CACHE_NAMESPACE, cache_key,
+               {'problem': problem, 'rendered': rendered, 'checked_at': time.time()})
+    return [problem]
+
+
+def show_stats(is_stats, stats_log, argv):
+    # inside a batch, only the requests of this command
+    stats = get_current_stats()
+    if stats_log:
+        write_stats_log(stats_log, " ".join(argv[1:]), stats)
+    if is_stats:
+        print_response(data=get_stats_table(stats), data_type='table', is_pager=False)
+
+
+def get_contest_range_problems(sort, order, contest_range, min_accuracy, max_accuracy,
+                               num_workers):
+    prefix, start, end = contest_range
+    try:
+        contest_codes = get_contest_range(prefix, int(start), int(end))
+    except ValueError:
+        return [{'code': 400, 'data': '`--contest-range` needs numbers for <From> & <To>.'}]
+    if not contest_codes or len(contest_codes) > CONTEST_RANGE_MAX_SIZE:
+        return [{
+            'code': 400, 'data': f'`--contest-range` covers 1 to {CONTEST_RANGE_MAX_SIZE} contests.'
+        }]
+    return get_contests_problems(
+        sort, order, contest_codes, min_accuracy, max_accuracy, num_workers)
+
+
+def start_crawl_command(crawl, country, institution, institution_type, language, result, username,
+                        output, num_workers):
+    kind, targets = crawl[0], crawl[1:]
+    if kind not in CRAWL_KINDS:
+        return [{'code': 400, 'data': f'`--crawl` kinds: {", ".join(CRAWL_KINDS)}.'}]
+
+    if kind == 'ratings':
+        target = [country, institution, institution_type]
+    elif kind == 'solutions':
+        if len(targets) != 1:
+            return [{'code': 400, 'data': '`--crawl solutions` needs one problem code.'}]
+        target = [targets[0], language, result, username]
+    else:
+        if not targets:
+            return [{'code': 400, 'data': '`--crawl contests` needs contest codes.'}]
+        target = targets
+    return start_crawl(kind, target, output, num_workers)
+
+
+def export_metrics(metrics_file, statsd, status, elapsed):
+    if not metrics_file and not statsd:
+        return
+    inc('runs_total', status=status)
+    observe('run_duration_seconds', elapsed)
+    if statsd:
+        send_statsd(statsd)
+    if metrics_file:
+        try:
+            write_prometheus(metrics_file)
+        except IOError:
+            print(style_text(f'Could not write metrics to {metrics_file}.', 'WARNING'))
+
+
+def run_batch_command(argv):
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    if args.batch or args.watch:
+        print_response(code=400, data='`--batch` & `--watch` can\'t be used inside a batch.')
+        return []
+    with stats_scope():
+        return main(['codechefcli'] + argv)
+
+
+def is_batch_barrier(argv):
+    # commands that change the login state or submit run on their own, in input order
+    try:
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+            args = create_parser().parse_args(argv)
+    except SystemExit:
+        return True
+    return args.login != INVALID_USERNAME or args.logout or bool(args.submit)
+
+
 def main(argv=None):
     if argv is None:
         argv = sys.argv
 
+    start = time.perf_counter()
+    metrics_file, statsd, status = None, None, 'ok'
+    is_parse_pool_owner = False
     try:
         parser = create_parser()
         args = parser.parse_args(argv[1:])
 
+        metrics_file = args.metrics_file
+        statsd = args.statsd
+        if metrics_file or statsd:
+            enable_metrics()
+
         username = args.login
         is_logout = args.logout
         disconnect_sessions = args.disconnect_sessions
 
         user = args.user
         team = args.team
+        users_from = args.users_from
+        teams_from = args.teams_from
+        teams_with_member = args.teams_with_member
+        teams_with_problem = args.teams_with_problem
 
         ratings = args.ratings
         country = args.country
         institution = args.institution
         institution_type = args.institution_type
+        ratings_snapshot = args.ratings_snapshot
+        ratings_snapshots = args.ratings_snapshots
+        ratings_delta = args.ratings_delta
 
         problem_code = args.problem
+        changed_since = args.changed_since
         submit = args.submit
+        test = args.test
         search = args.search
 
-        contest = args.contest
+        archive = args.archive
+        archive_sync = args.archive_sync
+        min_accuracy = args.min_accuracy
+        max_accuracy = args.max_accuracy
+        max_submissions = args.max_submissions
+
+        contest_codes = args.contest or []
+        contest = contest_codes[0] if contest_codes else None
+        contest_range = args.contest_range
         contests = args.contests
         show_past = args.show_past
+        starting_within = args.starting_within
+        code_prefix = args.code_prefix
 
         tags = args.tags
 
         solutions = args.solutions
+        solutions_stats = args.solutions_stats
         solution_code = args.solution
         language = args.language
         result = args.result
@@ -138,39 +439,52 @@ def main(argv=None):
         sort = args.sort
         order = args.order
         page = args.page
+        prefetch = args.prefetch
+        output = args.output
+        num_workers = args.workers
+
+        crawl = args.crawl
+        resume = args.resume
+        crawls = args.crawls
+
+        watch_interval = args.watch
+        is_watching = False
+
+        refresh = args.refresh
+
+        is_stats = args.stats
+        stats_log = args.stats_log
+        # a batch command already records into its own scope
+        if (is_stats or stats_log) and not get_stats_scopes():
+            enable_stats()
+
+        # nested batch commands share the pool of the run that started it
+        if args.parse_processes is not None and not is_parse_pool_running():
+            start_parse_pool(args.parse_processes)
+            is_parse_pool_owner = True
+
+        if args.http2 and use_http2() is None:
+            print(style_text(HTTP2_MISSING_MSG, 'WARNING'))
+
+        if args.batch:
+            try:
+                commands = read_commands(args.batch)
+            except IOError:
+                resps = [{'code': 400, 'data': 'Batch file not found.'}]
+                print_response(**resps[0])
+                return resps
+            run_batch(commands, run_batch_command, is_batch_barrier, num_workers)
+            show_stats(is_stats, stats_log, argv)
+            return []
 
         resps = []
 
-        # function stylize to style the output
-        def stylize(resps) :
-            theme='data'
-            if resps.get('code: ')== 404 :
-                theme='error' 
-            
-            remain=[]
-            print()
-            for ele in resps.keys() :
-                if len(ele) > 30 or len(str(resps[ele])) > 30 :
-                    remain.append(ele)
-                else :
-                    c.print(ele.upper(),end="",style=theme)
-                    c.print(resps[ele],end="")
-                    print(" "*10,end="")
-            print()
-            print()
-            for ele in remain :
-                c.print(ele.upper(),end="",style=theme)
-                result=resps[ele]
-                if ele=="Description: ":
-                    result = BeautifulSoup(result,"html.parser")
-                    im_urls = result.find_all('img')
-                    c.print(result.text)
-                    for url in im_urls :
-                        c.print("image: "+url['src'])
-                    continue
-                c.print(result)
-                print()
-            return
+        def fetch_or_watch(fetch, key_col):
+            nonlocal is_watching
+            if watch_interval:
+                is_watching = True
+                return watch(fetch, key_col, watch_interval)
+            return fetch()
 
         if username != INVALID_USERNAME:
             resps = login(username=username, disconnect_sessions=disconnect_sessions)
@@ -178,40 +492,108 @@ def main(argv=None):
         elif is_logout:
             resps = logout()
 
-        if problem_code: 
-            resps = get_description(problem_code, contest or CC_PRACTICE) 
-            stylize(resps)
-            return
+        if problem_code:
+            resps = show_problem(problem_code, contest or CC_PRACTICE, refresh)
+            show_stats(is_stats, stats_log, argv)
+            return resps
+
+        elif changed_since is not None:
+            resps = get_changed_statements(sort, order, changed_since)
 
         elif submit:
             resps = submit_problem(*submit)
 
+        elif test:
+            resps = judge_problem(*test, contest or CC_PRACTICE)
+
         elif search:
             resps = search_problems(sort, order, search)
 
+        elif archive_sync:
+            resps = sync_archive(num_workers)
+
+        elif crawl:
+            resps = start_crawl_command(crawl, country, institution, institution_type, language,
+                                        result, user, output, num_workers)
+
+        elif resume is not None:
+            resps = resume_crawl(resume, output, num_workers)
+
+        elif crawls:
+            resps = list_crawls()
+
+        elif archive:
+            resps = query_archive(sort, order, min_accuracy, max_submissions, tags)
+
+        elif contest_range:
+            resps = get_contest_range_problems(
+                sort, order, contest_range, min_accuracy, max_accuracy, num_workers)
+
+        elif len(contest_codes) > 1:
+            resps = get_contests_problems(
+                sort, order, contest_codes, min_accuracy, max_accuracy, num_workers)
+
         elif contest:
-            resps = get_contest_problems(sort, order, contest)
+            resps = fetch_or_watch(
+                lambda: get_contest_problems(sort, order, contest), CONTEST_PROBLEMS_KEY)
 
         elif contests:
-            resps = get_contests(show_past)
+            resps = get_contests(show_past, starting_within, code_prefix)
+
+        elif isinstance(tags, list) and is_tag_expression(tags):
+            resps = query_tags(sort, order, ' '.join(tags), refresh, num_workers)
 
         elif isinstance(tags, list):
             resps = get_tags(sort, order, tags)
 
         elif solutions:
-            resps = get_solutions(sort, order, solutions, page, language, result, user)
+            resps = fetch_or_watch(
+                lambda: get_solutions(sort, order, solutions, page, language, result, user,
+                                      use_prefetched=not watch_interval),
+                SOLUTIONS_KEY)
+            if prefetch is not None and not is_watching:
+                start_prefetch('solutions', [solutions, page, language, result, user], prefetch)
+
+        elif solutions_stats:
+            resps = get_solutions_stats(solutions_stats, refresh, num_workers)
 
         elif solution_code:
             resps = get_solution(solution_code)
 
+        elif users_from:
+            resps = get_users(users_from, output, num_workers)
+
         elif user:
             resps = get_user(user)
 
         elif team:
             resps = get_team(team)
 
+        elif teams_from:
+            resps = get_teams(teams_from, output, num_workers)
+
+        elif teams_with_member or teams_with_problem:
+            resps = get_indexed_teams(member=teams_with_member, problem_code=teams_with_problem)
+
+        elif ratings_snapshot:
+            resps = take_snapshot(country, institution, institution_type, num_workers)
+
+        elif ratings_snapshots:
+            resps = list_snapshots()
+
+        elif ratings_delta is not None:
+            resps = get_ratings_delta(
+                sort, order, ratings_delta, country, institution, institution_type)
+
         elif ratings:
-            resps = get_ratings(sort, order, country, institution, institution_type, page, lines)
+            resps = fetch_or_watch(
+                lambda: get_ratings(
+                    sort, order, country, institution, institution_type, page, lines,
+                    use_prefetched=not watch_interval),
+                RATINGS_KEY)
+            if prefetch is not None and not is_watching:
+                start_prefetch(
+                    'ratings', [country, institution, institution_type, page, lines], prefetch)
 
         else:
             parser.print_help()
@@ -219,13 +601,24 @@ def main(argv=None):
         if not resps:
             resps = [GENERIC_RESP]
 
-        for resp in resps:
-            print_response(**resp)
-            
+        if not is_watching:
+            for resp in resps:
+                print_response(**resp)
+
+        show_stats(is_stats, stats_log, argv)
         return resps
     except KeyboardInterrupt:
+        status = 'interrupted'
         print('\nBye.')
         return [{"data": "\nBye."}]
+    except NetworkError as e:
+        status = 'network_error'
+        print(e)
+        sys.exit(1)
+    finally:
+        if is_parse_pool_owner:
+            shutdown_parse_pool()
+        export_metrics(metrics_file, statsd, status, time.perf_counter() - start)
     return [{"data": "0"}]
 
 
@@ -0,0 +1,88 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from requests import ReadTimeout
+from requests.exceptions import ConnectionError
+
+from codechefcli import problems, teams, users
+from codechefcli.helpers import (DEFAULT_NUM_WORKERS, INTERNET_DOWN_MSG, NetworkError,
+                                 bind_session, prepare_request, request, revalidate)
+from codechefcli.metrics import get_endpoint_label, inc, observe_request
+from codechefcli.stats import record_request
+
+ASYNC_TRANSPORT = {'transport': None}
+EXECUTOR = {'executor': None}
+
+
+def get_executor():
+    if EXECUTOR['executor'] is None:
+        EXECUTOR['executor'] = ThreadPoolExecutor(
+            max_workers=DEFAULT_NUM_WORKERS, thread_name_prefix='codechefcli')
+    return EXECUTOR['executor']
+
+
+def shutdown_executor():
+    executor, EXECUTOR['executor'] = EXECUTOR['executor'], None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def set_async_transport(transport):
+    # `transport.send` is awaited & returns a requests-compatible response with its body read,
+    # e.g. `http2.AsyncHttpxTransport`; `None` runs the blocking `request` on a worker thread
+    previous = ASYNC_TRANSPORT['transport']
+    ASYNC_TRANSPORT['transport'] = transport
+    return previous
+
+
+async def arequest(session=None, method="GET", url="", token=None, until=None, stream=False,
+                   **kwargs):
+    transport = ASYNC_TRANSPORT['transport']
+    if transport is None:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), partial(
+            bind_session(request), session=session, method=method, url=url, token=token,
+            until=until, stream=stream, **kwargs))
+
+    # same contract as `request`, except that the body is always read whole, so `until` can't
+    # cut the download short
+    session, url, cache_key, replay = prepare_request(session, method, url, token, kwargs)
+    try:
+        start = time.perf_counter()
+        resp = await transport.send(
+            session, method, url, timeout=(15, 15), stream=stream or bool(until), **kwargs)
+        elapsed = time.perf_counter() - start
+        record_request(method, url, resp, elapsed)
+        observe_request(method, url, resp.status_code, elapsed)
+    except (ConnectionError, ReadTimeout) as e:
+        inc('http_errors_total', endpoint=get_endpoint_label(url), error=type(e).__name__)
+        raise NetworkError(INTERNET_DOWN_MSG) from e
+    return revalidate(resp, cache_key, replay, stream=stream)
+
+
+def to_async(func):
+    # the command functions are blocking, so their twins are thread-pool wrappers: each awaits
+    # the command on a worker thread, through the sync transport of `helpers.set_transport`
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_executor(), partial(bind_session(func), *args, **kwargs))
+    return wrapper
+
+
+# awaitable twins of the command functions, same arguments & same responses
+get_problem_json = to_async(problems.get_problem_json)
+get_description = to_async(problems.get_description)
+get_contest_problems = to_async(problems.get_contest_problems)
+get_contests = to_async(problems.get_contests)
+search_problems = to_async(problems.search_problems)
+get_tags = to_async(problems.get_tags)
+get_ratings = to_async(problems.get_ratings)
+get_solutions = to_async(problems.get_solutions)
+get_solution = to_async(problems.get_solution)
+submit_problem = to_async(problems.submit_problem)
+get_user = to_async(users.get_user)
+get_team = to_async(teams.get_team)
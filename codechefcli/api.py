@@ -0,0 +1,357 @@
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from requests_html import HTML
+
+from codechefcli.archive import merge_search_rows, merge_tagged_problems
+from codechefcli.cache import get_cached, set_cached
+from codechefcli.contests import get_db, is_stale, query_contests
+from codechefcli.helpers import (BASE_URL, DEFAULT_NUM_WORKERS, NetworkError, Validators,
+                                 get_session, html_to_list, use_session)
+from codechefcli.judge import get_sample_cases
+from codechefcli.problems import (CC_PRACTICE, get_compilation_error, get_contest_json,
+                                  get_problem_json, get_ratings_csrf_token, get_ratings_filter,
+                                  get_ratings_json, get_search_problems_rows, get_solution_source,
+                                  get_solutions_page, get_solutions_params, get_status_table,
+                                  get_tag_names, get_tagged_problems_json, refresh_contests,
+                                  submit_solution)
+from codechefcli.teams import get_team_record
+from codechefcli.users import USERS_CACHE_NAMESPACE, USERS_CACHE_TTL, get_user_record
+
+
+class CodeChefError(Exception):
+    def __init__(self, code, message=''):
+        super().__init__(message or f'Request failed with code {code}.')
+        self.code = code
+
+
+@dataclass
+class Problem:
+    code: str
+    name: str
+    contest_code: str
+    author: str = ''
+    date_added: str = ''
+    time_limit: Optional[float] = None
+    source_limit: Optional[int] = None
+    languages: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    body: str = ''
+    editorial_url: Optional[str] = None
+    sample_cases: List[Tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class ProblemSummary:
+    code: str
+    name: str
+    submissions: Optional[int] = None  # successful submissions
+    accuracy: Optional[float] = None
+
+
+@dataclass
+class ContestProblem:
+    code: str
+    name: str
+    url: str
+    successful_submissions: int
+    accuracy: float
+    scorable: bool
+
+
+@dataclass
+class ContestDetails:
+    code: str
+    name: str
+    announcements: str
+    problems: List[ContestProblem]
+
+
+@dataclass
+class Contest:
+    code: str
+    name: str
+    start: str
+    end: str
+    status: str
+
+
+@dataclass
+class Rating:
+    username: str
+    global_rank: int
+    country_rank: int
+    rating: int
+    diff: int
+
+
+@dataclass
+class Solution:
+    id: str
+    date: str
+    user: str
+    result: str
+    time: str
+    memory: str
+    language: str
+
+
+@dataclass
+class SolutionsPage:
+    problem_code: str
+    page: int
+    solutions: List[Solution]
+    page_info: Optional[str] = None
+
+
+@dataclass
+class User:
+    username: str
+    header: str
+    details: Dict[str, str]
+    star_rating: str
+    rating: str
+    global_rank: str
+    country_rank: str
+    teams_url: str
+    url: str
+
+
+@dataclass
+class Team:
+    name: str
+    header: str
+    info: List[str]
+    contests: List[str]
+    members: List[str]
+    problems_solved_table: List[List[str]]
+    problems_solved: List[str]
+
+
+@dataclass
+class Submission:
+    status_code: str
+    result_code: str
+    signal: Optional[str] = None
+    compile_error: Optional[str] = None
+    status_table: List[List[str]] = field(default_factory=list)
+
+
+def check(resp):
+    if resp is None:
+        raise CodeChefError(503)
+    if resp.get('code', 200) != 200:
+        raise CodeChefError(resp['code'], resp.get('data', ''))
+    return resp['data']
+
+
+def to_number(value, cast=int):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def with_session(method):
+    # runs the call (and the workers it starts) on the client's own session; network errors are
+    # raised as CodeChefError like every other failure
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            with use_session(self.session, self.validators):
+                return method(self, *args, **kwargs)
+        except NetworkError as e:
+            raise CodeChefError(503, str(e)) from e
+    return wrapper
+
+
+class CodeChef:
+    # every call runs on the client's own kept-alive session; nothing is printed, failures raise
+    # CodeChefError
+    def __init__(self, num_workers=DEFAULT_NUM_WORKERS, use_cache=True):
+        self.use_cache = use_cache
+        self.session = get_session()
+        self.session.mount(BASE_URL, HTTPAdapter(pool_connections=1, pool_maxsize=num_workers))
+        self.validators = Validators()
+
+    def close(self):
+        self.validators = Validators()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @with_session
+    def problem(self, problem_code, contest_code=CC_PRACTICE):
+        problem_json = get_problem_json(problem_code, contest_code)
+        if problem_json is None:
+            raise CodeChefError(503)
+        if problem_json.get('status') != 'success':
+            raise CodeChefError(404, 'Problem not found.')
+
+        tags = [tag.text for tag in HTML(html=problem_json['tags']).find('a')] \
+            if problem_json.get('tags') else []
+        languages = problem_json.get('languages_supported') or ''
+        return Problem(
+            code=problem_json.get('problem_code', problem_code),
+            name=problem_json.get('problem_name', ''),
+            contest_code=contest_code,
+            author=problem_json.get('problem_author', ''),
+            date_added=problem_json.get('date_added', ''),
+            time_limit=to_number(problem_json.get('max_timelimit'), float),
+            source_limit=to_number(problem_json.get('source_sizelimit')),
+            languages=[language.strip() for language in languages.split(',') if language.strip()],
+            tags=tags,
+            body=problem_json.get('body', ''),
+            editorial_url=problem_json.get('editorial_url'),
+            sample_cases=[tuple(case) for case in get_sample_cases(problem_json)]
+        )
+
+    @with_session
+    def contest(self, contest_code):
+        contest_json = get_contest_json(contest_code)
+        if contest_json is None:
+            raise CodeChefError(503)
+        if contest_json.get('status') != 'success':
+            raise CodeChefError(404, 'Contest doesn\'t exist.')
+
+        return ContestDetails(
+            code=contest_code.upper(),
+            name=contest_json.get('name', ''),
+            announcements=contest_json.get('announcements', ''),
+            problems=[
+                ContestProblem(
+                    code=problem['code'],
+                    name=problem['name'],
+                    url=f"{BASE_URL}{problem['problem_url']}",
+                    successful_submissions=to_number(problem.get('successful_submissions')),
+                    accuracy=to_number(problem.get('accuracy'), float),
+                    scorable=problem.get('category_name') == 'main'
+                )
+                for problem in (contest_json.get('problems') or {}).values()
+            ]
+        )
+
+    @with_session
+    def contests(self, show_past=False, starting_within=None, code_prefix=None):
+        conn = get_db()
+        try:
+            if is_stale(conn) and not refresh_contests(conn):
+                raise CodeChefError(503)
+            contests = []
+            for status in (['past'] if show_past else ['present', 'future']):
+                contests += [
+                    Contest(*row, status=status) for row in query_contests(
+                        conn, [status], starting_within=starting_within, code_prefix=code_prefix)
+                ]
+        finally:
+            conn.close()
+        return contests
+
+    @with_session
+    def search(self, search_type):
+        data_rows = get_search_problems_rows(search_type)
+        if data_rows is None:
+            raise CodeChefError(503)
+        problems = {}
+        merge_search_rows(problems, data_rows, search_type)
+        return [self._to_summary(problem) for problem in problems.values()]
+
+    @with_session
+    def tags(self):
+        tags = get_tag_names()
+        if tags is None:
+            raise CodeChefError(503)
+        return tags
+
+    @with_session
+    def tagged_problems(self, tags):
+        tagged_problems = get_tagged_problems_json(",".join(tags))
+        if tagged_problems is None:
+            raise CodeChefError(503)
+        problems = {}
+        merge_tagged_problems(problems, tagged_problems, '')
+        return [self._to_summary(problem) for problem in problems.values()]
+
+    def _to_summary(self, problem):
+        return ProblemSummary(
+            code=problem['code'],
+            name=problem.get('name', ''),
+            submissions=problem.get('solved_by'),
+            accuracy=problem.get('accuracy')
+        )
+
+    @with_session
+    def ratings(self, country=None, institution=None, institution_type=None, page=1, lines=20):
+        csrf_token = get_ratings_csrf_token()
+        if csrf_token is None:
+            raise CodeChefError(503)
+        ratings = get_ratings_json(
+            csrf_token, get_ratings_filter(country, institution, institution_type), page, lines)
+        if ratings is None:
+            raise CodeChefError(503)
+
+        return [
+            Rating(
+                username=user['username'],
+                global_rank=to_number(user.get('global_rank')),
+                country_rank=to_number(user.get('country_rank')),
+                rating=to_number(user.get('rating')),
+                diff=to_number(user.get('diff'))
+            )
+            for user in ratings.get('list') or []
+        ]
+
+    @with_session
+    def solutions(self, problem_code, page=1, language=None, result=None, username=None):
+        params = get_solutions_params(problem_code, page, language, result, username)
+        if params is None:
+            raise CodeChefError(503)
+
+        code, data_rows, page_info = get_solutions_page(problem_code, params)
+        if code != 200:
+            raise CodeChefError(code)
+        return SolutionsPage(
+            problem_code=problem_code,
+            page=page,
+            solutions=[Solution(*row[:7]) for row in data_rows[1:] if len(row) >= 7],
+            page_info=page_info
+        )
+
+    @with_session
+    def solution(self, solution_code):
+        return check(get_solution_source(solution_code))
+
+    @with_session
+    def user(self, username):
+        record = get_cached(USERS_CACHE_NAMESPACE, username, ttl=USERS_CACHE_TTL) \
+            if self.use_cache else None
+        if record is None:
+            record = check(get_user_record(username))
+            if self.use_cache:
+                set_cached(USERS_CACHE_NAMESPACE, username, record)
+        return User(**record)
+
+    @with_session
+    def team(self, name):
+        return Team(**check(get_team_record(name)))
+
+    @with_session
+    def submit(self, problem_code, solution_file, language, on_progress=None):
+        resp = check(submit_solution(problem_code, solution_file, language, on_progress))
+        status_code, status_json = resp['status_code'], resp['status']
+        result_code = status_json['result_code']
+
+        status_table = get_status_table(status_code)
+        return Submission(
+            status_code=status_code,
+            result_code=result_code,
+            signal=status_json.get('signal'),
+            compile_error=get_compilation_error(status_code) if result_code == 'compile' else None,
+            status_table=html_to_list(status_table) if status_table else []
+        )
@@ -0,0 +1,271 @@
+import json
+import math
+import mmap
+import os
+import shutil
+import time
+from array import array
+
+from codechefcli.decorators import sort_it
+from codechefcli.helpers import CACHE_DIR, DEFAULT_NUM_WORKERS, run_concurrently
+from codechefcli.problems import (SEARCH_TYPES, get_search_problems_rows, get_tag_names,
+                                  get_tagged_problems_json)
+
+ARCHIVE_DIR = f'{CACHE_DIR}/archive'
+ARCHIVE_META_FILE = 'meta.json'
+ARCHIVE_TABLE_HEADINGS = ['CODE', 'NAME', 'SUBMISSION', 'ACCURACY', 'CATEGORY']
+NO_CATEGORY = 255
+
+# one file per column; strings are a utf-8 blob plus offsets, tags are CSR (offsets + tag ids)
+COLUMNS = {
+    'code_offsets': 'I',
+    'codes': 'B',
+    'name_offsets': 'I',
+    'names': 'B',
+    'submissions': 'i',
+    'accuracy': 'f',
+    'category': 'B',
+    'tag_offsets': 'I',
+    'tag_ids': 'H',
+}
+
+
+def to_int(value):
+    try:
+        return int(str(value).replace(',', ''))
+    except ValueError:
+        return 0
+
+
+def to_float(value):
+    try:
+        return float(str(value).replace('%', '').strip())
+    except ValueError:
+        return 0.0
+
+
+def get_heading_index(heading, prefixes):
+    for index, col in enumerate(heading):
+        if any(col.startswith(prefix) for prefix in prefixes):
+            return index
+    return None
+
+
+def merge_search_rows(problems, data_rows, category):
+    if len(data_rows) < 2:
+        return
+
+    heading = data_rows[0]
+    code_idx = get_heading_index(heading, ['CODE'])
+    name_idx = get_heading_index(heading, ['NAME'])
+    submissions_idx = get_heading_index(heading, ['SUCCESSFUL', 'SUBMISSION'])
+    accuracy_idx = get_heading_index(heading, ['ACCURACY'])
+    if code_idx is None:
+        return
+
+    for row in data_rows[1:]:
+        if len(row) <= code_idx:
+            continue
+        problem = problems.setdefault(row[code_idx], {'code': row[code_idx], 'tags': set()})
+        problem['category'] = category
+        if name_idx is not None:
+            problem.setdefault('name', row[name_idx])
+        if submissions_idx is not None:
+            problem.setdefault('solved_by', to_int(row[submissions_idx]))
+        if accuracy_idx is not None:
+            problem.setdefault('accuracy', to_float(row[accuracy_idx]))
+
+
+def merge_tagged_problems(problems, tagged_problems, tag):
+    for code, tagged in tagged_problems.items():
+        code = tagged.get('code') or code
+        problem = problems.setdefault(code, {'code': code, 'tags': set()})
+        problem['tags'].add(tag)
+        problem['name'] = tagged.get('name') or problem.get('name', '')
+
+        attempted_by, solved_by = tagged.get('attempted_by'), tagged.get('solved_by')
+        if isinstance(attempted_by, int):
+            problem['attempted_by'] = attempted_by
+        if isinstance(solved_by, int):
+            problem['solved_by'] = solved_by
+        if isinstance(attempted_by, int) and isinstance(solved_by, int) and attempted_by:
+            problem['accuracy'] = solved_by / attempted_by * 100
+
+
+def write_archive(problems, tags, archive_dir=None):
+    archive_dir = archive_dir or ARCHIVE_DIR
+    tag_ids = {tag: index for index, tag in enumerate(tags)}
+    columns = {name: array(typecode) for name, typecode in COLUMNS.items()}
+    for name in ['code_offsets', 'name_offsets', 'tag_offsets']:
+        columns[name].append(0)
+
+    for problem in sorted(problems, key=lambda problem: problem['code']):
+        for key, blob in [('code', 'codes'), ('name', 'names')]:
+            columns[blob].frombytes(problem.get(key, '').encode('utf-8'))
+            columns[f'{key}_offsets'].append(len(columns[blob]))
+
+        # successful submissions: the one count both the search pages & the tag API report
+        columns['submissions'].append(problem.get('solved_by', 0))
+        columns['accuracy'].append(problem.get('accuracy', 0.0))
+        category = problem.get('category')
+        columns['category'].append(
+            SEARCH_TYPES.index(category) if category in SEARCH_TYPES else NO_CATEGORY)
+        columns['tag_ids'].extend(sorted(tag_ids[tag] for tag in problem.get('tags', [])))
+        columns['tag_offsets'].append(len(columns['tag_ids']))
+
+    # every sync writes a new version directory; `archive_dir` is a symlink that's swapped to it
+    # in one rename, so a reader always finds a complete archive
+    version_dir = f'{archive_dir}.{time.time_ns():020d}.{os.getpid()}'
+    os.makedirs(version_dir)
+    try:
+        for name, column in columns.items():
+            with open(os.path.join(version_dir, f'{name}.bin'), 'wb') as f:
+                column.tofile(f)
+        with open(os.path.join(version_dir, ARCHIVE_META_FILE), 'w') as f:
+            json.dump(
+                {'num_problems': len(problems), 'tags': tags, 'synced_at': int(time.time())}, f)
+        previous_dir = swap_archive(archive_dir, version_dir)
+    except OSError:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    remove_old_versions(archive_dir, previous_dir)
+
+
+def swap_archive(archive_dir, version_dir):
+    # an archive written before versions existed is a plain directory; it becomes one version
+    if os.path.isdir(archive_dir) and not os.path.islink(archive_dir):
+        os.replace(archive_dir, f'{archive_dir}.{0:020d}.0')
+    previous_dir = os.path.realpath(archive_dir) if os.path.islink(archive_dir) else None
+
+    link_path = f'{archive_dir}.{os.getpid()}.link'
+    if os.path.lexists(link_path):
+        os.remove(link_path)
+    os.symlink(os.path.basename(version_dir), link_path)
+    try:
+        os.replace(link_path, archive_dir)
+    except OSError:
+        os.remove(link_path)
+        raise
+    return previous_dir
+
+
+def remove_old_versions(archive_dir, previous_dir):
+    # the version just replaced stays for readers that resolved it a moment ago; older ones go,
+    # but not newer ones a concurrent sync may still be writing
+    parent, name = os.path.split(archive_dir)
+    if previous_dir is None:
+        return
+    for entry in os.listdir(parent or '.'):
+        path = os.path.join(parent, entry)
+        if entry.startswith(f'{name}.') and os.path.isdir(path) and not os.path.islink(path) \
+                and entry < os.path.basename(previous_dir):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class Archive:
+    def __init__(self, archive_dir=None):
+        # resolved once, so the meta & every column come from the same version
+        self.archive_dir = os.path.realpath(archive_dir or ARCHIVE_DIR)
+        with open(os.path.join(self.archive_dir, ARCHIVE_META_FILE)) as f:
+            self.meta = json.load(f)
+
+        self.num_problems = self.meta['num_problems']
+        self.tags = self.meta['tags']
+        self.tag_ids = {tag.lower(): index for index, tag in enumerate(self.tags)}
+
+        self._maps = []
+        self.columns = {name: self.map_column(name, typecode) for name, typecode in COLUMNS.items()}
+
+    def map_column(self, name, typecode):
+        with open(os.path.join(self.archive_dir, f'{name}.bin'), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b'').cast(typecode)
+            column_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(column_map)
+        return memoryview(column_map).cast(typecode)
+
+    def close(self):
+        for column in self.columns.values():
+            column.release()
+        for column_map in self._maps:
+            column_map.close()
+        self.columns, self._maps = {}, []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_string(self, key, index):
+        offsets = self.columns[f'{key}_offsets']
+        return bytes(self.columns[f'{key}s'][offsets[index]:offsets[index + 1]]).decode('utf-8')
+
+    def get_tags(self, index):
+        offsets = self.columns['tag_offsets']
+        tag_ids = self.columns['tag_ids'][offsets[index]:offsets[index + 1]]
+        return [self.tags[tag_id] for tag_id in tag_ids]
+
+    def filter(self, min_accuracy=None, max_submissions=None, tags=None):
+        indexes = range(self.num_problems)
+        if min_accuracy is not None:
+            accuracy = self.columns['accuracy']
+            indexes = [index for index in indexes if accuracy[index] >= min_accuracy]
+        if max_submissions is not None:
+            submissions = self.columns['submissions']
+            indexes = [index for index in indexes if submissions[index] <= max_submissions]
+        if tags:
+            required = {self.tag_ids.get(tag.lower()) for tag in tags}
+            if None in required:
+                return []
+            offsets, tag_ids = self.columns['tag_offsets'], self.columns['tag_ids']
+            indexes = [
+                index for index in indexes
+                if required.issubset(tag_ids[offsets[index]:offsets[index + 1]].tolist())
+            ]
+        return list(indexes)
+
+    def get_row(self, index):
+        category = self.columns['category'][index]
+        return [
+            self.get_string('code', index),
+            self.get_string('name', index),
+            str(self.columns['submissions'][index]),
+            str(math.floor(self.columns['accuracy'][index])),
+            SEARCH_TYPES[category] if category != NO_CATEGORY else ''
+        ]
+
+
+def sync_archive(num_workers=DEFAULT_NUM_WORKERS):
+    tags = get_tag_names()
+    if tags is None:
+        return [{'code': 503}]
+
+    problems = {}
+    search_rows = run_concurrently(get_search_problems_rows, SEARCH_TYPES, num_workers=num_workers)
+    for search_type, data_rows in zip(SEARCH_TYPES, search_rows):
+        merge_search_rows(problems, data_rows or [], search_type)
+
+    tagged = run_concurrently(get_tagged_problems_json, tags, num_workers=num_workers)
+    for tag, tagged_problems in zip(tags, tagged):
+        merge_tagged_problems(problems, tagged_problems or {}, tag)
+
+    write_archive(list(problems.values()), tags)
+    return [{'data': f'Archived {len(problems)} problems across {len(SEARCH_TYPES)} categories '
+                     f'and {len(tags)} tags.'}]
+
+
+@sort_it
+def query_archive(sort, order, min_accuracy=None, max_submissions=None, tags=None):
+    try:
+        archive = Archive()
+    except (IOError, ValueError, KeyError):
+        return [{'code': 404, 'data': 'No problem archive found. Run `--archive-sync` first.'}]
+
+    with archive:
+        indexes = archive.filter(min_accuracy, max_submissions, tags)
+        data_rows = [ARCHIVE_TABLE_HEADINGS] + [archive.get_row(index) for index in indexes]
+
+    if len(data_rows) == 1:
+        return [{'code': 404, 'data': 'No archived problems match the filters.'}]
+    return [{'data': data_rows, 'data_type': 'table'}]
@@ -0,0 +1,98 @@
+import io
+import shlex
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from codechefcli.helpers import DEFAULT_NUM_WORKERS, bind_session, persistent_session, style_text
+
+
+class BatchOutput:
+    # stands in for sys.stdout: a batch worker writes into its own buffer, anything else passes
+    # straight through to the real stream
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def get_buffer(self):
+        return getattr(self.local, 'buffer', None)
+
+    def write(self, text):
+        return (self.get_buffer() or self.stream).write(text)
+
+    def flush(self):
+        if self.get_buffer() is None:
+            self.stream.flush()
+
+    def isatty(self):
+        return self.get_buffer() is None and self.stream.isatty()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def read_commands(file_path):
+    # one command per line, without the program name; `-` reads stdin, `#` starts a comment
+    if file_path == '-':
+        lines = sys.stdin.readlines()
+    else:
+        with open(file_path) as f:
+            lines = f.readlines()
+
+    commands = []
+    for line in lines:
+        argv = shlex.split(line, comments=True)
+        if argv:
+            commands.append(argv)
+    return commands
+
+
+def run_command_safely(run_command, argv):
+    # a command that crashes only fails itself; the error goes into its own output
+    try:
+        run_command(argv)
+    except SystemExit:
+        pass
+    except Exception as e:
+        print(style_text(f'`{shlex.join(argv)}` failed: {type(e).__name__}: {e}', 'FAIL'))
+
+
+def run_captured(output, run_command, argv):
+    output.local.buffer = io.StringIO()
+    try:
+        run_command_safely(run_command, argv)
+        return output.local.buffer.getvalue()
+    finally:
+        output.local.buffer = None
+
+
+def run_in_place(run_command, argv):
+    run_command_safely(run_command, argv)
+
+
+def run_batch(commands, run_command, is_barrier, num_workers=DEFAULT_NUM_WORKERS):
+    # independent commands run concurrently on one shared session & their output is printed in
+    # input order as soon as everything before it is done; barrier commands (login, submit, ...)
+    # run alone, after the commands before them and before the ones after them
+    output = BatchOutput(sys.stdout)
+    sys.stdout = output
+    try:
+        with persistent_session(pool_size=num_workers), \
+                ThreadPoolExecutor(max_workers=num_workers) as executor:
+            group = []
+            for argv in commands + [None]:
+                if argv is not None and not is_barrier(argv):
+                    group.append(argv)
+                    continue
+
+                for text in executor.map(bind_session(
+                        lambda argv: run_captured(output, run_command, argv)), group):
+                    output.stream.write(text)
+                    output.stream.flush()
+                group = []
+
+                if argv is not None:
+                    run_in_place(run_command, argv)
+        return len(commands)
+    finally:
+        sys.stdout = output.stream
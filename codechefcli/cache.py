@@ -0,0 +1,50 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from codechefcli.helpers import CACHE_DIR
+from codechefcli.metrics import inc
+
+
+def get_cache_path(namespace, key):
+    key_hash = hashlib.sha1(str(key).encode('utf-8')).hexdigest()
+    return f'{CACHE_DIR}/{namespace}/{key_hash}.json'
+
+
+def get_cached(namespace, key, ttl=None):
+    try:
+        with open(get_cache_path(namespace, key)) as f:
+            entry = json.load(f)
+    except (IOError, ValueError):
+        inc('cache_requests_total', namespace=namespace, result='miss')
+        return None
+
+    if ttl is not None and time.time() - entry.get('cached_at', 0) > ttl:
+        inc('cache_requests_total', namespace=namespace, result='expired')
+        return None
+    inc('cache_requests_total', namespace=namespace, result='hit')
+    return entry.get('value')
+
+
+def pop_cached(namespace, key, ttl=None):
+    # single-use entries: whoever reads one first removes it
+    value = get_cached(namespace, key, ttl=ttl)
+    try:
+        os.remove(get_cache_path(namespace, key))
+    except OSError:
+        pass
+    return value
+
+
+def set_cached(namespace, key, value):
+    cache_path = get_cache_path(namespace, key)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+    # write to a temp file first, so concurrent readers never see a partial entry
+    tmp_path = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'cached_at': time.time(), 'value': value}, f)
+    os.replace(tmp_path, cache_path)
+    return value
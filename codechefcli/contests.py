@@ -0,0 +1,145 @@
+import re
+import time
+from datetime import datetime, timedelta, timezone
+
+from codechefcli.helpers import CACHE_DIR, open_db
+
+CONTESTS_DB_PATH = f'{CACHE_DIR}/contests.db'
+CONTESTS_CACHE_TTL = 5 * 60
+CONTEST_TABLE_HEADINGS = ['CODE', 'NAME', 'START', 'END']
+CONTEST_DATE_FORMATS = [
+    '%Y-%m-%d %H:%M:%S', '%d %b %Y %H:%M:%S', '%d %b %Y %H:%M', '%d %B %Y %H:%M:%S']
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60, 'w': 7 * 24 * 60 * 60}
+DURATION_REGEX = re.compile(r'^(\d+)([smhdw]?)$')
+# the contests page lists times in IST, whatever the local timezone is
+CONTEST_TIMEZONE = timezone(timedelta(hours=5, minutes=30))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contests (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    start_ts INTEGER,
+    status TEXT NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contests_start_ts ON contests (start_ts);
+CREATE INDEX IF NOT EXISTS contests_status ON contests (status, start_ts);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def parse_duration(value):
+    match = DURATION_REGEX.match(value.strip().lower())
+    if not match:
+        raise ValueError(f'Invalid duration: {value}. Eg: 90m, 24h, 7d')
+    num, unit = match.groups()
+    return int(num) * DURATION_UNITS[unit or 'h']
+
+
+def parse_contest_date(value):
+    value = " ".join(value.split())
+    for date_format in CONTEST_DATE_FORMATS:
+        try:
+            return int(datetime.strptime(value, date_format).replace(
+                tzinfo=CONTEST_TIMEZONE).timestamp())
+        except ValueError:
+            continue
+    return None
+
+
+def get_db(db_path=None):
+    return open_db(db_path or CONTESTS_DB_PATH, SCHEMA)
+
+
+def get_contest_rows(data_rows, status):
+    if len(data_rows) < 2:
+        return []
+
+    heading = data_rows[0]
+    indexes = []
+    for name in CONTEST_TABLE_HEADINGS:
+        index = next((idx for idx, col in enumerate(heading) if col.startswith(name)), None)
+        if index is None:
+            return []
+        indexes.append(index)
+
+    rows = []
+    for row in data_rows[1:]:
+        if len(row) < len(heading):
+            continue
+        code, name, start, end = [row[index] for index in indexes]
+        rows.append((code.upper(), name, start, end, parse_contest_date(start), status))
+    return rows
+
+
+def get_last_refresh(conn):
+    row = conn.execute("SELECT value FROM meta WHERE key = 'last_refresh'").fetchone()
+    return int(row[0]) if row else None
+
+
+def is_stale(conn, ttl=CONTESTS_CACHE_TTL, now=None):
+    last_refresh = get_last_refresh(conn)
+    now = now or int(time.time())
+    return last_refresh is None or now - last_refresh > ttl
+
+
+def sync_contests(conn, rows, now=None, statuses=None):
+    # only rows that are new or whose values changed are written; for each of `statuses` (the
+    # listings the rows were read from) contests no longer listed, e.g. cancelled, are deleted
+    now = now or int(time.time())
+    num_changed = 0
+    codes = {row[0] for row in rows}
+    with conn:
+        for status in statuses or []:
+            missing = [
+                (code,) for code, in conn.execute(
+                    "SELECT code FROM contests WHERE status = ?", (status,))
+                if code not in codes
+            ]
+            conn.executemany("DELETE FROM contests WHERE code = ?", missing)
+            num_changed += len(missing)
+        for row in rows:
+            cursor = conn.execute(
+                """INSERT INTO contests (code, name, start, end, start_ts, status, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (code) DO UPDATE SET
+                    name = excluded.name, start = excluded.start, end = excluded.end,
+                    start_ts = excluded.start_ts, status = excluded.status,
+                    updated_at = excluded.updated_at
+                WHERE name IS NOT excluded.name OR start IS NOT excluded.start
+                    OR end IS NOT excluded.end OR status IS NOT excluded.status""",
+                (*row, now)
+            )
+            num_changed += cursor.rowcount
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_refresh', ?)", (str(now),))
+    return num_changed
+
+
+def query_contests(conn, statuses=None, starting_within=None, code_prefix=None, now=None):
+    now = now or int(time.time())
+    clauses, params = [], []
+
+    if statuses:
+        clauses.append(f"status IN ({', '.join('?' * len(statuses))})")
+        params += statuses
+    if starting_within is not None:
+        # past contests can only have started within the last `starting_within` seconds
+        clauses.append('start_ts BETWEEN ? AND ?')
+        if statuses == ['past']:
+            params += [now - starting_within, now]
+        else:
+            params += [now, now + starting_within]
+    if code_prefix:
+        # range scan instead of LIKE so the primary key index is used
+        code_prefix = code_prefix.upper()
+        clauses.append('code >= ? AND code < ?')
+        params += [code_prefix, code_prefix[:-1] + chr(ord(code_prefix[-1]) + 1)]
+
+    query = 'SELECT code, name, start, end FROM contests'
+    if clauses:
+        query += f" WHERE {' AND '.join(clauses)}"
+    query += ' ORDER BY start_ts, code'
+    return [list(row) for row in conn.execute(query, params)]
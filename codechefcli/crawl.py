@@ -0,0 +1,295 @@
+import json
+import threading
+import time
+
+from codechefcli.helpers import (BASE_URL, CACHE_DIR, DEFAULT_NUM_WORKERS, NetworkError,
+                                 open_db, run_concurrently)
+from codechefcli.problems import (CONTESTS_PROBLEMS_TABLE_HEADINGS, get_contest_json,
+                                  get_ratings_csrf_token, get_ratings_filter, get_ratings_json,
+                                  get_solutions_page, get_solutions_params)
+from codechefcli.solution_stats import get_num_pages
+
+CRAWL_DB_PATH = f'{CACHE_DIR}/crawls.db'
+CRAWL_KINDS = ['ratings', 'solutions', 'contests']
+CRAWL_RATINGS_PAGE_SIZE = 200
+CRAWL_MAX_PAGES = 500
+# an item that still fails after this many passes is left for `--resume`, and one that has
+# failed CRAWL_MAX_ATTEMPTS times in all is given up on
+CRAWL_MAX_PASSES = 3
+CRAWL_MAX_ATTEMPTS = 10
+CRAWL_RETRY_DELAY = 5.0
+CRAWLS_TABLE_HEADINGS = ['ID', 'KIND', 'TARGET', 'STARTED AT', 'DONE', 'FAILED', 'PENDING']
+PENDING, DONE, FAILED = 'pending', 'done', 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crawls (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    target TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS crawl_items (
+    crawl_id INTEGER NOT NULL REFERENCES crawls (id),
+    item TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    updated_at INTEGER NOT NULL,
+    PRIMARY KEY (crawl_id, item)
+) WITHOUT ROWID;
+"""
+
+
+def get_db(db_path=None):
+    # workers checkpoint through the one connection, one item at a time
+    return open_db(db_path or CRAWL_DB_PATH, SCHEMA, check_same_thread=False)
+
+
+def add_crawl(conn, kind, target, items, now=None):
+    now = int(now or time.time())
+    cursor = conn.execute("INSERT INTO crawls (kind, target, created_at) VALUES (?, ?, ?)",
+                          (kind, json.dumps(target), now))
+    crawl_id = cursor.lastrowid
+    conn.executemany(
+        "INSERT OR IGNORE INTO crawl_items (crawl_id, item, position, status, updated_at) "
+        "VALUES (?, ?, ?, ?, ?)",
+        [(crawl_id, str(item), position, PENDING, now) for position, item in enumerate(items)])
+    conn.commit()
+    return crawl_id
+
+
+def save_item(conn, crawl_id, item, result, now=None):
+    # a done item is never written again, so a late or repeated worker changes nothing
+    now = int(now or time.time())
+    if result is None:
+        conn.execute(
+            "UPDATE crawl_items SET status = ?, attempts = attempts + 1, updated_at = ? "
+            "WHERE crawl_id = ? AND item = ? AND status != ?",
+            (FAILED, now, crawl_id, str(item), DONE))
+    else:
+        conn.execute(
+            "UPDATE crawl_items SET status = ?, attempts = attempts + 1, result = ?, "
+            "updated_at = ? WHERE crawl_id = ? AND item = ? AND status != ?",
+            (DONE, json.dumps(result), now, crawl_id, str(item), DONE))
+    conn.commit()
+
+
+def get_crawl(conn, crawl_id=None):
+    # no id: the latest crawl that still has items left
+    if crawl_id:
+        return conn.execute(
+            "SELECT id, kind, target FROM crawls WHERE id = ?", (crawl_id,)).fetchone()
+    return conn.execute(
+        "SELECT id, kind, target FROM crawls WHERE id IN (SELECT crawl_id FROM crawl_items "
+        "WHERE status != ? AND attempts < ?) ORDER BY id DESC LIMIT 1",
+        (DONE, CRAWL_MAX_ATTEMPTS)).fetchone()
+
+
+def get_pending_items(conn, crawl_id):
+    return [item for item, in conn.execute(
+        "SELECT item FROM crawl_items WHERE crawl_id = ? AND status != ? AND attempts < ? "
+        "ORDER BY position", (crawl_id, DONE, CRAWL_MAX_ATTEMPTS))]
+
+
+def get_progress(conn, crawl_id):
+    counts = dict(conn.execute(
+        "SELECT status, COUNT(*) FROM crawl_items WHERE crawl_id = ? GROUP BY status",
+        (crawl_id,)))
+    return counts.get(DONE, 0), counts.get(FAILED, 0), counts.get(PENDING, 0)
+
+
+def get_solutions_records(data_rows):
+    return [dict(zip(data_rows[0], row)) for row in data_rows[1:]]
+
+
+def get_contest_records(contest_code, resp_json):
+    if resp_json.get('status') != 'success':
+        return []
+    return [dict(zip(CONTESTS_PROBLEMS_TABLE_HEADINGS, [
+        contest_code,
+        problem['name'],
+        problem['code'],
+        f"{BASE_URL}{problem['problem_url']}",
+        str(problem['successful_submissions']),
+        f"{problem['accuracy']} %",
+        "Yes" if problem['category_name'] == 'main' else "No"
+    ])) for problem in (resp_json.get('problems') or {}).values()]
+
+
+def plan_ratings(country, institution, institution_type):
+    csrf_token = get_ratings_csrf_token()
+    if csrf_token is None:
+        return None
+    filter_by = get_ratings_filter(country, institution, institution_type)
+    first_page = get_ratings_json(csrf_token, filter_by, 1, CRAWL_RATINGS_PAGE_SIZE)
+    if first_page is None:
+        return None
+    num_pages = min(first_page.get('availablePages') or 1, CRAWL_MAX_PAGES)
+    return list(range(1, num_pages + 1)), {1: first_page.get('list') or []}
+
+
+def plan_solutions(problem_code, language, result, username):
+    params = get_solutions_params(problem_code, 1, language, result, username)
+    if params is None:
+        return None
+    code, data_rows, page_info = get_solutions_page(problem_code, {**params, 'page': 0})
+    if code != 200:
+        return None
+    num_pages = min(get_num_pages(page_info), CRAWL_MAX_PAGES)
+    return list(range(num_pages)), {0: get_solutions_records(data_rows)}
+
+
+def plan_contests(*contest_codes):
+    return [code.upper() for code in contest_codes], {}
+
+
+def get_ratings_fetcher(country, institution, institution_type):
+    csrf_token = get_ratings_csrf_token()
+    if csrf_token is None:
+        return None
+    filter_by = get_ratings_filter(country, institution, institution_type)
+
+    def fetch(page):
+        ratings = get_ratings_json(csrf_token, filter_by, int(page), CRAWL_RATINGS_PAGE_SIZE)
+        return None if ratings is None else ratings.get('list') or []
+    return fetch
+
+
+def get_solutions_fetcher(problem_code, language, result, username):
+    params = get_solutions_params(problem_code, 1, language, result, username)
+    if params is None:
+        return None
+
+    def fetch(page):
+        code, data_rows, _ = get_solutions_page(problem_code, {**params, 'page': int(page)})
+        return get_solutions_records(data_rows) if code == 200 else None
+    return fetch
+
+
+def get_contests_fetcher(*contest_codes):
+    def fetch(contest_code):
+        resp_json = get_contest_json(contest_code)
+        return None if resp_json is None else get_contest_records(contest_code, resp_json)
+    return fetch
+
+
+PLANNERS = {
+    'ratings': plan_ratings,
+    'solutions': plan_solutions,
+    'contests': plan_contests,
+}
+FETCHERS = {
+    'ratings': get_ratings_fetcher,
+    'solutions': get_solutions_fetcher,
+    'contests': get_contests_fetcher,
+}
+
+
+def run_items(conn, crawl_id, fetch, num_workers, retry_delay):
+    lock = threading.Lock()
+
+    def run_item(item):
+        # any error fails just this item; it's retried on a later pass or `--resume`
+        try:
+            result = fetch(item)
+        except Exception:
+            result = None
+        with lock:
+            save_item(conn, crawl_id, item, result)
+
+    for num_pass in range(CRAWL_MAX_PASSES):
+        items = get_pending_items(conn, crawl_id)
+        if not items:
+            return
+        if num_pass:
+            time.sleep(retry_delay)
+        run_concurrently(run_item, items, num_workers=num_workers)
+
+
+def export_crawl(conn, crawl_id, output_file):
+    num_records = 0
+    with open(output_file, 'w') as f:
+        for result, in conn.execute(
+                "SELECT result FROM crawl_items WHERE crawl_id = ? AND status = ? "
+                "ORDER BY position", (crawl_id, DONE)):
+            for record in json.loads(result):
+                f.write(f'{json.dumps(record)}\n')
+                num_records += 1
+    return num_records
+
+
+def get_crawl_summary(conn, crawl_id, kind, output_file):
+    num_done, num_failed, num_pending = get_progress(conn, crawl_id)
+    summary = f'Crawl #{crawl_id} ({kind}): {num_done} of ' \
+        f'{num_done + num_failed + num_pending} items done.'
+    num_left = len(get_pending_items(conn, crawl_id))
+    if num_left:
+        summary += f' Run `--resume {crawl_id}` to fetch the rest.'
+    if num_failed + num_pending > num_left:
+        summary += f' Gave up on {num_failed + num_pending - num_left} item(s) after ' \
+            f'{CRAWL_MAX_ATTEMPTS} attempts.'
+    if output_file:
+        num_records = export_crawl(conn, crawl_id, output_file)
+        summary += f' Wrote {num_records} records into {output_file}'
+    return summary
+
+
+def resume_crawl(crawl_id=None, output_file=None, num_workers=DEFAULT_NUM_WORKERS,
+                 retry_delay=CRAWL_RETRY_DELAY):
+    conn = get_db()
+    try:
+        crawl = get_crawl(conn, crawl_id)
+        if crawl is None:
+            return [{'code': 404, 'data': 'No crawl to resume.' if not crawl_id else
+                     f'Crawl #{crawl_id} not found.'}]
+
+        crawl_id, kind, target = crawl
+        if get_pending_items(conn, crawl_id):
+            try:
+                fetch = FETCHERS[kind](*json.loads(target))
+            except NetworkError:
+                fetch = None
+            if fetch is None:
+                return [{'code': 503}]
+            run_items(conn, crawl_id, fetch, num_workers, retry_delay)
+        return [{'data': get_crawl_summary(conn, crawl_id, kind, output_file)}]
+    finally:
+        conn.close()
+
+
+def start_crawl(kind, target, output_file=None, num_workers=DEFAULT_NUM_WORKERS,
+                retry_delay=CRAWL_RETRY_DELAY):
+    # the items are planned up front, so a crawl cut short knows exactly what is left
+    plan = PLANNERS[kind](*target)
+    if plan is None:
+        return [{'code': 503}]
+
+    items, results = plan
+    conn = get_db()
+    try:
+        crawl_id = add_crawl(conn, kind, target, items)
+        for item, result in results.items():
+            save_item(conn, crawl_id, item, result)
+    finally:
+        conn.close()
+    return resume_crawl(crawl_id, output_file, num_workers, retry_delay)
+
+
+def list_crawls():
+    conn = get_db()
+    try:
+        crawls = conn.execute(
+            "SELECT id, kind, target, created_at FROM crawls ORDER BY id DESC").fetchall()
+        data_rows = [CRAWLS_TABLE_HEADINGS]
+        for crawl_id, kind, target, created_at in crawls:
+            data_rows.append([
+                str(crawl_id), kind, ' '.join(value for value in json.loads(target) if value),
+                time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(created_at))
+            ] + [str(count) for count in get_progress(conn, crawl_id)])
+    finally:
+        conn.close()
+
+    if len(data_rows) == 1:
+        return [{'code': 404, 'data': 'No crawls found. Start one with `--crawl`.'}]
+    return [{'data': data_rows, 'data_type': 'table'}]
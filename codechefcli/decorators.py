@@ -1,3 +1,4 @@
+import math
 import os
 from functools import wraps
 from http.cookiejar import LWPCookieJar
@@ -23,6 +24,18 @@ def login_required(func):
     return wrapper
 
 
+def get_sort_key(value):
+    # numbers with a sign, decimals or units (`-12`, `12.5 %`, `1,024`) sort by value, ahead of
+    # any text in the column
+    try:
+        number = float(value.replace(',', '').rstrip('% '))
+    except (AttributeError, ValueError):
+        return 1, 0, value
+    if not math.isfinite(number):
+        return 1, 0, value
+    return 0, number, ''
+
+
 def sort_it(func):
     def wrapper(*args, **kwargs):
         sort = args[0] and args[0].upper()
@@ -58,7 +71,8 @@ def sort_it(func):
                                 for data_row in data_rows:
                                     data_row[index] = str(data_row[index])
                             else:
-                                data_rows.sort(key=lambda x: x[index], reverse=reverse)
+                                data_rows.sort(key=lambda x: get_sort_key(x[index]),
+                                               reverse=reverse)
 
                             data_rows.insert(0, heading)
                             resp['data'] = data_rows
@@ -1,20 +1,49 @@
+import copy
+import io
+import mmap
 import os
+import pydoc
+import shutil
+import sqlite3
+import subprocess
 import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
 from http.cookiejar import Cookie, LWPCookieJar
 from os.path import expanduser
-from pydoc import pager
 
+from cssselect import GenericTranslator
+from lxml import etree
+from pyquery import PyQuery
 from requests import ReadTimeout
+from requests.adapters import HTTPAdapter
 from requests.exceptions import ConnectionError
 from requests_html import HTMLSession
+from urllib3.util.request import ACCEPT_ENCODING
+
+from codechefcli.metrics import METRICS, get_endpoint_label, inc, observe, observe_request
+from codechefcli.stats import get_stats_scopes, record_request, use_stats_scopes
 
 CSRF_TOKEN_INPUT_ID = 'edit-csrfToken'
 MIN_NUM_SPACES = 3
+DEFAULT_NUM_WORKERS = 8
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_MMAP_MIN_SIZE = 1024 * 1024
+STREAM_CHUNK_SIZE = 8192
 BASE_URL = 'https://www.codechef.com'
 SERVER_DOWN_MSG = 'Please try again later. Seems like CodeChef server is down!'
 INTERNET_DOWN_MSG = 'Nothing to show. Check your internet connection.'
 UNAUTHORIZED_MSG = 'You are not logged in.'
 COOKIES_FILE_PATH = expanduser('~') + '/.cookies'
+CACHE_DIR = expanduser('~') + '/.codechefcli'
+NOT_MODIFIED_STATUS_CODE = 304
+# pages kept for revalidation per session; the least recently used are dropped first
+MAX_VALIDATED_PAGES = 128
 BCOLORS = {
     'HEADER': '\033[95m',
     'BLUE': '\033[94m',
@@ -27,12 +56,64 @@ BCOLORS = {
 }
 
 
+class NetworkError(Exception):
+    pass
+
+
+class Validators:
+    # `(conditional headers, replay)` per GET, shared by the worker threads of a session & bounded,
+    # so a long-lived client or crawl doesn't keep every page it ever read
+    def __init__(self, max_size=None):
+        self.max_size = max_size or MAX_VALIDATED_PAGES
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key not in self.entries:
+                return default
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self.lock:
+            return self.entries.pop(key, default)
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SessionState(threading.local):
+    # the session in use is per thread, so separate clients never share one; workers started by
+    # `run_concurrently` (or wrapped with `bind_session`) inherit the session of their caller
+    def __init__(self):
+        self.state = {'session': None, 'validators': Validators()}
+
+    def __getitem__(self, key):
+        return self.state[key]
+
+    def __setitem__(self, key, value):
+        self.state[key] = value
+
+
+SHARED_SESSION = SessionState()
+
+
 def set_session_cookies(session):
     session.cookies = LWPCookieJar(filename=COOKIES_FILE_PATH)
 
 
 def get_session():
     session = HTMLSession()
+    # advertise every content encoding urllib3 can decode here (brotli/zstd when installed)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
 
     if os.path.exists(COOKIES_FILE_PATH):
         set_session_cookies(session)
@@ -47,6 +128,137 @@ def init_session_cookie(name, value, **kwargs):
                   comment=None, comment_url=None, rest={'HttpOnly': None}, rfc2109=False)
 
 
+@contextmanager
+def use_session(session, validators=None):
+    previous = SHARED_SESSION['session'], SHARED_SESSION['validators']
+    SHARED_SESSION['session'] = session
+    SHARED_SESSION['validators'] = Validators() if validators is None else validators
+    try:
+        yield session
+    finally:
+        SHARED_SESSION['session'], SHARED_SESSION['validators'] = previous
+
+
+def bind_session(func):
+    # runs `func` on the session (and in the stats scopes) of the thread that wrapped it, from
+    # whatever thread calls it
+    session, validators = SHARED_SESSION['session'], SHARED_SESSION['validators']
+    scopes = get_stats_scopes()
+    if session is None and not scopes:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_session(session, validators), use_stats_scopes(scopes):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def persistent_session(pool_size=None):
+    # reuse one session (connection pool & cookies) for every request made inside the block and
+    # revalidate repeated GETs with the ETag / Last-Modified of the previous response
+    if SHARED_SESSION['session'] is not None:
+        yield SHARED_SESSION['session']
+        return
+
+    session = get_session()
+    if pool_size:
+        session.mount(BASE_URL, HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    try:
+        with use_session(session):
+            yield session
+    finally:
+        session.close()
+
+
+def get_cache_key(method, url, params=None):
+    return method, url, tuple(sorted((params or {}).items()))
+
+
+def get_conditional_headers(cached_resp):
+    headers = {}
+    etag = cached_resp.headers.get('ETag')
+    last_modified = cached_resp.headers.get('Last-Modified')
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return headers
+
+
+class MultipartFileStream:
+    # multipart/form-data body that is sent chunk by chunk instead of being built in memory;
+    # large files are memory-mapped, so chunks are slices of the page cache
+    def __init__(self, fields, file_field, file_path, chunk_size=UPLOAD_CHUNK_SIZE):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        self.fields = fields
+        self.file_field = file_field
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.file = None
+        self.content = b''
+        self.size = 0
+
+        head = []
+        for name, value in fields.items():
+            head.append(f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"'
+                        f'\r\n\r\n{value}\r\n')
+        head.append(f'--{self.boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+                    f'filename="{os.path.basename(file_path)}"\r\n'
+                    f'Content-Type: application/octet-stream\r\n\r\n')
+        self.head = "".join(head).encode('utf-8')
+        self.tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+
+    def __enter__(self):
+        self.file = open(self.file_path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        if self.size >= UPLOAD_MMAP_MIN_SIZE:
+            self.content = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.content = self.file.read()
+        return self
+
+    def __exit__(self, *args):
+        if isinstance(self.content, mmap.mmap):
+            try:
+                self.content.close()
+            except BufferError:
+                # an aborted send still holds a chunk; the map is released once it's collected
+                pass
+        self.content = b''
+        self.file.close()
+
+    def __len__(self):
+        return len(self.head) + self.size + len(self.tail)
+
+    def __iter__(self):
+        yield self.head
+        with memoryview(self.content) as view:
+            for start in range(0, self.size, self.chunk_size):
+                chunk = view[start:start + self.chunk_size]
+                yield chunk
+                chunk.release()
+        yield self.tail
+
+
+class SessionTransport:
+    # sends through the requests session itself; another transport only has to implement `send`
+    # and return a requests-compatible response
+    def send(self, session, method, url, **kwargs):
+        return session.request(method=method, url=url, **kwargs)
+
+
+TRANSPORT = {'transport': SessionTransport()}
+
+
+def set_transport(transport):
+    previous = TRANSPORT['transport']
+    TRANSPORT['transport'] = transport
+    return previous
+
+
 def get_username():
     session = get_session()
 
@@ -57,9 +269,142 @@ def get_username():
     return None
 
 
-def request(session=None, method="GET", url="", token=None, **kwargs):
+def get_self_matcher(selector):
+    return etree.XPath(GenericTranslator().css_to_xpath(selector, prefix='self::'))
+
+
+def read_until(resp, selectors, chunk_size=STREAM_CHUNK_SIZE):
+    # stop downloading once every selector matched a complete element; the partial body becomes
+    # the response content, so `resp.html` keeps working as usual
+    pending = [get_self_matcher(selector) for selector in selectors]
+    parser = etree.HTMLPullParser(events=('end',))
+    chunks = []
+
+    for chunk in resp.iter_content(chunk_size=chunk_size):
+        chunks.append(chunk)
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            pending = [matches for matches in pending if not matches(element)]
+        if not pending:
+            break
+
+    resp._content = b''.join(chunks)
+    resp._content_consumed = True
+    resp.close()
+    return resp
+
+
+class BufferedResponse:
+    # a body that was read whole, for parsers written against streamed responses
+    def __init__(self, content):
+        self.content = content
+
+    def iter_content(self, chunk_size=STREAM_CHUNK_SIZE):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+def iter_parse_events(resp, chunk_size=STREAM_CHUNK_SIZE):
+    parser = etree.HTMLPullParser(events=('start', 'end'))
+    # only the parser's own time counts, not the wait for the next chunk
+    parse_time = 0
+    try:
+        for chunk in resp.iter_content(chunk_size=chunk_size):
+            start = time.perf_counter()
+            parser.feed(chunk)
+            events = list(parser.read_events())
+            parse_time += time.perf_counter() - start
+            yield from events
+        parser.close()
+        yield from parser.read_events()
+    finally:
+        resp.close()
+        observe('parse_duration_seconds', parse_time, parser='stream_tables')
+
+
+def get_row_cells(row, is_header):
+    if is_header:
+        return [PyQuery(cell).text().strip().upper() for cell in row.iter('th', 'td')]
+    return [PyQuery(cell).text().strip() for cell in row.iter('td')]
+
+
+def stream_tables(resp, texts=None, chunk_size=STREAM_CHUNK_SIZE, last_table=None):
+    # parses the body as it downloads & yields `(index, data_rows)` (the rows `html_to_list` would
+    # build) as each table closes; rows are dropped from the tree once read, so memory stays flat
+    # however long the tables are. `texts` maps selectors to the text of their first match; with
+    # `last_table`, reading stops as soon as that table is yielded & every text is filled in
+    matchers = {selector: get_self_matcher(selector) for selector in (texts or {})}
+    open_tables = []
+    num_tables = 0
+    is_last_table_read = False
+
+    events = iter_parse_events(resp, chunk_size)
+    try:
+        for event, element in events:
+            if event == 'start':
+                if element.tag == 'table':
+                    open_tables.append((num_tables, []))
+                    num_tables += 1
+                continue
+
+            for selector, matches in list(matchers.items()):
+                if matches(element):
+                    texts[selector] = PyQuery(element).text()
+                    del matchers[selector]
+
+            if element.tag == 'tr' and open_tables:
+                for _, data_rows in open_tables:
+                    data_rows.append(get_row_cells(element, is_header=not data_rows))
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+            elif element.tag == 'table' and open_tables:
+                element.clear()
+                index, data_rows = open_tables.pop()
+                yield index, data_rows
+                if last_table is not None and index >= last_table:
+                    is_last_table_read = True
+
+            if is_last_table_read and not matchers:
+                return
+    finally:
+        events.close()
+
+
+def track_streamed_body(resp, on_done):
+    # a streamed body is read after `request` returns, so its size & the time it took are only
+    # known once it's read to the end or the response is closed, whichever comes first
+    iter_content, close = resp.iter_content, resp.close
+    state = {'num_bytes': 0, 'is_done': False}
+
+    def done():
+        if not state['is_done']:
+            state['is_done'] = True
+            on_done(state['num_bytes'])
+
+    def counted_iter_content(*args, **kwargs):
+        for chunk in iter_content(*args, **kwargs):
+            state['num_bytes'] += len(chunk)
+            yield chunk
+        done()
+
+    def close_and_record():
+        close()
+        done()
+
+    resp.iter_content = counted_iter_content
+    resp.close = close_and_record
+    return resp
+
+
+def prepare_request(session, method, url, token, kwargs):
+    # shared by `request` & `aio.arequest`: the session, the full url & the validator entry
+    # whose conditional headers are added to `kwargs`
     if not session:
-        session = get_session()
+        session = SHARED_SESSION['session'] or get_session()
     if token:
         session.headers = getattr(session, 'headers') or {}
         session.headers.update({'X-CSRF-Token': token})
@@ -67,21 +412,117 @@ def request(session=None, method="GET", url="", token=None, **kwargs):
     if BASE_URL not in url:
         url = f'{BASE_URL}{url}'
 
+    # entries are `(conditional headers, replay)`: the response itself, or for a streamed GET
+    # whatever its caller parsed from the body (see `keep_replay`)
+    cache_key, replay = None, None
+    if session is SHARED_SESSION['session'] and method == 'GET':
+        cache_key = get_cache_key(method, url, kwargs.get('params'))
+        headers, replay = SHARED_SESSION['validators'].get(cache_key, ({}, None))
+        if replay is not None:
+            kwargs['headers'] = {**headers, **kwargs.get('headers', {})}
+    return session, url, cache_key, replay
+
+
+def revalidate(resp, cache_key, replay, stream=False):
+    if cache_key is None:
+        return resp
+    validators = SHARED_SESSION['validators']
+    if resp.status_code == NOT_MODIFIED_STATUS_CODE and replay is not None:
+        if not stream:
+            return replay
+        resp.replay = copy.deepcopy(replay)
+    elif resp.status_code == 200 and get_conditional_headers(resp):
+        if stream:
+            validators.pop(cache_key, None)
+            resp.replay_key = cache_key
+        else:
+            validators[cache_key] = (get_conditional_headers(resp), resp)
+    return resp
+
+
+def request(session=None, method="GET", url="", token=None, until=None, stream=False,
+            **kwargs):
+    session, url, cache_key, replay = prepare_request(session, method, url, token, kwargs)
     try:
-        return session.request(method=method, url=url, timeout=(15, 15), **kwargs)
-    except (ConnectionError, ReadTimeout):
-        print(INTERNET_DOWN_MSG)
-        sys.exit(1)
+        start = time.perf_counter()
+        resp = TRANSPORT['transport'].send(
+            session, method, url, timeout=(15, 15), stream=stream or bool(until), **kwargs)
+        if stream or until:
+            def on_done(num_bytes):
+                elapsed = time.perf_counter() - start
+                record_request(method, url, resp, elapsed, num_bytes)
+                observe_request(method, url, resp.status_code, elapsed)
+
+            track_streamed_body(resp, on_done)
+            if until:
+                resp = read_until(resp, until)
+        else:
+            elapsed = time.perf_counter() - start
+            record_request(method, url, resp, elapsed)
+            observe_request(method, url, resp.status_code, elapsed)
+    except (ConnectionError, ReadTimeout) as e:
+        inc('http_errors_total', endpoint=get_endpoint_label(url), error=type(e).__name__)
+        raise NetworkError(INTERNET_DOWN_MSG) from e
+    return revalidate(resp, cache_key, replay, stream=stream)
+
+
+def keep_replay(resp, replay):
+    # the caller of a streamed GET keeps what it parsed from the body; a later request for the
+    # same page then revalidates & gets this back as `resp.replay` on a 304
+    cache_key = getattr(resp, 'replay_key', None)
+    if cache_key is not None:
+        SHARED_SESSION['validators'][cache_key] = (
+            get_conditional_headers(resp), copy.deepcopy(replay))
+
+
+def read_names(file_path):
+    # one name per line, `-` reads stdin; blank lines & duplicates are dropped
+    if file_path == '-':
+        lines = sys.stdin.readlines()
+    else:
+        with open(file_path) as f:
+            lines = f.readlines()
+
+    names = {}
+    for line in lines:
+        name = line.strip()
+        if name:
+            names[name] = True
+    return list(names)
+
+
+def open_db(db_path, schema, **connect_kwargs):
+    # the local sqlite stores live under CACHE_DIR; `:memory:` needs no directory
+    if db_path != ':memory:':
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+    conn = sqlite3.connect(db_path, **connect_kwargs)
+    conn.executescript(schema)
+    return conn
+
+
+def run_concurrently(func, items, num_workers=DEFAULT_NUM_WORKERS):
+    # results are returned in the order of `items`, whatever order the workers finish in
+    items = list(items)
+    if not items:
+        return []
+
+    with persistent_session(pool_size=num_workers):
+        with ThreadPoolExecutor(max_workers=min(num_workers, len(items))) as executor:
+            return list(executor.map(bind_session(func), items))
 
 
 def html_to_list(table):
     if not table:
         return []
 
+    start = time.perf_counter() if METRICS['enabled'] else None
     rows = table.find('tr')
     data_rows = [[header.text.strip().upper() for header in rows[0].find('th, td')]]
     for row in rows[1:]:
         data_rows.append([col.text.strip() for col in row.find('td')])
+    if start is not None:
+        observe('parse_duration_seconds', time.perf_counter() - start, parser='html_to_list')
     return data_rows
 
 
@@ -94,25 +535,89 @@ def get_col_max_lengths(data_rows, num_cols):
     return max_len_in_cols
 
 
-def print_table(data_rows, min_num_spaces=MIN_NUM_SPACES, is_pager=True):
-    if len(data_rows) == 0:
+def get_pager_command():
+    # returns the command & its environment, None to write straight to stdout; like pydoc, a
+    # terminal that can't page only pages with a pager that was asked for
+    env = os.environ
+    command = env.get('MANPAGER') or env.get('PAGER')
+    if command:
+        return command, None
+    if env.get('TERM') in ('dumb', 'emacs'):
+        return None
+    if shutil.which('less'):
+        # -R lets the styling through as colours instead of raw escape codes
+        return 'less', {**env, 'LESS': env.get('LESS', '-R')}
+    if shutil.which('more'):
+        return 'more', None
+    return None
+
+
+def wait_for_pager(proc):
+    while True:
+        try:
+            proc.wait()
+            return
+        except KeyboardInterrupt:
+            # the pager ignores ctrl-c itself; leaving before it exits keeps the terminal raw
+            pass
+
+
+@contextmanager
+def open_pager(is_pager=True):
+    # output is written into the pager's stdin as it's rendered, so the first lines show up right
+    # away and a full pipe holds the writer back until the pager reads on; off a terminal (pipes,
+    # batch buffers) it goes straight to stdout
+    pager = get_pager_command() if is_pager and sys.stdout.isatty() else None
+    if not pager:
+        yield sys.stdout
         return
 
-    max_len_in_cols = get_col_max_lengths(data_rows, len(data_rows[0]))
+    if sys.platform == 'win32':
+        # pipes into a pager are broken on windows; pydoc pages the whole text through a file
+        output = io.StringIO()
+        yield output
+        pydoc.pager(output.getvalue())
+        return
 
-    table = []
+    command, env = pager
+    sys.stdout.flush()
+    proc = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE, text=True,
+                            errors='backslashreplace', env=env)
+    try:
+        yield proc.stdin
+    except (BrokenPipeError, KeyboardInterrupt):
+        # the pager was quit (or ctrl-c hit) before everything was written; the rest isn't rendered
+        pass
+    finally:
+        try:
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        wait_for_pager(proc)
+
+
+def render_table(data_rows, min_num_spaces=MIN_NUM_SPACES):
+    max_len_in_cols = get_col_max_lengths(data_rows, len(data_rows[0]))
     for row in data_rows:
         _row = []
         for index, val in enumerate(row):
             num_spaces = max_len_in_cols[index] - len(val) + min_num_spaces
             _row.append(val + (num_spaces * ' '))
-        table.append("".join(_row))
+        yield "".join(_row)
+
 
-    table_str = '\n\n'.join(table)
-    if is_pager:
-        pager(table_str)
-    print(table_str)
-    return table_str
+def print_table(data_rows, min_num_spaces=MIN_NUM_SPACES, is_pager=True):
+    if len(data_rows) == 0:
+        return
+
+    table = []
+    with open_pager(is_pager) as output:
+        for line in render_table(data_rows, min_num_spaces):
+            output.write(f'\n\n{line}' if table else line)
+            table.append(line)
+        output.write('\n')
+    inc('rows_rendered_total', len(table))
+    return '\n\n'.join(table)
 
 
 def style_text(text, color=None):
@@ -133,10 +638,9 @@ def print_response_util(data, extra, data_type, color, is_pager=True):
         if data_type == 'table':
             return_val = print_table(data, is_pager=is_pager)
         elif data_type == 'text':
-            if is_pager:
-                pager(style_text(data, color))
             return_val = style_text(data, color)
-            print(return_val)
+            with open_pager(is_pager) as output:
+                output.write(f'{return_val}\n')
 
     styled_extra = None
     if extra is not None:
@@ -160,7 +664,7 @@ def print_response(data_type='text', code=200, data=None, extra=None, **kwargs):
         color = 'FAIL'
 
     is_pager = False
-    if not hasattr(kwargs, 'is_pager') and data_type == 'table':
+    if 'is_pager' not in kwargs and data_type == 'table':
         is_pager = True
     else:
         is_pager = kwargs.get('is_pager', False)
@@ -0,0 +1,133 @@
+from requests import ReadTimeout, Response
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+from requests_html import HTMLResponse
+
+from codechefcli.helpers import set_transport
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+HTTP2_MISSING_MSG = 'HTTP/2 needs httpx with h2: `pip install httpx[http2]`. Using HTTP/1.1.'
+HTTP2_MAX_CONNECTIONS = 4
+
+
+def is_http2_available():
+    if httpx is None:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HttpxRaw:
+    # the bits of urllib3's response that `requests` & the stats use: streaming & wire bytes
+    def __init__(self, resp):
+        self.resp = resp
+
+    def stream(self, chunk_size, decode_content=True):
+        yield from self.resp.iter_bytes(chunk_size)
+
+    def read(self, amt=None, decode_content=True):
+        return self.resp.read()
+
+    def tell(self):
+        return self.resp.num_bytes_downloaded
+
+    def close(self):
+        self.resp.close()
+
+
+def to_html_response(resp, session, stream):
+    converted = Response()
+    converted.status_code = resp.status_code
+    converted.reason = resp.reason_phrase
+    converted.headers = CaseInsensitiveDict(resp.headers.items())
+    converted.url = str(resp.url)
+    converted.encoding = resp.encoding
+    converted.raw = HttpxRaw(resp)
+    if not stream:
+        converted._content = resp.read()
+        converted._content_consumed = True
+        if not resp.is_closed:
+            resp.close()
+    return HTMLResponse._from_response(converted, session)
+
+
+def get_timeout(timeout):
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def build_request(client, session, method, url, timeout=None, params=None, data=None,
+                  headers=None, **kwargs):
+    if client.cookies.jar is not session.cookies:
+        client.cookies = session.cookies
+
+    content = None
+    if data is not None and not isinstance(data, dict):
+        content, data = data, None
+
+    return client.build_request(
+        method, url, params=params, data=data, content=content,
+        headers={**session.headers, **(headers or {})}, timeout=get_timeout(timeout), **kwargs)
+
+
+class Http2Transport:
+    # every concurrent request to BASE_URL becomes a stream on one multiplexed TLS connection,
+    # instead of a connection per worker thread
+    def __init__(self, max_connections=HTTP2_MAX_CONNECTIONS):
+        self.client = httpx.Client(
+            http2=True, limits=httpx.Limits(max_connections=max_connections))
+
+    def send(self, session, method, url, allow_redirects=True, stream=False, **kwargs):
+        req = build_request(self.client, session, method, url, **kwargs)
+        try:
+            resp = self.client.send(req, stream=True, follow_redirects=allow_redirects)
+        except httpx.TimeoutException as e:
+            raise ReadTimeout(e)
+        except httpx.TransportError as e:
+            raise ConnectionError(e)
+        return to_html_response(resp, session, stream)
+
+    def close(self):
+        self.client.close()
+
+
+class AsyncHttpxTransport:
+    # the async transport of `aio.arequest`: requests are awaited on the event loop instead of
+    # holding a worker thread each. The client's connections belong to the loop that opened them,
+    # so create & close it inside that loop
+    def __init__(self, http2=None, max_connections=HTTP2_MAX_CONNECTIONS):
+        if http2 is None:
+            http2 = is_http2_available()
+        self.client = httpx.AsyncClient(
+            http2=http2, limits=httpx.Limits(max_connections=max_connections))
+
+    async def send(self, session, method, url, allow_redirects=True, stream=False, **kwargs):
+        req = build_request(self.client, session, method, url, **kwargs)
+        try:
+            resp = await self.client.send(req, follow_redirects=allow_redirects)
+        except httpx.TimeoutException as e:
+            raise ReadTimeout(e)
+        except httpx.TransportError as e:
+            raise ConnectionError(e)
+        # the body is read on the loop, so `stream` only keeps `iter_content` working on it
+        return to_html_response(resp, session, stream=False)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def use_http2():
+    if not is_http2_available():
+        return None
+    transport = Http2Transport()
+    set_transport(transport)
+    return transport
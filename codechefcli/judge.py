@@ -0,0 +1,183 @@
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from requests_html import HTML
+
+from codechefcli.helpers import style_text
+from codechefcli.problems import CC_PRACTICE, get_problem_json
+
+DEFAULT_TIME_LIMIT = 1.0
+COMPILE_TIMEOUT = 60
+JUDGE_TABLE_HEADINGS = ['CASE', 'VERDICT', 'TIME (S)', 'MEMORY (KB)']
+SAMPLE_MARKDOWN_REGEX = re.compile(
+    r'sample\s+input[^\n]*\n+```[^\n]*\n(.*?)```.*?sample\s+output[^\n]*\n+```[^\n]*\n(.*?)```',
+    re.IGNORECASE | re.DOTALL)
+SAMPLE_PRE_REGEX = re.compile(r'input:?(.*?)output:?(.*)', re.IGNORECASE | re.DOTALL)
+
+# compile & run commands per language; `{src}`, `{exe}`, `{dir}` and `{name}` are filled in
+LANGUAGES = {
+    'c': (['gcc', '-O2', '-o', '{exe}', '{src}', '-lm'], ['{exe}']),
+    'c++': (['g++', '-O2', '-std=c++17', '-o', '{exe}', '{src}'], ['{exe}']),
+    'cpp': (['g++', '-O2', '-std=c++17', '-o', '{exe}', '{src}'], ['{exe}']),
+    'java': (['javac', '-d', '{dir}', '{src}'], ['java', '-cp', '{dir}', '{name}']),
+    'python': (None, [sys.executable, '{src}']),
+    'python3': (None, [sys.executable, '{src}']),
+    'pypy3': (None, ['pypy3', '{src}']),
+    'go': (['go', 'build', '-o', '{exe}', '{src}'], ['{exe}']),
+    'rust': (['rustc', '-O', '-o', '{exe}', '{src}'], ['{exe}']),
+}
+
+
+def get_sample_cases(problem_json):
+    components = problem_json.get('problemComponents') or {}
+    cases = [
+        (case.get('input', ''), case.get('output', ''))
+        for case in components.get('sampleTestCases') or []
+    ]
+    if cases:
+        return cases
+
+    body = problem_json.get('body') or ''
+    cases = SAMPLE_MARKDOWN_REGEX.findall(body)
+    if cases:
+        return cases
+
+    for pre in HTML(html=body or '<html />').find('pre'):
+        match = SAMPLE_PRE_REGEX.search(pre.text)
+        if match:
+            cases.append(match.groups())
+    return cases
+
+
+def fill_command(command, values):
+    return [part.format(**values) for part in command]
+
+
+def is_same_output(output, expected):
+    return output.split() == expected.split()
+
+
+def get_exit_code(status):
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def run_case(run_cmd, case, time_limit, cwd):
+    case_input, expected = case
+    with tempfile.TemporaryFile() as stdin, tempfile.TemporaryFile() as stdout:
+        stdin.write(case_input.strip().encode('utf-8') + b'\n')
+        stdin.seek(0)
+
+        start = time.perf_counter()
+        try:
+            proc = subprocess.Popen(
+                run_cmd, stdin=stdin, stdout=stdout, stderr=subprocess.DEVNULL, cwd=cwd)
+        except OSError:
+            return 'RTE', 0.0, None
+        timer = threading.Timer(time_limit, proc.kill)
+        timer.start()
+        try:
+            memory = None
+            if hasattr(os, 'wait4'):
+                # wait4 gives the resource usage of this very child, unlike RUSAGE_CHILDREN
+                _, status, usage = os.wait4(proc.pid, 0)
+                proc.returncode = get_exit_code(status)
+                memory = usage.ru_maxrss if sys.platform != 'darwin' else usage.ru_maxrss // 1024
+            else:
+                proc.wait()
+        finally:
+            timer.cancel()
+        elapsed = time.perf_counter() - start
+
+        stdout.seek(0)
+        output = stdout.read().decode('utf-8', errors='replace')
+
+    if elapsed >= time_limit:
+        verdict = 'TLE'
+    elif proc.returncode != 0:
+        verdict = 'RTE'
+    elif is_same_output(output, expected):
+        verdict = 'AC'
+    else:
+        verdict = 'WA'
+    return verdict, elapsed, memory
+
+
+def compile_solution(language, solution_file, build_dir):
+    compile_cmd, run_cmd = LANGUAGES[language]
+    src = os.path.join(build_dir, os.path.basename(solution_file))
+    shutil.copyfile(solution_file, src)
+
+    values = {
+        'src': src,
+        'exe': os.path.join(build_dir, 'solution'),
+        'dir': build_dir,
+        'name': os.path.splitext(os.path.basename(solution_file))[0]
+    }
+    if compile_cmd:
+        try:
+            proc = subprocess.run(fill_command(compile_cmd, values), stdout=subprocess.PIPE,
+                                  stderr=subprocess.STDOUT, timeout=COMPILE_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return None, str(e)
+        if proc.returncode != 0:
+            return None, proc.stdout.decode('utf-8', errors='replace')
+    return fill_command(run_cmd, values), None
+
+
+def judge_solution(solution_file, language, cases, time_limit=DEFAULT_TIME_LIMIT, num_workers=None):
+    language = language.lower()
+    if language not in LANGUAGES:
+        return [{'code': 400, 'data': f"Local judge supports: {', '.join(sorted(LANGUAGES))}"}]
+    if not os.path.exists(solution_file):
+        return [{'code': 400, 'data': 'Solution file not found.'}]
+    if not cases:
+        return [{'code': 404, 'data': 'No sample test cases found in the problem statement.'}]
+
+    build_dir = tempfile.mkdtemp(prefix='codechefcli-')
+    try:
+        run_cmd, compile_error = compile_solution(language, solution_file, build_dir)
+        if compile_error is not None:
+            return [{'data': style_text(f'Compilation error.\n{compile_error}', 'FAIL')}]
+
+        # compiled once, samples run in parallel as separate processes
+        num_workers = num_workers or os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=min(num_workers, len(cases))) as executor:
+            results = list(executor.map(
+                lambda case: run_case(run_cmd, case, time_limit, build_dir), cases))
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    data_rows = [JUDGE_TABLE_HEADINGS]
+    for index, (verdict, elapsed, memory) in enumerate(results):
+        data_rows.append([
+            str(index + 1), verdict, f'{elapsed:.3f}', '-' if memory is None else str(memory)])
+
+    num_passed = len([result for result in results if result[0] == 'AC'])
+    color = 'GREEN' if num_passed == len(results) else 'FAIL'
+    return [
+        {'data': data_rows, 'data_type': 'table', 'is_pager': False},
+        {'data': style_text(f'\n{num_passed}/{len(results)} sample cases passed.', color)}
+    ]
+
+
+def judge_problem(problem_code, solution_file, language, contest_code=CC_PRACTICE):
+    problem_json = get_problem_json(problem_code, contest_code)
+    if problem_json is None:
+        return [{'code': 503}]
+    if problem_json.get('status') != 'success':
+        return [{'code': 404, 'data': 'Problem not found.'}]
+
+    try:
+        time_limit = float(problem_json.get('max_timelimit'))
+    except (TypeError, ValueError):
+        time_limit = DEFAULT_TIME_LIMIT
+    return judge_solution(solution_file, language, get_sample_cases(problem_json), time_limit)
@@ -0,0 +1,155 @@
+import os
+import socket
+import threading
+from bisect import bisect_right
+from urllib.parse import urlparse
+
+METRICS_PREFIX = 'codechefcli'
+# seconds; requests time out after 15s
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15)
+STATSD_MAX_PACKET_SIZE = 1432
+
+# off by default: every recording function returns right away until `enable_metrics` is called
+METRICS = {'enabled': False, 'counters': {}, 'histograms': {}}
+METRICS_LOCK = threading.Lock()
+
+
+def enable_metrics():
+    METRICS['enabled'] = True
+
+
+def reset_metrics():
+    with METRICS_LOCK:
+        METRICS['enabled'] = False
+        METRICS['counters'] = {}
+        METRICS['histograms'] = {}
+
+
+def get_key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    if not METRICS['enabled']:
+        return
+    key = get_key(name, labels)
+    with METRICS_LOCK:
+        METRICS['counters'][key] = METRICS['counters'].get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    # histograms keep the observations themselves: prometheus gets buckets, statsd the values
+    if not METRICS['enabled']:
+        return
+    key = get_key(name, labels)
+    with METRICS_LOCK:
+        METRICS['histograms'].setdefault(key, []).append(value)
+
+
+def get_endpoint_label(url):
+    # `/users/<name>` or `/api/contests/<code>/...` would be a label per page; keep the route
+    segments = [segment for segment in urlparse(url).path.split('/') if segment]
+    num_segments = 2 if segments[:1] == ['api'] else 1
+    return '/' + '/'.join(segments[:num_segments])
+
+
+def observe_request(method, url, status, elapsed):
+    if not METRICS['enabled']:
+        return
+    endpoint = get_endpoint_label(url)
+    inc('http_requests_total', method=method, endpoint=endpoint, status=str(status))
+    observe('http_request_duration_seconds', elapsed, endpoint=endpoint)
+
+
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label_value(value)}"' for name, value in labels) + '}'
+
+
+def to_prometheus():
+    with METRICS_LOCK:
+        counters = sorted(METRICS['counters'].items())
+        histograms = sorted(METRICS['histograms'].items())
+
+    lines = []
+    typed = set()
+    for (name, labels), value in counters:
+        name = f'{METRICS_PREFIX}_{name}'
+        if name not in typed:
+            lines.append(f'# TYPE {name} counter')
+            typed.add(name)
+        lines.append(f'{name}{format_labels(labels)} {value}')
+
+    for (name, labels), values in histograms:
+        name = f'{METRICS_PREFIX}_{name}'
+        if name not in typed:
+            lines.append(f'# TYPE {name} histogram')
+            typed.add(name)
+        values = sorted(values)
+        for bound in DURATION_BUCKETS:
+            num_values = bisect_right(values, bound)
+            lines.append(f'{name}_bucket{format_labels(labels + (("le", str(bound)),))} '
+                         f'{num_values}')
+        lines.append(f'{name}_bucket{format_labels(labels + (("le", "+Inf"),))} {len(values)}')
+        lines.append(f'{name}_sum{format_labels(labels)} {sum(values)}')
+        lines.append(f'{name}_count{format_labels(labels)} {len(values)}')
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def write_prometheus(file_path):
+    # node_exporter's textfile collector may read at any time, so the file is replaced whole
+    tmp_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(to_prometheus())
+    os.replace(tmp_path, file_path)
+
+
+def format_statsd_tags(labels):
+    return '|#' + ','.join(f'{name}:{value}' for name, value in labels) if labels else ''
+
+
+def to_statsd_lines():
+    # DogStatsD tags (`|#name:value`) carry the labels; durations are sent as timers in ms
+    with METRICS_LOCK:
+        counters = sorted(METRICS['counters'].items())
+        histograms = sorted(METRICS['histograms'].items())
+
+    lines = []
+    for (name, labels), value in counters:
+        lines.append(f'{METRICS_PREFIX}.{name}:{value}|c{format_statsd_tags(labels)}')
+    for (name, labels), values in histograms:
+        for value in values:
+            lines.append(
+                f'{METRICS_PREFIX}.{name}:{round(value * 1000, 3)}|ms{format_statsd_tags(labels)}')
+    return lines
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(':')
+    return host or 'localhost', int(port)
+
+
+def send_statsd(address):
+    # UDP to a (host, port) pair, fire & forget: a collector that is down never slows us down
+    lines = to_statsd_lines()
+    packets, packet = [], ''
+    for line in lines:
+        if packet and len(packet) + len(line) + 1 > STATSD_MAX_PACKET_SIZE:
+            packets.append(packet)
+            packet = ''
+        packet = f'{packet}\n{line}' if packet else line
+    if packet:
+        packets.append(packet)
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for packet in packets:
+            try:
+                sock.sendto(packet.encode('utf-8'), address)
+            except OSError:
+                pass
+    return len(packets)
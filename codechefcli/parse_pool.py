@@ -0,0 +1,37 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+PARSE_POOL = {'executor': None}
+
+
+def get_default_num_processes():
+    return os.cpu_count() or 1
+
+
+def start_parse_pool(num_processes=None):
+    # spawned, not forked: the pool starts while fetch threads may hold locks
+    shutdown_parse_pool()
+    PARSE_POOL['executor'] = ProcessPoolExecutor(
+        max_workers=num_processes or get_default_num_processes(),
+        mp_context=multiprocessing.get_context('spawn'))
+    return PARSE_POOL['executor']
+
+
+def shutdown_parse_pool():
+    executor, PARSE_POOL['executor'] = PARSE_POOL['executor'], None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def is_parse_pool_running():
+    return PARSE_POOL['executor'] is not None
+
+
+def parse_content(parser, content, *args):
+    # `parser` gets the raw body & returns plain rows/dicts; in the pool only bytes & rows cross
+    # the process boundary while the fetching thread waits for its page without holding the GIL
+    executor = PARSE_POOL['executor']
+    if executor is None:
+        return parser(content, *args)
+    return executor.submit(parser, content, *args).result()
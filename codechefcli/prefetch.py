@@ -0,0 +1,162 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from codechefcli.cache import get_cached, set_cached
+from codechefcli.helpers import CACHE_DIR, NetworkError, persistent_session
+from codechefcli.problems import (PREFETCH_CACHE_NAMESPACE, PREFETCH_CACHE_TTL,
+                                  get_ratings_csrf_token, get_ratings_filter, get_ratings_json,
+                                  get_ratings_prefetch_key, get_solutions_page,
+                                  get_solutions_params, get_solutions_prefetch_key)
+
+PREFETCH_PID_PATH = f'{CACHE_DIR}/prefetch.pid'
+PREFETCH_DEFAULT_PAGES = 2
+PREFETCH_MAX_PAGES = 5
+# pause between prefetch requests, so reading ahead never bursts against the site's rate limits
+PREFETCH_DELAY = 1.0
+
+
+def is_prefetched(key):
+    return get_cached(PREFETCH_CACHE_NAMESPACE, key, ttl=PREFETCH_CACHE_TTL) is not None
+
+
+def prefetch_solutions(problem_code, page, language, result, username, num_pages,
+                       delay=PREFETCH_DELAY):
+    # the filters page is read once; later pages only differ in the page param
+    params = get_solutions_params(problem_code, 1, language, result, username)
+    if params is None:
+        return 0
+
+    num_fetched = 0
+    for next_page in range(page + 1, page + 1 + num_pages):
+        key = get_solutions_prefetch_key(problem_code, next_page, language, result, username)
+        if is_prefetched(key):
+            continue
+
+        time.sleep(delay)
+        code, data_rows, page_info = get_solutions_page(
+            problem_code, {**params, 'page': next_page - 1})
+        # past the last page the table only has its headings
+        if code != 200 or len(data_rows) <= 1:
+            break
+        set_cached(PREFETCH_CACHE_NAMESPACE, key, [code, data_rows, page_info])
+        num_fetched += 1
+    return num_fetched
+
+
+def prefetch_ratings(country, institution, institution_type, page, lines, num_pages,
+                     delay=PREFETCH_DELAY):
+    filter_by = get_ratings_filter(country, institution, institution_type)
+    csrf_token = None
+
+    num_fetched = 0
+    for next_page in range(page + 1, page + 1 + num_pages):
+        key = get_ratings_prefetch_key(filter_by, next_page, lines)
+        if is_prefetched(key):
+            continue
+
+        if csrf_token is None:
+            csrf_token = get_ratings_csrf_token()
+            if csrf_token is None:
+                break
+
+        time.sleep(delay)
+        ratings = get_ratings_json(csrf_token, filter_by, next_page, lines)
+        if not ratings or not ratings.get('list'):
+            break
+        set_cached(PREFETCH_CACHE_NAMESPACE, key, ratings)
+        num_fetched += 1
+    return num_fetched
+
+
+PREFETCHERS = {
+    'solutions': prefetch_solutions,
+    'ratings': prefetch_ratings,
+}
+
+
+def read_pid():
+    try:
+        with open(PREFETCH_PID_PATH) as f:
+            return int(f.read().strip())
+    except (IOError, ValueError):
+        return None
+
+
+def is_prefetch_running():
+    # a running worker holds a lock on the pid file, so a pid left over by one that died (and maybe
+    # reused by another process since) is never signalled
+    if fcntl is None:
+        return False
+    try:
+        with open(PREFETCH_PID_PATH) as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(f, fcntl.LOCK_UN)
+            return False
+    except IOError:
+        return False
+
+
+def cancel_prefetch():
+    # only one prefetch runs at a time; starting a new one stops the one before it
+    pid = read_pid()
+    if pid is None or pid == os.getpid() or not is_prefetch_running():
+        return False
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except OSError:
+        return False
+    return True
+
+
+def start_prefetch(kind, args, num_pages=PREFETCH_DEFAULT_PAGES):
+    # the pages are fetched by a detached process, so the command returns right away
+    cancel_prefetch()
+    num_pages = min(num_pages, PREFETCH_MAX_PAGES)
+    if num_pages <= 0:
+        return None
+    return subprocess.Popen(
+        [sys.executable, '-m', 'codechefcli.prefetch', kind, json.dumps(args), str(num_pages)],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True)
+
+
+def stop_prefetch(signum, frame):
+    # unwinds through `run_prefetch`, which clears the pid file on the way out
+    sys.exit(0)
+
+
+def run_prefetch(kind, args, num_pages):
+    signal.signal(signal.SIGTERM, stop_prefetch)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # the file is truncated rather than removed on exit, so a worker waiting for the lock never
+    # ends up writing its pid into a file that is no longer there
+    with open(PREFETCH_PID_PATH, 'a+') as pid_file:
+        if fcntl is not None:
+            fcntl.flock(pid_file, fcntl.LOCK_EX)
+        pid_file.truncate(0)
+        pid_file.write(str(os.getpid()))
+        pid_file.flush()
+
+        try:
+            with persistent_session():
+                return PREFETCHERS[kind](*args, num_pages=min(num_pages, PREFETCH_MAX_PAGES))
+        except NetworkError:
+            return 0
+        finally:
+            pid_file.truncate(0)
+
+
+if __name__ == '__main__':
+    run_prefetch(sys.argv[1], json.loads(sys.argv[2]), int(sys.argv[3]))
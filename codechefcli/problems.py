@@ -1,54 +1,90 @@
 import math
+import os
 import re
 
 from requests_html import HTML
 
 from codechefcli.auth import is_logged_in
+from codechefcli.cache import pop_cached
+from codechefcli.contests import (CONTEST_TABLE_HEADINGS, get_contest_rows, get_db, is_stale,
+                                  query_contests, sync_contests)
 from codechefcli.decorators import login_required, sort_it
-from codechefcli.helpers import (BASE_URL, CSRF_TOKEN_INPUT_ID, SERVER_DOWN_MSG, get_csrf_token,
-                                 html_to_list, request, style_text)
-
+from codechefcli.helpers import (BASE_URL, CSRF_TOKEN_INPUT_ID, DEFAULT_NUM_WORKERS,
+                                 NOT_MODIFIED_STATUS_CODE, SERVER_DOWN_MSG, BufferedResponse,
+                                 MultipartFileStream, get_csrf_token, html_to_list, keep_replay,
+                                 request, run_concurrently, stream_tables, style_text)
+from codechefcli.parse_pool import is_parse_pool_running, parse_content
+from codechefcli.statements import check_statement
+
+CC_PRACTICE = "PRACTICE"
+SEARCH_TYPES = ['school', 'easy', 'medium', 'hard', 'challenge', 'extcontest']
 LANGUAGE_SELECTOR = "#language"
 INVALID_PROBLEM_CODE_MSG = 'Invalid Problem Code.'
 PAGE_INFO_CLASS = '.pageinfo'
 PROBLEM_SUBMISSION_FORM_ID = '#problem-submission'
 PROBLEM_SUB_DATA_FORM_ID = 'problem_submission'
+SOURCE_FILE_FIELD = 'files[sourcefile]'
 PROBLEM_SUBMISSION_INPUT_ID = '#edit-problem-submission-form-token'
 LANGUAGE_DROPDOWN_ID = '#edit-language'
 COMPILATION_ERROR_CLASS = '.cc-error-txt'
 PROBLEM_LIST_TABLE_HEADINGS = ['CODE', 'NAME', 'SUBMISSION', 'ACCURACY']
 RESULT_CODES = {'AC': 15, 'WA': 14, 'TLE': 13, 'RTE': 12, 'CTE': 11}
 RATINGS_TABLE_HEADINGS = ['GLOBAL(COUNTRY)', 'USER NAME', 'RATING', 'GAIN/LOSS']
+CONTESTS_PROBLEMS_TABLE_HEADINGS = [
+    'CONTEST', 'NAME', 'CODE', 'URL', 'SUCCESSFUL SUBMISSIONS', 'ACCURACY', 'SCORABLE?']
+CONTEST_RANGE_MAX_SIZE = 200
+RATINGS_URL = '/api/ratings/all?sortBy=global_rank&order=asc'
 SOLUTION_ERR_MSG_CLASS = '.err-message'
 INVALID_SOLUTION_ID_MSG = "Invalid solution ID"
 
+# the solutions table ends before the pagination block, so stop reading there
+SOLUTIONS_FILTERS_STREAM_UNTIL = [LANGUAGE_SELECTOR]
+SOLUTIONS_TABLE_INDEX = 2
+
+# pages fetched ahead by `--prefetch`; each is served once, then requested live again
+PREFETCH_CACHE_NAMESPACE = 'prefetch'
+PREFETCH_CACHE_TTL = 10 * 60
 
-def get_description(problem_code, contest_code):
-    url = f'/api/contests/{contest_code}/problems/{problem_code}'
-    resp = request(url=url)
 
+def get_problem_description(resp_json):
+    problem = {
+        'Name: ': resp_json.get('problem_name', ''),
+        "Author: " : resp_json.get('problem_author', ''),
+        "Date Added: " : resp_json.get('date_added', ''),
+        "Max Time Limit: ": f"{resp_json.get('max_timelimit', '')} secs",
+        "Source Limit: " : f"{resp_json.get('source_sizelimit', '')} Bytes",
+        "Languages: " : resp_json.get('languages_supported', ''),
+        "Description: ":  resp_json.get("body", ''), #re.sub(r'(<|<\/)\w+>', '',
+    }
+    if resp_json.get('tags'):
+        problem['Tags: ']= " ".join([tag.text for tag in HTML(html=resp_json['tags']).find('a')])
+        
+    if resp_json.get('editorial_url'):
+        problem['Editorial: '] = resp_json['editorial_url']
+
+    return problem
+
+
+def get_problem_json(problem_code, contest_code=CC_PRACTICE):
+    resp = request(url=f'/api/contests/{contest_code}/problems/{problem_code}')
     try:
         resp_json = resp.json()
     except ValueError:
+        return None
+
+    # every fetched statement is hashed, so `--changed-since` sees it however it was read
+    if resp_json.get('status') == 'success':
+        check_statement(contest_code, problem_code, get_problem_description(resp_json))
+    return resp_json
+
+
+def get_description(problem_code, contest_code):
+    resp_json = get_problem_json(problem_code, contest_code)
+    if resp_json is None:
         return [{'code': 503}]
 
     if resp_json["status"] == "success":
-        problem = {
-            'Name: ': resp_json.get('problem_name', ''),
-            "Author: " : resp_json.get('problem_author', ''),
-            "Date Added: " : resp_json.get('date_added', ''),
-            "Max Time Limit: ": f"{resp_json.get('max_timelimit', '')} secs",
-            "Source Limit: " : f"{resp_json.get('source_sizelimit', '')} Bytes",
-            "Languages: " : resp_json.get('languages_supported', ''),
-            "Description: ":  resp_json.get("body", ''), #re.sub(r'(<|<\/)\w+>', '',
-        }
-        if resp_json.get('tags'):
-            problem['Tags: ']= " ".join([tag.text for tag in HTML(html=resp_json['tags']).find('a')])
-        
-        if resp_json.get('editorial_url'):
-            problem['Editorial: '] = resp_json['editorial_url']
-
-        return problem
+        return get_problem_description(resp_json)
     elif resp_json["status"] == "error":
         problem= {
             'data: ': 'Problem not found. Use `--search` to search in a specific contest',
@@ -58,6 +94,13 @@ def get_description(problem_code, contest_code):
     return [{'code': 503}]
 
 
+def get_source_size_limit(problem_code, contest_code=CC_PRACTICE):
+    try:
+        return int(get_problem_json(problem_code, contest_code)['source_sizelimit'])
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
 def get_form_token(rhtml):
     form = rhtml.find(PROBLEM_SUBMISSION_FORM_ID, first=True)
     inp = form and form.find(PROBLEM_SUBMISSION_INPUT_ID, first=True)
@@ -87,13 +130,13 @@ def get_language_code(rhtml, language):
             return dict(option.element.items())['value']
 
 
-@login_required
-def submit_problem(problem_code, solution_file, language):
+def submit_solution(problem_code, solution_file, language, on_progress=None):
+    on_progress = on_progress or (lambda message: None)
     url = f'/submit/{problem_code}'
     get_resp = request(url=url)
 
     if not is_logged_in(get_resp):
-        return [{"code": 401, "data": "This session has been disconnected. Login again."}]
+        return {"code": 401, "data": "This session has been disconnected. Login again."}
 
     if get_resp.status_code == 200:
         rhtml = get_resp.html
@@ -102,14 +145,22 @@ def submit_problem(problem_code, solution_file, language):
         csrf_token = get_csrf_token(rhtml, CSRF_TOKEN_INPUT_ID)
 
         if language_code is None:
-            return [{'code': 400, 'data': 'Invalid language.'}]
+            return {'code': 400, 'data': 'Invalid language.'}
     else:
-        return [{'code': 503}]
+        return {'code': 503}
 
     try:
-        solution_file_obj = open(solution_file)
-    except IOError:
-        return [{'data': 'Solution file not found.', 'code': 400}]
+        solution_size = os.path.getsize(solution_file)
+    except OSError:
+        return {'data': 'Solution file not found.', 'code': 400}
+
+    source_size_limit = get_source_size_limit(problem_code)
+    if source_size_limit and solution_size > source_size_limit:
+        return {
+            'data': f'Solution file is too large ({solution_size} Bytes). '
+                    f'Source limit: {source_size_limit} Bytes.',
+            'code': 400
+        }
 
     data = {
         'language': language_code,
@@ -117,15 +168,19 @@ def submit_problem(problem_code, solution_file, language):
         'form_id': PROBLEM_SUB_DATA_FORM_ID,
         'form_token': form_token
     }
-    files = {'files[sourcefile]': solution_file_obj}
 
-    post_resp = request(method='POST', url=url, data=data, files=files)
+    try:
+        with MultipartFileStream(data, SOURCE_FILE_FIELD, solution_file) as body:
+            post_resp = request(method='POST', url=url, data=body,
+                                headers={'Content-Type': body.content_type})
+    except IOError:
+        return {'data': 'Solution file not found.', 'code': 400}
     if post_resp.status_code == 200:
-        print(style_text('Submitting code...\n', 'BLUE'))
+        on_progress('Submitting code...\n')
 
         status_code = post_resp.url.split('/')[-1]
         url = f'/get_submission_status/{status_code}'
-        print(style_text('Fetching results...\n', 'BLUE'))
+        on_progress('Fetching results...\n')
 
         max_tries = 3
         num_tries = 0
@@ -137,41 +192,56 @@ def submit_problem(problem_code, solution_file, language):
                 status_json = resp.json()
             except ValueError:
                 if num_tries == max_tries:
-                    return [{'code': 503}]
+                    return {'code': 503}
                 continue
 
-            result_code = status_json['result_code']
-
-            if result_code != 'wait':
-                data = ''
-                if result_code == 'compile':
-                    error_msg = get_compilation_error(status_code)
-                    data = style_text(f'Compilation error.\n{error_msg}', 'FAIL')
-                elif result_code == 'runtime':
-                    data = style_text(f"Runtime error. {status_json.get('signal', '')}\n", 'FAIL')
-                elif result_code == 'wrong':
-                    data = style_text('Wrong answer\n', 'FAIL')
-                elif result_code == 'accepted':
-                    data = 'Correct answer\n'
-
-                resps = [{'data': data}]
-                status_table = get_status_table(status_code)
-                if status_table:
-                    resps.append({'data_type': 'table', 'data': html_to_list(status_table)})
-                return resps
-            else:
-                print(style_text('Waiting...\n', 'BLUE'))
-    return [{'code': 503}]
-
+            if status_json['result_code'] != 'wait':
+                return {'data': {'status_code': status_code, 'status': status_json}}
+            on_progress('Waiting...\n')
+    return {'code': 503}
 
-@sort_it
-def get_contest_problems(sort, order, contest_code):
-    url = f'/api/contests/{contest_code}?'
-    resp = request(url=url)
 
+@login_required
+def submit_problem(problem_code, solution_file, language):
+    resp = submit_solution(problem_code, solution_file, language,
+                           on_progress=lambda message: print(style_text(message, 'BLUE')))
+    if resp.get('code', 200) != 200:
+        return [resp]
+
+    status_code = resp['data']['status_code']
+    status_json = resp['data']['status']
+    result_code = status_json['result_code']
+
+    data = ''
+    if result_code == 'compile':
+        error_msg = get_compilation_error(status_code)
+        data = style_text(f'Compilation error.\n{error_msg}', 'FAIL')
+    elif result_code == 'runtime':
+        data = style_text(f"Runtime error. {status_json.get('signal', '')}\n", 'FAIL')
+    elif result_code == 'wrong':
+        data = style_text('Wrong answer\n', 'FAIL')
+    elif result_code == 'accepted':
+        data = 'Correct answer\n'
+
+    resps = [{'data': data}]
+    status_table = get_status_table(status_code)
+    if status_table:
+        resps.append({'data_type': 'table', 'data': html_to_list(status_table)})
+    return resps
+
+
+def get_contest_json(contest_code):
+    resp = request(url=f'/api/contests/{contest_code}?')
     try:
-        resp_json = resp.json()
+        return resp.json()
     except ValueError:
+        return None
+
+
+@sort_it
+def get_contest_problems(sort, order, contest_code):
+    resp_json = get_contest_json(contest_code)
+    if resp_json is None:
         return [{"code": 503}]
 
     if resp_json['status'] == "success":
@@ -199,12 +269,78 @@ def get_contest_problems(sort, order, contest_code):
     return [{"code": 503}]
 
 
+def get_contest_range(prefix, start, end):
+    return [f'{prefix.upper()}{number}' for number in range(start, end + 1)]
+
+
+def get_problem_accuracy(problem):
+    try:
+        return float(problem.get('accuracy'))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_accuracy_within(accuracy, min_accuracy, max_accuracy):
+    if min_accuracy is None and max_accuracy is None:
+        return True
+    if accuracy is None:
+        return False
+    return (min_accuracy is None or accuracy >= min_accuracy) and \
+        (max_accuracy is None or accuracy <= max_accuracy)
+
+
 @sort_it
-def search_problems(sort, order, search_type):
-    url = f'/problems/{search_type.lower()}'
-    resp = request(url=url)
+def get_contests_problems(sort, order, contest_codes, min_accuracy=None, max_accuracy=None,
+                          num_workers=DEFAULT_NUM_WORKERS):
+    # every contest manifest is fetched concurrently; their problems end up in one table
+    contest_codes = [code.upper() for code in contest_codes]
+    contests_json = run_concurrently(get_contest_json, contest_codes, num_workers=num_workers)
+    if all(resp_json is None for resp_json in contests_json):
+        return [{'code': 503}]
+
+    data_rows = [CONTESTS_PROBLEMS_TABLE_HEADINGS]
+    missing = []
+    for contest_code, resp_json in zip(contest_codes, contests_json):
+        if resp_json is None or resp_json.get('status') != 'success':
+            missing.append(contest_code)
+            continue
+
+        for problem in (resp_json.get('problems') or {}).values():
+            if not is_accuracy_within(get_problem_accuracy(problem), min_accuracy, max_accuracy):
+                continue
+            data_rows.append([
+                contest_code,
+                problem['name'],
+                problem['code'],
+                f"{BASE_URL}{problem['problem_url']}",
+                str(problem['successful_submissions']),
+                f"{problem['accuracy']} %",
+                "Yes" if problem['category_name'] == 'main' else "No"
+            ])
+
+    resps = []
+    if len(data_rows) > 1:
+        resps.append({'data': data_rows, 'data_type': 'table'})
+    else:
+        resps.append({'code': 404, 'data': 'No problems found.'})
+    if missing:
+        resps.append({'code': 404, 'data': f"Contests not found: {', '.join(missing)}"})
+    return resps
+
+
+def get_search_problems_rows(search_type):
+    resp = request(url=f'/problems/{search_type.lower()}')
     if resp.status_code == 200:
-        return [{'data_type': 'table', 'data': html_to_list(resp.html.find('table')[1])}]
+        tables = resp.html.find('table')
+        return html_to_list(tables[1]) if len(tables) > 1 else []
+    return None
+
+
+@sort_it
+def search_problems(sort, order, search_type):
+    data_rows = get_search_problems_rows(search_type)
+    if data_rows is not None:
+        return [{'data_type': 'table', 'data': data_rows}]
     return [{"code": 503}]
 
 
@@ -214,32 +350,54 @@ def get_tags(sort, order, tags):
     return get_tagged_problems(sort, order, tags)
 
 
-def get_all_tags():
+def get_tags_json():
     resp = request(url='/get/tags/problems')
-
     try:
         all_tags = resp.json()
     except ValueError:
-        return [{'code': 503}]
+        return None
 
     if resp.status_code == 200:
-        data_rows = []
-        num_cols = 5
-        row = []
-
-        for index, tag in enumerate(all_tags):
-            tag_name = tag.get('tag', '')
-            if len(row) < num_cols:
-                row.append(tag_name)
-            else:
-                data_rows.append(row)
-                row = [tag_name]
-        if len(row):
+        return [tag for tag in all_tags if tag.get('tag')]
+    return None
+
+
+def get_all_tags():
+    all_tags = get_tags_json()
+    if all_tags is None:
+        return [{'code': 503}]
+
+    data_rows = []
+    num_cols = 5
+    row = []
+
+    for index, tag in enumerate(all_tags):
+        tag_name = tag.get('tag', '')
+        if len(row) < num_cols:
+            row.append(tag_name)
+        else:
             data_rows.append(row)
+            row = [tag_name]
+    if len(row):
+        data_rows.append(row)
 
-        return [{'data': data_rows, 'data_type': 'table'}]
+    return [{'data': data_rows, 'data_type': 'table'}]
 
-    return [{'code': 503}]
+
+def get_tag_names():
+    all_tags = get_tags_json()
+    if all_tags is None:
+        return None
+    return [tag['tag'] for tag in all_tags]
+
+
+def get_tagged_problems_json(tag):
+    # None when the answer can't be read, so callers can tell a failure from a tag without problems
+    resp = request(url=f'/get/tags/problems/{tag}')
+    try:
+        return resp.json().get('all_problems') or {}
+    except (ValueError, AttributeError):
+        return None
 
 
 @sort_it
@@ -276,65 +434,131 @@ def get_tagged_problems(sort, order, tags):
     return [{'code': 503}]
 
 
-@sort_it
-def get_ratings(sort, order, country, institution, institution_type, page, lines):
-    csrf_resp = request(url='/ratings/all')
-    if csrf_resp.status_code == 200:
-        csrf_token = get_csrf_token(csrf_resp.html, CSRF_TOKEN_INPUT_ID)
-    else:
-        return [{'code': 503}]
-
-    url = '/api/ratings/all?sortBy=global_rank&order=asc'
-    params = {'page': str(page), 'itemsPerPage': str(lines), 'filterBy': ''}
+def get_ratings_filter(country, institution, institution_type):
+    filter_by = ''
     if country:
-        params['filterBy'] += f'Country={country};'
+        filter_by += f'Country={country};'
     if institution:
         institution = institution.title()
-        params['filterBy'] += f'Institution={institution};'
+        filter_by += f'Institution={institution};'
     if institution_type:
-        params['filterBy'] += f'Institution type={institution_type};'
+        filter_by += f'Institution type={institution_type};'
+    return filter_by
 
-    resp = request(url=url, params=params, token=csrf_token)
+
+def get_ratings_csrf_token():
+    csrf_resp = request(url='/ratings/all')
+    if csrf_resp.status_code == 200:
+        return get_csrf_token(csrf_resp.html, CSRF_TOKEN_INPUT_ID) or ''
+    return None
+
+
+def get_ratings_json(csrf_token, filter_by, page, lines):
+    params = {'page': str(page), 'itemsPerPage': str(lines), 'filterBy': filter_by}
+    resp = request(url=RATINGS_URL, params=params, token=csrf_token)
 
     if resp.status_code == 200:
         try:
-            ratings = resp.json()
+            return resp.json()
         except ValueError:
+            return None
+    return None
+
+
+def get_ratings_prefetch_key(filter_by, page, lines):
+    return ['ratings', filter_by, page, lines]
+
+
+@sort_it
+def get_ratings(sort, order, country, institution, institution_type, page, lines,
+                use_prefetched=True):
+    filter_by = get_ratings_filter(country, institution, institution_type)
+    ratings = None
+    if use_prefetched:
+        ratings = pop_cached(PREFETCH_CACHE_NAMESPACE,
+                             get_ratings_prefetch_key(filter_by, page, lines),
+                             ttl=PREFETCH_CACHE_TTL)
+    if ratings is None:
+        csrf_token = get_ratings_csrf_token()
+        if csrf_token is None:
             return [{'code': 503}]
 
-        ratings = ratings.get('list') or []
-        if len(ratings) == 0:
-            return [{'code': 404, 'data': 'No ratings found'}]
+        ratings = get_ratings_json(csrf_token, filter_by, page, lines)
+        if ratings is None:
+            return [{'code': 503}]
 
-        data_rows = [RATINGS_TABLE_HEADINGS]
-        for user in ratings:
-            data_rows.append([
-                f"{str(user['global_rank'])} ({str(user['country_rank'])})",
-                user['username'],
-                str(user['rating']),
-                str(user['diff'])
-            ])
-        return [{'data': data_rows, 'data_type': 'table'}]
-    return [{'code': 503}]
+    ratings = ratings.get('list') or []
+    if len(ratings) == 0:
+        return [{'code': 404, 'data': 'No ratings found'}]
+
+    data_rows = [RATINGS_TABLE_HEADINGS]
+    for user in ratings:
+        data_rows.append([
+            f"{str(user['global_rank'])} ({str(user['country_rank'])})",
+            user['username'],
+            str(user['rating']),
+            str(user['diff'])
+        ])
+    return [{'data': data_rows, 'data_type': 'table'}]
+
+
+def get_contest_tables(resp):
+    # tables 1 & 2 list present & future contests and the last one past contests; the past list
+    # is by far the longest, so only the tables needed are kept while the page streams in
+    tables, num_tables = {}, 0
+    for index, data_rows in stream_tables(resp):
+        if index in (1, 2):
+            tables[index] = data_rows
+        tables[-1] = data_rows
+        num_tables += 1
+    return tables, num_tables
+
+
+def refresh_contests(conn):
+    resp = request(url='/contests', stream=True)
+    if resp.status_code != 200:
+        return False
 
+    tables, num_tables = get_contest_tables(resp)
+    status_tables = [('present', tables.get(1)), ('future', tables.get(2))]
+    if num_tables > 3:
+        status_tables.append(('past', tables[-1]))
 
-def get_contests(show_past):
-    resp = request(url='/contests')
-    if resp.status_code == 200:
-        tables = resp.html.find('table')
-        labels = ['Present', 'Future']
-        if show_past:
-            labels = ['Past']
-            tables = [tables[0], tables[-1]]
+    rows, statuses = [], []
+    for status, data_rows in status_tables:
+        if data_rows is not None:
+            rows += get_contest_rows(data_rows, status)
+            statuses.append(status)
+    sync_contests(conn, rows, statuses=statuses)
+    return True
+
+
+def get_contests(show_past, starting_within=None, code_prefix=None):
+    # served from the local contests cache, which is refreshed from the site once it's stale
+    conn = get_db()
+    try:
+        if is_stale(conn) and not refresh_contests(conn):
+            return [{'code': 503}]
+
+        statuses = [('Past', 'past')] if show_past else [
+            ('Present', 'present'), ('Future', 'future')]
+        tables = [(label, query_contests(
+            conn, statuses=[status], starting_within=starting_within, code_prefix=code_prefix))
+            for label, status in statuses]
+    finally:
+        conn.close()
 
-        resps = []
-        for idx, label in enumerate(labels):
+    if not any(contests for _, contests in tables):
+        return [{'code': 404, 'data': 'No contests found.'}]
+
+    resps = []
+    for label, contests in tables:
+        if contests:
             resps += [
                 {'data': style_text(f'{label} Contests:\n', 'BOLD')},
-                {'data': html_to_list(tables[idx + 1]), 'data_type': 'table'}
+                {'data': [CONTEST_TABLE_HEADINGS] + contests, 'data_type': 'table'}
             ]
-        return resps
-    return [{'code': 503}]
+    return resps
 
 
 def build_request_params(resp_html, language, result, username, page):
@@ -354,46 +578,103 @@ def build_request_params(resp_html, language, result, username, page):
     return params
 
 
-@sort_it
-def get_solutions(sort, order, problem_code, page, language, result, username):
-    url = f'/status/{problem_code.upper()}'
-    resp = request(url=url)
+def get_solutions_params(problem_code, page=1, language=None, result=None, username=None):
+    resp = request(url=f'/status/{problem_code.upper()}', until=SOLUTIONS_FILTERS_STREAM_UNTIL)
+    if resp.status_code != 200:
+        return None
+    return build_request_params(resp.html, language, result, username, page)
+
+
+def parse_solutions_page(resp):
+    # the pagination block follows the solutions table, so reading stops once both are in
+    texts = {PAGE_INFO_CLASS: None}
+    data_rows = []
+    for index, table_rows in stream_tables(
+            resp, texts=texts, last_table=SOLUTIONS_TABLE_INDEX):
+        if index == SOLUTIONS_TABLE_INDEX:
+            data_rows = table_rows
+
+    for row in data_rows:
+        # remove view solution column
+        del row[-1]
+
+        # format result column
+        row[3] = ' '.join(row[3].split('\n'))
+    return data_rows, texts[PAGE_INFO_CLASS]
 
+
+def parse_solutions_content(content):
+    return parse_solutions_page(BufferedResponse(content))
+
+
+def get_solutions_page(problem_code, params):
+    # with a parse pool the page is read whole & parsed in a worker process, else while it streams
+    # a streamed page that didn't change (304) replays the rows parsed the last time
+    is_pooled = is_parse_pool_running()
+    resp = request(url=f'/status/{problem_code.upper()}', params=params, stream=not is_pooled)
+    if resp.status_code == NOT_MODIFIED_STATUS_CODE and hasattr(resp, 'replay'):
+        resp.close()
+        data_rows, page_info = resp.replay
+        return 200, data_rows, page_info
     if resp.status_code != 200:
-        return [{'code': 503}]
+        return 503, None, None
+    if problem_code not in resp.url:
+        resp.close()
+        return 404, None, None
 
-    params = build_request_params(resp.html, language, result, username, page)
-    resp = request(url=url, params=params)
+    if is_pooled:
+        data_rows, page_info = parse_content(parse_solutions_content, resp.content)
+    else:
+        data_rows, page_info = parse_solutions_page(resp)
+        keep_replay(resp, (data_rows, page_info))
+    return 200, data_rows, page_info
 
-    if resp.status_code == 200:
-        if problem_code in resp.url:
-            resp_html = resp.html
-            solution_table = resp_html.find('table')[2]
-            page_info = resp_html.find(PAGE_INFO_CLASS, first=True)
 
-            data_rows = html_to_list(solution_table)
-            for row in data_rows:
-                # remove view solution column
-                del row[-1]
+def get_solutions_prefetch_key(problem_code, page, language, result, username):
+    return ['solutions', problem_code.upper(), page, language, result, username]
 
-                # format result column
-                row[3] = ' '.join(row[3].split('\n'))
 
-            resp = {'data_type': 'table', 'data': data_rows}
-            if page_info:
-                resp['extra'] = f'\nPage: {page_info.text}'
+@sort_it
+def get_solutions(sort, order, problem_code, page, language, result, username,
+                  use_prefetched=True):
+    # a prefetched page may be minutes old, so polls always go to the site
+    prefetched = None
+    if use_prefetched:
+        prefetched = pop_cached(
+            PREFETCH_CACHE_NAMESPACE,
+            get_solutions_prefetch_key(problem_code, page, language, result, username),
+            ttl=PREFETCH_CACHE_TTL)
+    if prefetched is not None:
+        code, data_rows, page_info = prefetched
+    else:
+        params = get_solutions_params(problem_code, page, language, result, username)
+        if params is None:
+            return [{'code': 503}]
+
+        code, data_rows, page_info = get_solutions_page(problem_code, params)
 
-            return [resp]
-        else:
-            return [{'code': 404, 'data': INVALID_PROBLEM_CODE_MSG}]
+    if code == 200:
+        resp = {'data_type': 'table', 'data': data_rows}
+        if page_info:
+            resp['extra'] = f'\nPage: {page_info}'
+        return [resp]
+    elif code == 404:
+        return [{'code': 404, 'data': INVALID_PROBLEM_CODE_MSG}]
     return [{'code': 503}]
 
 
-def get_solution(solution_code):
+def get_solution_source(solution_code):
     resp = request(url=f'/viewplaintext/{solution_code}')
     if resp.status_code == 200:
         err_msg_element = resp.html.find(SOLUTION_ERR_MSG_CLASS, first=True)
         if err_msg_element and err_msg_element.text == INVALID_SOLUTION_ID_MSG:
-            return [{'code': 404, "data": "Invalid Solution ID"}]
-        return [{'data': f'\n{resp.html.find("pre", first=True).element.text}\n'}]
-    return [{'code': 503}]
+            return {'code': 404, "data": "Invalid Solution ID"}
+        return {'data': resp.html.find("pre", first=True).element.text}
+    return {'code': 503}
+
+
+def get_solution(solution_code):
+    resp = get_solution_source(solution_code)
+    if resp.get('code', 200) != 200:
+        return [resp]
+    return [{'data': f"\n{resp['data']}\n"}]
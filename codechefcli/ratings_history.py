@@ -0,0 +1,215 @@
+import time
+
+from codechefcli.decorators import sort_it
+from codechefcli.helpers import CACHE_DIR, DEFAULT_NUM_WORKERS, open_db, run_concurrently
+from codechefcli.problems import get_ratings_csrf_token, get_ratings_filter, get_ratings_json
+
+RATINGS_DB_PATH = f'{CACHE_DIR}/ratings.db'
+SNAPSHOT_PAGE_SIZE = 200
+SNAPSHOT_MAX_PAGES = 500
+ALL_USERS_BOARD = 'all'
+USER_ID_CHUNK_SIZE = 500
+SNAPSHOTS_TABLE_HEADINGS = ['ID', 'BOARD', 'TAKEN AT', 'USERS']
+DELTA_TABLE_HEADINGS = ['USER NAME', 'RANK', 'RANK MOVE', 'RATING', 'RATING CHANGE']
+NEW_ENTRANT, LEFT_BOARD = 'NEW', 'LEFT'
+
+# usernames are stored once and snapshot rows only carry integer ids, keyed for the joins below
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    board TEXT NOT NULL,
+    taken_at INTEGER NOT NULL,
+    num_users INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshot_rows (
+    snapshot_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    global_rank INTEGER,
+    rating INTEGER,
+    PRIMARY KEY (snapshot_id, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS snapshots_board ON snapshots (board, taken_at);
+"""
+
+
+def get_db(db_path=None):
+    return open_db(db_path or RATINGS_DB_PATH, SCHEMA)
+
+
+def get_user_ids(conn, usernames):
+    conn.executemany(
+        "INSERT OR IGNORE INTO users (username) VALUES (?)", [(name,) for name in usernames])
+
+    user_ids = {}
+    for start in range(0, len(usernames), USER_ID_CHUNK_SIZE):
+        chunk = usernames[start:start + USER_ID_CHUNK_SIZE]
+        user_ids.update(conn.execute(
+            f"SELECT username, id FROM users WHERE username IN ({','.join('?' * len(chunk))})",
+            chunk))
+    return user_ids
+
+
+def save_snapshot(conn, board, users, now=None):
+    # pages come sorted by rank, so the first row seen for a username is kept when a user
+    # shifts across a page boundary mid-crawl
+    ranked = {}
+    for user in users:
+        username = str(user.get('username', '')).lower()
+        if username and username not in ranked:
+            ranked[username] = user
+
+    with conn:
+        user_ids = get_user_ids(conn, list(ranked))
+        snapshot_id = conn.execute(
+            "INSERT INTO snapshots (board, taken_at, num_users) VALUES (?, ?, ?)",
+            (board, now or int(time.time()), len(ranked))).lastrowid
+        conn.executemany(
+            "INSERT INTO snapshot_rows (snapshot_id, user_id, rank, global_rank, rating) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(snapshot_id, user_ids[username], rank, user.get('global_rank'), user.get('rating'))
+             for rank, (username, user) in enumerate(ranked.items(), 1)])
+    return snapshot_id
+
+
+def get_snapshots(conn, board=None):
+    if board is None:
+        return conn.execute(
+            "SELECT id, board, taken_at, num_users FROM snapshots ORDER BY id").fetchall()
+    return conn.execute(
+        "SELECT id, board, taken_at, num_users FROM snapshots WHERE board = ? ORDER BY id",
+        (board,)).fetchall()
+
+
+def get_delta(conn, old_id, new_id):
+    # both sides are looked up through the (snapshot_id, user_id) key, so this is an index
+    # join over the two snapshots rather than a scan per user
+    moved = conn.execute("""
+        SELECT u.username, new.rank, old.rank, new.rating, old.rating
+        FROM snapshot_rows AS new
+        JOIN users AS u ON u.id = new.user_id
+        LEFT JOIN snapshot_rows AS old ON old.snapshot_id = ? AND old.user_id = new.user_id
+        WHERE new.snapshot_id = ?
+        ORDER BY new.rank
+    """, (old_id, new_id)).fetchall()
+    left = conn.execute("""
+        SELECT u.username, old.rank, old.rating
+        FROM snapshot_rows AS old
+        JOIN users AS u ON u.id = old.user_id
+        WHERE old.snapshot_id = ? AND NOT EXISTS (
+            SELECT 1 FROM snapshot_rows WHERE snapshot_id = ? AND user_id = old.user_id)
+        ORDER BY old.rank
+    """, (old_id, new_id)).fetchall()
+    return moved, left
+
+
+def format_change(value):
+    return f'+{value}' if value > 0 else str(value)
+
+
+def get_delta_rows(moved, left):
+    data_rows = [DELTA_TABLE_HEADINGS]
+    for username, rank, old_rank, rating, old_rating in moved:
+        if old_rank is None:
+            data_rows.append([username, str(rank), NEW_ENTRANT, str(rating), NEW_ENTRANT])
+            continue
+        rating_change = '' if rating is None or old_rating is None else \
+            format_change(rating - old_rating)
+        data_rows.append(
+            [username, str(rank), format_change(old_rank - rank), str(rating), rating_change])
+    for username, old_rank, old_rating in left:
+        data_rows.append([username, '-', LEFT_BOARD, str(old_rating), LEFT_BOARD])
+    return data_rows
+
+
+def get_delta_summary(moved, left):
+    num_new = len([row for row in moved if row[2] is None])
+    num_up = len([row for row in moved if row[2] is not None and row[2] > row[1]])
+    num_down = len([row for row in moved if row[2] is not None and row[2] < row[1]])
+    return f'\n{num_new} new entrants, {len(left)} left the board, ' \
+           f'{num_up} moved up, {num_down} moved down.'
+
+
+def take_snapshot(country, institution, institution_type, num_workers=DEFAULT_NUM_WORKERS):
+    csrf_token = get_ratings_csrf_token()
+    if csrf_token is None:
+        return [{'code': 503}]
+
+    filter_by = get_ratings_filter(country, institution, institution_type)
+    first_page = get_ratings_json(csrf_token, filter_by, 1, SNAPSHOT_PAGE_SIZE)
+    if first_page is None:
+        return [{'code': 503}]
+
+    users = first_page.get('list') or []
+    if not users:
+        return [{'code': 404, 'data': 'No ratings found'}]
+
+    num_pages = min(first_page.get('availablePages') or 1, SNAPSHOT_MAX_PAGES)
+    pages = run_concurrently(
+        lambda page: get_ratings_json(csrf_token, filter_by, page, SNAPSHOT_PAGE_SIZE),
+        range(2, num_pages + 1), num_workers=num_workers)
+    for page in pages:
+        if page is None:
+            # a board with holes would show up as users leaving & rejoining, so save nothing
+            return [{'code': 503}]
+        users.extend(page.get('list') or [])
+
+    board = filter_by or ALL_USERS_BOARD
+    conn = get_db()
+    try:
+        snapshot_id = save_snapshot(conn, board, users)
+        num_users = conn.execute(
+            "SELECT num_users FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()[0]
+    finally:
+        conn.close()
+    return [{'data': f'Saved snapshot #{snapshot_id} of board `{board}` with {num_users} users.'}]
+
+
+def list_snapshots():
+    conn = get_db()
+    try:
+        snapshots = get_snapshots(conn)
+    finally:
+        conn.close()
+
+    if not snapshots:
+        return [{'code': 404, 'data': 'No ratings snapshots found. Run `--ratings-snapshot`.'}]
+
+    data_rows = [SNAPSHOTS_TABLE_HEADINGS]
+    for snapshot_id, board, taken_at, num_users in snapshots:
+        data_rows.append([
+            str(snapshot_id), board, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(taken_at)),
+            str(num_users)])
+    return [{'data': data_rows, 'data_type': 'table'}]
+
+
+@sort_it
+def get_ratings_delta(sort, order, snapshot_ids, country=None, institution=None,
+                      institution_type=None):
+    conn = get_db()
+    try:
+        if not snapshot_ids:
+            board = get_ratings_filter(country, institution, institution_type) or ALL_USERS_BOARD
+            snapshot_ids = [row[0] for row in get_snapshots(conn, board)[-2:]]
+            if len(snapshot_ids) < 2:
+                return [{'code': 404, 'data': f'Need two snapshots of board `{board}` to compare.'}]
+        elif len(snapshot_ids) != 2:
+            return [{'code': 400, 'data': 'Give two snapshot IDs (old & new) or none.'}]
+        else:
+            known = {row[0] for row in get_snapshots(conn)}
+            if not set(snapshot_ids).issubset(known):
+                return [{'code': 404, 'data': 'Snapshot not found. See `--ratings-snapshots`.'}]
+
+        moved, left = get_delta(conn, *snapshot_ids)
+    finally:
+        conn.close()
+
+    return [{
+        'data': get_delta_rows(moved, left),
+        'data_type': 'table',
+        'extra': get_delta_summary(moved, left)
+    }]
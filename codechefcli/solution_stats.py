@@ -0,0 +1,203 @@
+import math
+import re
+import time
+from array import array
+from collections import Counter
+
+from codechefcli.cache import get_cached, set_cached
+from codechefcli.helpers import DEFAULT_NUM_WORKERS, run_concurrently, style_text
+from codechefcli.problems import INVALID_PROBLEM_CODE_MSG, get_solutions_page
+
+SOLUTIONS_STATS_NAMESPACE = 'solution_stats'
+SOLUTIONS_STATS_TTL = 60 * 60
+SOLUTIONS_STATS_MAX_PAGES = 50
+PERCENTILES = [50, 90, 99]
+PAGE_COUNT_REGEX = re.compile(r'of\s+(\d+)')
+MEMORY_UNITS = {'K': 1, 'M': 1024, 'G': 1024 * 1024}
+SOLUTION_DATE_FORMATS = ['%I:%M %p %d/%m/%y', '%Y-%m-%d %H:%M:%S', '%d/%m/%y']
+VERDICTS = [
+    ('accepted', 'AC'), ('wrong', 'WA'), ('time limit', 'TLE'), ('runtime', 'RTE'),
+    ('compil', 'CTE')
+]
+VERDICT_TABLE_HEADINGS = ['VERDICT', 'COUNT', 'SHARE (%)']
+LANGUAGE_TABLE_HEADINGS = ['LANGUAGE', 'AC RUNS'] + \
+    [f'TIME P{p}' for p in PERCENTILES] + [f'MEM P{p} (KB)' for p in PERCENTILES]
+TIMELINE_TABLE_HEADINGS = ['DATE', 'SUBMISSIONS']
+
+
+def get_num_pages(page_info):
+    match = page_info and PAGE_COUNT_REGEX.search(page_info)
+    return int(match.group(1)) if match else 1
+
+
+def parse_time(value):
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+def parse_memory(value):
+    value = value.strip().upper()
+    unit = MEMORY_UNITS.get(value[-1:])
+    try:
+        return float(value[:-1]) * unit if unit else float(value)
+    except ValueError:
+        return math.nan
+
+
+def parse_solution_date(value):
+    for date_format in SOLUTION_DATE_FORMATS:
+        try:
+            return time.mktime(time.strptime(value.strip(), date_format))
+        except ValueError:
+            continue
+    return math.nan
+
+
+def get_verdict(result):
+    result = result.lower()
+    for text, verdict in VERDICTS:
+        if text in result:
+            return verdict
+    return result.strip() or '-'
+
+
+def build_columns(data_rows):
+    # one typed array per field; verdicts & languages are dictionary-encoded to small ints
+    columns = {
+        'date': array('d'), 'time': array('d'), 'memory': array('d'),
+        'verdict': array('H'), 'language': array('H')
+    }
+    verdicts, languages = {}, {}
+    for row in data_rows:
+        if len(row) < 7:
+            continue
+        columns['date'].append(parse_solution_date(row[1]))
+        columns['verdict'].append(verdicts.setdefault(get_verdict(row[3]), len(verdicts)))
+        columns['time'].append(parse_time(row[4]))
+        columns['memory'].append(parse_memory(row[5]))
+        columns['language'].append(languages.setdefault(row[6], len(languages)))
+    return columns, list(verdicts), list(languages)
+
+
+def get_percentile(sorted_values, percent):
+    if not sorted_values:
+        return math.nan
+    rank = (len(sorted_values) - 1) * percent / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def format_stat(value):
+    return '-' if math.isnan(value) else f'{value:.2f}'
+
+
+def get_verdict_rows(columns, verdicts):
+    counts = Counter(columns['verdict'])
+    total = len(columns['verdict'])
+    return [VERDICT_TABLE_HEADINGS] + [
+        [verdicts[code], str(count), f'{count / total * 100:.1f}']
+        for code, count in counts.most_common()
+    ]
+
+
+def get_language_rows(columns, verdicts, languages):
+    if 'AC' not in verdicts:
+        return [LANGUAGE_TABLE_HEADINGS]
+
+    ac = verdicts.index('AC')
+    times = [[] for _ in languages]
+    memories = [[] for _ in languages]
+    for verdict, language, run_time, memory in zip(
+            columns['verdict'], columns['language'], columns['time'], columns['memory']):
+        if verdict == ac:
+            if not math.isnan(run_time):
+                times[language].append(run_time)
+            if not math.isnan(memory):
+                memories[language].append(memory)
+
+    data_rows = [LANGUAGE_TABLE_HEADINGS]
+    for index, language in enumerate(languages):
+        if not times[index] and not memories[index]:
+            continue
+        times[index].sort()
+        memories[index].sort()
+        data_rows.append(
+            [language, str(max(len(times[index]), len(memories[index])))] +
+            [format_stat(get_percentile(times[index], p)) for p in PERCENTILES] +
+            [format_stat(get_percentile(memories[index], p)) for p in PERCENTILES])
+    data_rows[1:] = sorted(data_rows[1:], key=lambda row: -int(row[1]))
+    return data_rows
+
+
+def get_timeline_rows(columns):
+    days = Counter(
+        time.strftime('%Y-%m-%d', time.localtime(date))
+        for date in columns['date'] if not math.isnan(date)
+    )
+    return [TIMELINE_TABLE_HEADINGS] + [[day, str(count)] for day, count in sorted(days.items())]
+
+
+def get_all_solutions(problem_code, max_pages=SOLUTIONS_STATS_MAX_PAGES,
+                      num_workers=DEFAULT_NUM_WORKERS):
+    # also returns the site's page count & the pages that failed, so a partial result says so
+    code, data_rows, page_info = get_solutions_page(problem_code, {})
+    if code != 200:
+        return code, None, 0, []
+
+    total_pages = get_num_pages(page_info)
+    page_numbers = range(1, min(total_pages, max_pages))
+    pages = run_concurrently(
+        lambda page: get_solutions_page(problem_code, {'page': page}),
+        page_numbers, num_workers=num_workers)
+    failed_pages = []
+    for page, (page_code, page_rows, _) in zip(page_numbers, pages):
+        if page_code == 200:
+            data_rows.extend(page_rows[1:])
+        else:
+            failed_pages.append(page)
+    return 200, data_rows[1:], total_pages, failed_pages
+
+
+def get_coverage_note(total_pages, failed_pages, max_pages=SOLUTIONS_STATS_MAX_PAGES):
+    notes = []
+    if total_pages > max_pages:
+        notes.append(f'only the first {max_pages} of {total_pages} pages were read')
+    if failed_pages:
+        notes.append(f"{len(failed_pages)} page(s) could not be fetched: "
+                     f"{', '.join(str(page + 1) for page in failed_pages)}")
+    return f" ({'; '.join(notes)})" if notes else ''
+
+
+def get_solutions_stats(problem_code, refresh=False, num_workers=DEFAULT_NUM_WORKERS):
+    problem_code = problem_code.upper()
+    cached = None if refresh else get_cached(
+        SOLUTIONS_STATS_NAMESPACE, problem_code, SOLUTIONS_STATS_TTL)
+    if cached is not None:
+        return cached
+
+    code, data_rows, total_pages, failed_pages = get_all_solutions(
+        problem_code, num_workers=num_workers)
+    if code == 404:
+        return [{'code': 404, 'data': INVALID_PROBLEM_CODE_MSG}]
+    if code != 200:
+        return [{'code': 503}]
+    columns, verdicts, languages = build_columns(data_rows)
+    if not columns['verdict']:
+        return [{'code': 404, 'data': 'No solutions found.'}]
+
+    resps = [
+        {'data': style_text(f"{len(columns['verdict'])} submissions of {problem_code}"
+                            f"{get_coverage_note(total_pages, failed_pages)}\n", 'BOLD')},
+        {'data': style_text('Verdicts', 'BOLD')},
+        {'data': get_verdict_rows(columns, verdicts), 'data_type': 'table', 'is_pager': False},
+        {'data': style_text('\nAccepted runs by language (time in seconds)', 'BOLD')},
+        {'data': get_language_rows(columns, verdicts, languages), 'data_type': 'table',
+         'is_pager': False},
+        {'data': style_text('\nSubmissions per day', 'BOLD')},
+        {'data': get_timeline_rows(columns), 'data_type': 'table', 'is_pager': False},
+    ]
+    if failed_pages:
+        return resps
+    return set_cached(SOLUTIONS_STATS_NAMESPACE, problem_code, resps)
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import time
+
+from codechefcli.decorators import sort_it
+from codechefcli.helpers import CACHE_DIR, open_db
+
+STATEMENTS_DB_PATH = f'{CACHE_DIR}/statements.db'
+NAME_KEY = 'Name: '
+CHANGED_STATEMENTS_TABLE_HEADINGS = ['CONTEST', 'CODE', 'NAME', 'CHANGED AT', 'FIRST SEEN']
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+NEW, CHANGED, UNCHANGED = 'new', 'changed', 'unchanged'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS statements (
+    contest_code TEXT NOT NULL,
+    problem_code TEXT NOT NULL,
+    name TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    first_seen INTEGER NOT NULL,
+    changed_at INTEGER NOT NULL,
+    checked_at INTEGER NOT NULL,
+    PRIMARY KEY (contest_code, problem_code)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS statements_changed_at ON statements (changed_at);
+"""
+
+
+def get_db(db_path=None):
+    return open_db(db_path or STATEMENTS_DB_PATH, SCHEMA)
+
+
+def get_content_hash(problem):
+    return hashlib.sha256(json.dumps(problem, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def record_statement(conn, contest_code, problem_code, problem, now=None):
+    # returns whether the statement is new, changed or unchanged since it was last recorded
+    now = int(now or time.time())
+    content_hash = get_content_hash(problem)
+    name = problem.get(NAME_KEY) or ''
+    row = conn.execute(
+        "SELECT content_hash FROM statements WHERE contest_code = ? AND problem_code = ?",
+        (contest_code, problem_code)).fetchone()
+
+    if row is None:
+        state = NEW
+        conn.execute("INSERT INTO statements VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     (contest_code, problem_code, name, content_hash, now, now, now))
+    else:
+        state = UNCHANGED if row[0] == content_hash else CHANGED
+        conn.execute(
+            "UPDATE statements SET name = ?, content_hash = ?, checked_at = ?, "
+            "changed_at = CASE WHEN content_hash = ? THEN changed_at ELSE ? END "
+            "WHERE contest_code = ? AND problem_code = ?",
+            (name, content_hash, now, content_hash, now, contest_code, problem_code))
+    conn.commit()
+    return state
+
+
+def check_statement(contest_code, problem_code, problem):
+    conn = get_db()
+    try:
+        return record_statement(conn, contest_code.upper(), problem_code.upper(), problem)
+    finally:
+        conn.close()
+
+
+def format_time(timestamp):
+    return time.strftime(TIME_FORMAT, time.localtime(timestamp))
+
+
+@sort_it
+def get_changed_statements(sort, order, since, now=None):
+    now = int(now or time.time())
+    conn = get_db()
+    try:
+        rows = conn.execute(
+            "SELECT contest_code, problem_code, name, changed_at, first_seen FROM statements "
+            "WHERE changed_at >= ? ORDER BY changed_at DESC", (now - since,)).fetchall()
+    finally:
+        conn.close()
+
+    if not rows:
+        return [{'code': 404, 'data': 'No tracked statement changed in that time.'}]
+    return [{'data_type': 'table', 'data': [CHANGED_STATEMENTS_TABLE_HEADINGS] + [
+        [contest_code, problem_code, name, format_time(changed_at), format_time(first_seen)]
+        for contest_code, problem_code, name, changed_at, first_seen in rows
+    ]}]
@@ -0,0 +1,130 @@
+import json
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+STATS_TABLE_HEADINGS = ['ENDPOINT', 'REQUESTS', 'WIRE BYTES', 'BYTES', 'ENCODING', 'TIME (MS)']
+
+# requests are only kept while `--stats`/`--stats-log` asked for them (or a scope is open), so
+# long runs & API clients don't hold one entry per request forever
+STATS = {'enabled': False}
+REQUEST_STATS = []
+# a request is also recorded in every scope open in its thread, e.g. one per command of a batch
+STATS_SCOPES = threading.local()
+
+
+def get_wire_bytes(resp, num_bytes):
+    # urllib3 counts the bytes read off the socket, i.e. before decompression
+    raw = getattr(resp, 'raw', None)
+    tell = getattr(raw, 'tell', None)
+    if callable(tell):
+        try:
+            return tell() or num_bytes
+        except (OSError, ValueError):
+            pass
+    return num_bytes
+
+
+def enable_stats():
+    STATS['enabled'] = True
+
+
+def record_request(method, url, resp, elapsed, num_bytes=None):
+    scopes = get_stats_scopes()
+    if not STATS['enabled'] and not scopes:
+        return
+
+    # a streamed body isn't kept on the response; its reader counts the bytes instead
+    if num_bytes is None:
+        content = getattr(resp, '_content', None) or b''
+        num_bytes = len(content) if isinstance(content, bytes) else 0
+    headers = getattr(resp, 'headers', None) or {}
+
+    stat = {
+        'method': method,
+        'endpoint': urlparse(url).path,
+        'status': getattr(resp, 'status_code', None),
+        'encoding': headers.get('Content-Encoding', 'identity'),
+        'wire_bytes': get_wire_bytes(resp, num_bytes),
+        'bytes': num_bytes,
+        'time_ms': round(elapsed * 1000, 2)
+    }
+    if STATS['enabled']:
+        REQUEST_STATS.append(stat)
+    for stats in scopes:
+        stats.append(stat)
+
+
+def get_stats_scopes():
+    return getattr(STATS_SCOPES, 'scopes', ())
+
+
+@contextmanager
+def use_stats_scopes(scopes):
+    previous = get_stats_scopes()
+    STATS_SCOPES.scopes = scopes
+    try:
+        yield
+    finally:
+        STATS_SCOPES.scopes = previous
+
+
+@contextmanager
+def stats_scope():
+    stats = []
+    with use_stats_scopes(get_stats_scopes() + (stats,)):
+        yield stats
+
+
+def get_current_stats():
+    # the requests of the innermost scope, or of the whole run outside any
+    scopes = get_stats_scopes()
+    return scopes[-1] if scopes else REQUEST_STATS
+
+
+def reset_stats():
+    STATS['enabled'] = False
+    del REQUEST_STATS[:]
+
+
+def get_stats_table(stats=None):
+    stats = REQUEST_STATS if stats is None else stats
+    if not stats:
+        return []
+
+    totals = {}
+    for stat in stats:
+        total = totals.setdefault(stat['endpoint'], {
+            'requests': 0, 'wire_bytes': 0, 'bytes': 0, 'encodings': set(), 'time_ms': 0})
+        total['requests'] += 1
+        total['wire_bytes'] += stat['wire_bytes']
+        total['bytes'] += stat['bytes']
+        total['encodings'].add(stat['encoding'])
+        total['time_ms'] += stat['time_ms']
+
+    data_rows = [STATS_TABLE_HEADINGS]
+    for endpoint, total in totals.items():
+        data_rows.append([
+            endpoint,
+            str(total['requests']),
+            str(total['wire_bytes']),
+            str(total['bytes']),
+            ",".join(sorted(total['encodings'])),
+            str(round(total['time_ms'], 2))
+        ])
+    data_rows.append([
+        'TOTAL',
+        str(len(stats)),
+        str(sum(stat['wire_bytes'] for stat in stats)),
+        str(sum(stat['bytes'] for stat in stats)),
+        '',
+        str(round(sum(stat['time_ms'] for stat in stats), 2))
+    ])
+    return data_rows
+
+
+def write_stats_log(file_path, command, stats=None):
+    stats = REQUEST_STATS if stats is None else stats
+    with open(file_path, 'a') as f:
+        for stat in stats:
+            f.write(json.dumps({'command': command, **stat}) + '\n')
@@ -0,0 +1,231 @@
+import base64
+import json
+import math
+import os
+import re
+import time
+import zlib
+
+from codechefcli.decorators import sort_it
+from codechefcli.helpers import CACHE_DIR, DEFAULT_NUM_WORKERS, run_concurrently
+from codechefcli.problems import (PROBLEM_LIST_TABLE_HEADINGS, get_tagged_problems_json,
+                                  get_tags_json)
+
+TAG_INDEX_PATH = f'{CACHE_DIR}/tag_index.json'
+TAG_INDEX_TTL = 24 * 60 * 60
+TAG_OPERATORS = '&|!()'
+TAG_TOKEN_REGEX = re.compile(r'\s*(?:([&|!()])|([^&|!()]+))')
+
+
+def is_tag_expression(tags):
+    return any(op in tag for tag in tags for op in TAG_OPERATORS)
+
+
+def encode_bits(bits):
+    raw = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    return base64.b64encode(zlib.compress(raw)).decode('ascii')
+
+
+def decode_bits(encoded):
+    return int.from_bytes(zlib.decompress(base64.b64decode(encoded)), 'little')
+
+
+def tokenize(expression):
+    tokens = []
+    pos = 0
+    expression = expression.strip()
+    while pos < len(expression):
+        match = TAG_TOKEN_REGEX.match(expression, pos)
+        op, name = match.groups()
+        tokens.append(op or name.strip().lower())
+        pos = match.end()
+    return [token for token in tokens if token]
+
+
+class TagIndex:
+    # a problem keeps its bit position forever, so refreshing one tag never shifts the others
+    def __init__(self, problems=None, tags=None, updated_at=0):
+        self.problems = problems or []
+        self.positions = {problem[0]: index for index, problem in enumerate(self.problems)}
+        self.tags = tags or {}
+        self.updated_at = updated_at
+
+    @property
+    def universe(self):
+        return (1 << len(self.problems)) - 1
+
+    def add_problem(self, code, problem):
+        info = [code, problem.get('name', ''), problem.get('attempted_by'),
+                problem.get('solved_by')]
+        if code in self.positions:
+            self.problems[self.positions[code]] = info
+        else:
+            self.positions[code] = len(self.problems)
+            self.problems.append(info)
+        return self.positions[code]
+
+    def set_tag(self, tag, count, tagged_problems):
+        bits = 0
+        for code, problem in tagged_problems.items():
+            bits |= 1 << self.add_problem(problem.get('code') or code, problem)
+        self.tags[tag.lower()] = {'count': count, 'bits': bits}
+
+    def remove_tag(self, tag):
+        self.tags.pop(tag.lower(), None)
+
+    def get_bits(self, tag):
+        # a typo must not quietly match nothing (or, negated, everything)
+        if tag.lower() not in self.tags:
+            raise ValueError(f'Unknown tag: {tag}')
+        return self.tags[tag.lower()]['bits']
+
+    def evaluate(self, expression):
+        # recursive descent, binding `!` tighter than `&` tighter than `|`
+        tokens = tokenize(expression)
+        pos = 0
+
+        def peek():
+            return tokens[pos] if pos < len(tokens) else None
+
+        def take(expected=None):
+            nonlocal pos
+            token = peek()
+            if token is None or (expected and token != expected):
+                raise ValueError(f'Invalid tag expression: {expression}')
+            pos += 1
+            return token
+
+        def parse_or():
+            bits = parse_and()
+            while peek() == '|':
+                take('|')
+                bits |= parse_and()
+            return bits
+
+        def parse_and():
+            bits = parse_not()
+            while peek() == '&':
+                take('&')
+                bits &= parse_not()
+            return bits
+
+        def parse_not():
+            token = take()
+            if token == '!':
+                return self.universe & ~parse_not()
+            if token == '(':
+                bits = parse_or()
+                take(')')
+                return bits
+            if token in TAG_OPERATORS:
+                raise ValueError(f'Invalid tag expression: {expression}')
+            return self.get_bits(token)
+
+        bits = parse_or()
+        if pos != len(tokens):
+            raise ValueError(f'Invalid tag expression: {expression}')
+        return bits
+
+    def get_rows(self, bits):
+        data_rows = [PROBLEM_LIST_TABLE_HEADINGS]
+        while bits:
+            lowest = bits & -bits
+            code, name, attempted_by, solved_by = self.problems[lowest.bit_length() - 1]
+            try:
+                accuracy = str(math.floor(solved_by / attempted_by * 100))
+            except (TypeError, ZeroDivisionError):
+                accuracy = ''
+            data_rows.append([code, name, str(attempted_by or ''), accuracy])
+            bits ^= lowest
+        return data_rows
+
+    def to_json(self):
+        return {
+            'problems': self.problems,
+            'tags': {
+                tag: {'count': entry['count'], 'bits': encode_bits(entry['bits'])}
+                for tag, entry in self.tags.items()
+            },
+            'updated_at': self.updated_at
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        tags = {
+            tag: {'count': entry['count'], 'bits': decode_bits(entry['bits'])}
+            for tag, entry in data['tags'].items()
+        }
+        return cls(data['problems'], tags, data.get('updated_at', 0))
+
+
+def load_tag_index(index_path=None):
+    try:
+        with open(index_path or TAG_INDEX_PATH) as f:
+            return TagIndex.from_json(json.load(f))
+    except (IOError, ValueError, KeyError, zlib.error):
+        return TagIndex()
+
+
+def save_tag_index(index, index_path=None):
+    index_path = index_path or TAG_INDEX_PATH
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = f'{index_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(index.to_json(), f)
+    os.replace(tmp_path, index_path)
+
+
+def refresh_tag_index(index, num_workers=DEFAULT_NUM_WORKERS, now=None):
+    # only tags that are new or whose problem count moved are downloaded again
+    all_tags = get_tags_json()
+    if all_tags is None:
+        return False
+
+    counts = {tag['tag'].lower(): tag.get('count') for tag in all_tags}
+    for tag in set(index.tags) - set(counts):
+        index.remove_tag(tag)
+
+    stale = [
+        tag for tag, count in counts.items()
+        if tag not in index.tags or count is None or index.tags[tag]['count'] != count
+    ]
+    tagged = run_concurrently(get_tagged_problems_json, stale, num_workers=num_workers)
+    for tag, tagged_problems in zip(stale, tagged):
+        if tagged_problems:
+            index.set_tag(tag, counts[tag], tagged_problems)
+        elif tag in index.tags:
+            # an empty answer may be a failed fetch: keep the problems we had & unset the count,
+            # so the tag is fetched again next time
+            index.tags[tag]['count'] = None
+        else:
+            index.set_tag(tag, None, {})
+
+    index.updated_at = now or int(time.time())
+    return True
+
+
+def get_tag_index(refresh=False, num_workers=DEFAULT_NUM_WORKERS):
+    index = load_tag_index()
+    if refresh or time.time() - index.updated_at > TAG_INDEX_TTL:
+        if refresh_tag_index(index, num_workers):
+            save_tag_index(index)
+        elif not index.tags:
+            return None
+    return index
+
+
+@sort_it
+def query_tags(sort, order, expression, refresh=False, num_workers=DEFAULT_NUM_WORKERS):
+    index = get_tag_index(refresh, num_workers)
+    if index is None:
+        return [{'code': 503}]
+
+    try:
+        bits = index.evaluate(expression)
+    except ValueError as e:
+        return [{'code': 400, 'data': str(e)}]
+
+    data_rows = index.get_rows(bits)
+    if len(data_rows) == 1:
+        return [{'code': 404, 'extra': "Sorry, there are no problems matching the tag expression!"}]
+    return [{'data': data_rows, 'data_type': 'table'}]
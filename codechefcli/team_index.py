@@ -0,0 +1,60 @@
+import json
+import time
+
+from codechefcli.helpers import CACHE_DIR, open_db
+
+TEAMS_DB_PATH = f'{CACHE_DIR}/teams.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    name TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS team_members (
+    team TEXT NOT NULL,
+    username TEXT NOT NULL,
+    PRIMARY KEY (team, username)
+);
+CREATE TABLE IF NOT EXISTS team_problems (
+    team TEXT NOT NULL,
+    problem_code TEXT NOT NULL,
+    PRIMARY KEY (team, problem_code)
+);
+CREATE INDEX IF NOT EXISTS team_members_username ON team_members (username);
+CREATE INDEX IF NOT EXISTS team_problems_code ON team_problems (problem_code);
+"""
+
+
+def get_db(db_path=None):
+    return open_db(db_path or TEAMS_DB_PATH, SCHEMA)
+
+
+def index_teams(conn, teams, now=None):
+    # a team's previous members & problems are replaced, so the index follows the latest crawl
+    now = now or int(time.time())
+    with conn:
+        for team in teams:
+            name = team['name'].lower()
+            conn.execute(
+                "INSERT OR REPLACE INTO teams (name, record, updated_at) VALUES (?, ?, ?)",
+                (name, json.dumps(team), now))
+            conn.execute("DELETE FROM team_members WHERE team = ?", (name,))
+            conn.execute("DELETE FROM team_problems WHERE team = ?", (name,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO team_members (team, username) VALUES (?, ?)",
+                [(name, member.lower()) for member in team['members']])
+            conn.executemany(
+                "INSERT OR IGNORE INTO team_problems (team, problem_code) VALUES (?, ?)",
+                [(name, code.upper()) for code in team['problems_solved']])
+
+
+def get_teams_with_member(conn, username):
+    return [row[0] for row in conn.execute(
+        "SELECT team FROM team_members WHERE username = ? ORDER BY team", (username.lower(),))]
+
+
+def get_teams_with_problem(conn, problem_code):
+    return [row[0] for row in conn.execute(
+        "SELECT team FROM team_problems WHERE problem_code = ? ORDER BY team",
+        (problem_code.upper(),))]
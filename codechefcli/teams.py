@@ -1,4 +1,17 @@
-from codechefcli.helpers import BASE_URL, html_to_list, request
+import json
+import re
+
+from requests_html import HTML
+
+from codechefcli import team_index
+from codechefcli.helpers import (BASE_URL, DEFAULT_NUM_WORKERS, html_to_list, read_names, request,
+                                 run_concurrently)
+from codechefcli.parse_pool import parse_content
+
+PROBLEMS_KEY = 'problem'
+MEMBERS_KEY = 'member'
+TEAM_PARSE_ERROR_MSG = 'Could not read the team page.'
+NAMES_SEPARATOR_REGEX = re.compile(r'[\s,]+')
 
 
 def get_team_url(name):
@@ -11,38 +24,142 @@ def format_contest(item):
     return item
 
 
-def get_team(name):
-    if not name:
-        return []
+def split_names(value):
+    return [name for name in NAMES_SEPARATOR_REGEX.split(value) if name]
+
+
+def get_members(info_list):
+    members = []
+    for item in info_list:
+        key, _, value = item.partition(':')
+        if MEMBERS_KEY in key.lower():
+            members += split_names(value)
+    return members
+
+
+def get_problems_index(heading):
+    for index, col in enumerate(heading):
+        if PROBLEMS_KEY in col.lower():
+            return index
+    return len(heading) - 1
+
+
+def parse_team_page(content, name, url):
+    resp_html = HTML(url=url, html=content)
+    tables = resp_html.find('table')
+
+    header = tables[1].text.strip()
+    team_info = tables[2].text.strip()
+    team_info = team_info.replace(':\n', ': ')
+    team_info_list = team_info.split('\n')
+
+    problems_solved_table = html_to_list(tables[-1])
+    # the first column is the contest; only the problems column holds solved problems
+    problems_index = get_problems_index(problems_solved_table[0]) if problems_solved_table else 0
+    problems_solved = []
+    for row in problems_solved_table[1:]:
+        if len(row) > problems_index:
+            problems_solved += split_names(row[problems_index])
+
+    return {
+        'name': name,
+        'header': header,
+        'info': team_info_list[:2],
+        'contests': team_info_list[2:-1],
+        'members': get_members(team_info_list),
+        'problems_solved_table': problems_solved_table,
+        'problems_solved': problems_solved
+    }
+
+
+def get_team_record(name):
     resp = request(url=get_team_url(name))
 
     if resp.status_code == 200:
-        resp_html = resp.html
-        tables = resp_html.find('table')
-
-        header = tables[1].text.strip()
-        team_info = tables[2].text.strip()
-        team_info = team_info.replace(':\n', ': ')
-        team_info_list = team_info.split('\n')
-
-        basic_info = "\n".join(team_info_list[:2])
-        contests_info = "\n".join([format_contest(item) for item in team_info_list[2:-1]])
-        problems_solved_table = html_to_list(tables[-1])
-
-        team_details = "\n".join([
-            '',
-            header,
-            '',
-            basic_info,
-            contests_info,
-            '',
-            'Problems Successfully Solved:',
-            ''
-        ])
-        return [
-            {'data': team_details},
-            {'data': problems_solved_table, "data_type": "table", "is_pager": False}
-        ]
+        try:
+            return {'data': parse_content(parse_team_page, resp.content, name, resp.url)}
+        except (AttributeError, IndexError):
+            return {'code': 503, 'data': TEAM_PARSE_ERROR_MSG}
     elif resp.status_code == 404:
-        return [{'code': 404, 'data': 'Team not found.'}]
-    return [{'code': 503}]
+        return {'code': 404, 'data': 'Team not found.'}
+    return {'code': 503}
+
+
+def get_team(name):
+    if not name:
+        return []
+
+    resp = get_team_record(name)
+    if resp.get('code', 200) != 200:
+        return [resp]
+
+    team = resp['data']
+    team_details = "\n".join([
+        '',
+        team['header'],
+        '',
+        "\n".join(team['info']),
+        "\n".join([format_contest(item) for item in team['contests']]),
+        '',
+        'Problems Successfully Solved:',
+        ''
+    ])
+    return [
+        {'data': team_details},
+        {'data': team['problems_solved_table'], "data_type": "table", "is_pager": False}
+    ]
+
+
+def get_team_record_or_error(name):
+    # one page that fails to fetch or parse becomes a failed record, not a failed batch
+    try:
+        return get_team_record(name)
+    except Exception as e:
+        return {'code': 503, 'data': str(e) or type(e).__name__}
+
+
+def get_teams(file_path, output_file=None, num_workers=DEFAULT_NUM_WORKERS):
+    try:
+        names = read_names(file_path)
+    except IOError:
+        return [{'code': 400, 'data': 'Team names file not found.'}]
+
+    resps = run_concurrently(get_team_record_or_error, names, num_workers=num_workers)
+    records = [
+        resp['data'] if resp.get('code', 200) == 200 else
+        {'name': name, 'code': resp['code'], 'error': resp.get('data', '')}
+        for name, resp in zip(names, resps)
+    ]
+    teams = [record for record in records if 'error' not in record]
+
+    conn = team_index.get_db()
+    try:
+        team_index.index_teams(conn, teams)
+    finally:
+        conn.close()
+
+    lines = "\n".join([json.dumps(record) for record in records])
+    if not output_file:
+        return [{'data': lines}]
+
+    with open(output_file, 'w') as f:
+        f.write(f'{lines}\n')
+    num_failed = len(records) - len(teams)
+    return [{'data': f'Fetched {len(names)} teams ({num_failed} failed) into {output_file}'}]
+
+
+def get_indexed_teams(member=None, problem_code=None):
+    conn = team_index.get_db()
+    try:
+        if member:
+            label = f'Teams with member {member}'
+            teams = team_index.get_teams_with_member(conn, member)
+        else:
+            label = f'Teams that solved {problem_code.upper()}'
+            teams = team_index.get_teams_with_problem(conn, problem_code)
+    finally:
+        conn.close()
+
+    if not teams:
+        return [{'code': 404, 'data': 'No indexed teams found. Use `--teams-from` to index teams.'}]
+    return [{'data': f'\n{label}:\n' + "\n".join(teams)}]
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
+import json
 
-from codechefcli.helpers import BASE_URL, request, style_text
+from requests_html import HTML
+
+from codechefcli.cache import get_cached, set_cached
+from codechefcli.helpers import (BASE_URL, DEFAULT_NUM_WORKERS, read_names, request,
+                                 run_concurrently, style_text)
+from codechefcli.parse_pool import parse_content
 from codechefcli.teams import get_team_url
 
 HEADER = 'header'
@@ -9,6 +15,10 @@ RATING_RANKS_CLASS = '.rating-ranks'
 STAR_RATING_CLASS = '.rating'
 USER_DETAILS_CONTAINER_CLASS = '.user-details-container'
 USER_DETAILS_CLASS = '.user-details'
+USERS_CACHE_NAMESPACE = 'users'
+USERS_CACHE_TTL = 6 * 60 * 60
+PROFILE_PARSE_ERROR_MSG = 'Could not read the profile page.'
+PROFILE_STREAM_UNTIL = [USER_DETAILS_CONTAINER_CLASS, RATING_NUMBER_CLASS, RATING_RANKS_CLASS]
 
 
 def get_user_teams_url(username):
@@ -19,53 +29,112 @@ def format_list_item(item):
     return ": ".join([i.strip() for i in item.text.split(':')])
 
 
-def get_user(username):
-    if not username:
-        return []
+def parse_user_profile(content, username, url):
+    resp_html = HTML(url=url, html=content)
+    details_container = resp_html.find(USER_DETAILS_CONTAINER_CLASS, first=True)
+
+    # basic info
+    header = details_container.find(HEADER, first=True).text.strip()
+    info_list_items = details_container.find(USER_DETAILS_CLASS, first=True).find('li')
+
+    # ignore first & last item i.e. username item & teams item respectively
+    details = [format_list_item(li).split(': ', 1) for li in info_list_items[1:-1]]
+
+    # rating
+    rank_items = resp_html.find(RATING_RANKS_CLASS, first=True).find('li')
 
-    resp = request(url=f'/users/{username}')
+    return {
+        'username': username,
+        'header': header,
+        # an item without a `key: value` pair isn't a detail
+        'details': {item[0]: item[1] for item in details if len(item) == 2},
+        'star_rating': details_container.find(STAR_RATING_CLASS, first=True).text.strip(),
+        'rating': resp_html.find(RATING_NUMBER_CLASS, first=True).text.strip(),
+        'global_rank': rank_items[0].find('a', first=True).text.strip(),
+        'country_rank': rank_items[1].find('a', first=True).text.strip(),
+        'teams_url': get_user_teams_url(username),
+        'url': url
+    }
+
+
+def get_user_record(username):
+    resp = request(url=f'/users/{username}', until=PROFILE_STREAM_UNTIL)
 
     if resp.status_code == 200:
         team_url = get_team_url(username)
         if resp.url == team_url:
-            return [{
+            return {
                 'data': f'This is a team handle.'
                         f'Run `codechefcli --team {username}` to get team info\n',
                 'code': 400
-            }]
+            }
         elif resp.url.rstrip('/') == BASE_URL:
-            return [{'code': 404, 'data': 'User not found.'}]
-        else:
-            resp_html = resp.html
-            details_container = resp_html.find(USER_DETAILS_CONTAINER_CLASS, first=True)
-
-            # basic info
-            header = details_container.find(HEADER, first=True).text.strip()
-            info_list_items = details_container.find(USER_DETAILS_CLASS, first=True).find('li')
-
-            # ignore first & last item i.e. username item & teams item respectively
-            info = "\n".join([format_list_item(li) for li in info_list_items[1:-1]])
-
-            # rating
-            star_rating = details_container.find(STAR_RATING_CLASS, first=True).text.strip()
-            rating = resp_html.find(RATING_NUMBER_CLASS, first=True).text.strip()
-            rank_items = resp_html.find(RATING_RANKS_CLASS, first=True).find('li')
-            global_rank = rank_items[0].find('a', first=True).text.strip()
-            country_rank = rank_items[1].find('a', first=True).text.strip()
-
-            user_details = "\n".join([
-                '',
-                style_text(f'User Details for {header} ({username}):', 'BOLD'),
-                '',
-                info,
-                f"User's Teams: {get_user_teams_url(username)}",
-                '',
-                f'Rating: {star_rating} {rating}',
-                f'Global Rank: {global_rank}',
-                f'Country Rank: {country_rank}',
-                '',
-                f'Find more at: {resp.url}',
-                ''
-            ])
-            return [{'data': user_details}]
-    return [{'code': 503}]
+            return {'code': 404, 'data': 'User not found.'}
+        try:
+            return {'data': parse_content(parse_user_profile, resp.content, username, resp.url)}
+        except (AttributeError, IndexError):
+            return {'code': 503, 'data': PROFILE_PARSE_ERROR_MSG}
+    return {'code': 503}
+
+
+def format_user_details(user):
+    info = "\n".join([": ".join([key, value]) for key, value in user['details'].items()])
+    return "\n".join([
+        '',
+        style_text(f"User Details for {user['header']} ({user['username']}):", 'BOLD'),
+        '',
+        info,
+        f"User's Teams: {user['teams_url']}",
+        '',
+        f"Rating: {user['star_rating']} {user['rating']}",
+        f"Global Rank: {user['global_rank']}",
+        f"Country Rank: {user['country_rank']}",
+        '',
+        f"Find more at: {user['url']}",
+        ''
+    ])
+
+
+def get_user(username):
+    if not username:
+        return []
+
+    resp = get_user_record(username)
+    if resp.get('code', 200) != 200:
+        return [resp]
+    return [{'data': format_user_details(resp['data'])}]
+
+
+def get_cached_user_record(username):
+    user = get_cached(USERS_CACHE_NAMESPACE, username, ttl=USERS_CACHE_TTL)
+    if user is not None:
+        return user, True
+
+    # one page that fails to fetch or parse becomes a failed record, not a failed batch
+    try:
+        resp = get_user_record(username)
+    except Exception as e:
+        resp = {'code': 503, 'data': str(e) or type(e).__name__}
+    if resp.get('code', 200) != 200:
+        return {'username': username, 'code': resp['code'], 'error': resp.get('data', '')}, False
+    return set_cached(USERS_CACHE_NAMESPACE, username, resp['data']), False
+
+
+def get_users(file_path, output_file=None, num_workers=DEFAULT_NUM_WORKERS):
+    try:
+        usernames = read_names(file_path)
+    except IOError:
+        return [{'code': 400, 'data': 'Usernames file not found.'}]
+
+    results = run_concurrently(get_cached_user_record, usernames, num_workers=num_workers)
+    lines = "\n".join([json.dumps(user) for user, _ in results])
+    if not output_file:
+        return [{'data': lines}]
+
+    with open(output_file, 'w') as f:
+        f.write(f'{lines}\n')
+
+    num_cached = len([is_cached for _, is_cached in results if is_cached])
+    num_failed = len([user for user, _ in results if 'error' in user])
+    return [{'data': f'Fetched {len(results)} profiles ({num_cached} from cache, {num_failed} '
+                     f'failed) into {output_file}'}]
@@ -0,0 +1,84 @@
+import time
+
+from codechefcli.helpers import persistent_session, print_response, style_text
+
+ADDED, CHANGED, REMOVED = '+', '~', '-'
+CHANGE_HEADING = 'CHANGE'
+CONTEST_PROBLEMS_KEY = 'CODE'
+SOLUTIONS_KEY = 'ID'
+RATINGS_KEY = 'USER NAME'
+
+
+def parse_interval(value):
+    interval = int(value)
+    if interval <= 0:
+        raise ValueError(f'Invalid interval: {value}. Eg: 30')
+    return interval
+
+
+def get_table_rows(resps):
+    for resp in resps:
+        if resp.get('code', 200) == 200 and resp.get('data_type') == 'table' and resp.get('data'):
+            return resp['data']
+    return None
+
+
+def get_key_index(heading, key_col):
+    return heading.index(key_col) if key_col in heading else 0
+
+
+def diff_rows(prev_rows, rows, key_col):
+    heading = rows[0]
+    key_index = get_key_index(heading, key_col)
+
+    prev = {row[key_index]: row for row in prev_rows[1:]}
+    curr = {row[key_index]: row for row in rows[1:]}
+
+    changes = []
+    for key, row in curr.items():
+        if key not in prev:
+            changes.append([ADDED] + row)
+        elif prev[key] != row:
+            changes.append([CHANGED] + row)
+    for key, row in prev.items():
+        if key not in curr:
+            changes.append([REMOVED] + row)
+
+    if not changes:
+        return []
+    return [[CHANGE_HEADING] + heading] + changes
+
+
+def print_changes(changes):
+    print_response(data=style_text(f"\nChanges at {time.strftime('%H:%M:%S')}", 'BOLD'),
+                   is_pager=False)
+    print_response(data=changes, data_type='table', is_pager=False)
+
+
+def watch(fetch, key_col, interval, num_polls=None):
+    # keeps one session open, so unchanged pages are revalidated instead of downloaded again,
+    # and only prints the rows that changed since the previous poll
+    prev_rows = None
+    resps = []
+    poll = 0
+
+    with persistent_session():
+        while num_polls is None or poll < num_polls:
+            if poll:
+                time.sleep(interval)
+
+            resps = fetch()
+            rows = get_table_rows(resps)
+
+            if prev_rows is None or rows is None:
+                for resp in resps:
+                    print_response(**{**resp, 'is_pager': False})
+            else:
+                changes = diff_rows(prev_rows, rows, key_col)
+                if changes:
+                    print_changes(changes)
+
+            if rows is not None:
+                prev_rows = rows
+            poll += 1
+    return resps
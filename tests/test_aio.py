@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from unittest import TestCase
+
+import httpx
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import aio, helpers
+from codechefcli.aio import arequest, set_async_transport, shutdown_executor, to_async
+from codechefcli.helpers import request, set_transport
+from codechefcli.http2 import AsyncHttpxTransport
+from tests.utils import MockHTMLResponse
+
+
+class MockTransport:
+    def __init__(self):
+        self.calls = []
+
+    def send(self, session, method, url, **kwargs):
+        self.calls.append((method, url, kwargs.get('stream')))
+        return MockHTMLResponse(data='<p>ok</p>')
+
+
+class MockAsyncTransport:
+    def __init__(self):
+        self.calls = []
+
+    async def send(self, session, method, url, **kwargs):
+        self.calls.append((method, url, threading.current_thread()))
+        await asyncio.sleep(0.2)
+        return MockHTMLResponse(data='<p>ok</p>')
+
+
+class TransportTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        shutdown_executor()
+
+    def test_set_transport(self):
+        """Should send requests through the configured transport"""
+        transport = MockTransport()
+        previous = set_transport(transport)
+        try:
+            resp = request(session=helpers.get_session(), url='/contests')
+        finally:
+            set_transport(previous)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(transport.calls, [('GET', f'{helpers.BASE_URL}/contests', False)])
+
+    def test_arequest(self):
+        """Should await the blocking request with the same arguments"""
+        calls = []
+
+        def mock_req(**kwargs):
+            calls.append(kwargs)
+            return MockHTMLResponse()
+        self.monkeypatch.setattr(aio, "request", mock_req)
+
+        resp = asyncio.run(arequest(url='/contests', token='t', params={'a': 1}))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(calls[0]['url'], '/contests')
+        self.assertEqual(calls[0]['token'], 't')
+        self.assertEqual(calls[0]['params'], {'a': 1})
+
+    def test_twins_use_transport(self):
+        """Should send the requests of async twins through the configured transport"""
+        transport = MockTransport()
+        previous = set_transport(transport)
+        try:
+            resps = asyncio.run(aio.get_user('abcd'))
+        finally:
+            set_transport(previous)
+        self.assertEqual(resps[0]['code'], 404)
+        self.assertEqual(transport.calls, [('GET', f'{helpers.BASE_URL}/users/abcd', True)])
+
+    def test_to_async_overlaps(self):
+        """Should run async twins of blocking commands concurrently"""
+        def slow_command(value):
+            time.sleep(0.2)
+            return [{'data': value}]
+
+        async def run_all():
+            command = to_async(slow_command)
+            return await asyncio.gather(*[command(value) for value in range(4)])
+
+        start = time.perf_counter()
+        resps = asyncio.run(run_all())
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertEqual([resp[0]['data'] for resp in resps], [0, 1, 2, 3])
+
+    def test_arequest_async_transport(self):
+        """Should await requests on the event loop through the async transport"""
+        transport = MockAsyncTransport()
+        previous = set_async_transport(transport)
+
+        async def run_all():
+            return await asyncio.gather(*[arequest(url=f'/users/{i}') for i in range(4)])
+
+        start = time.perf_counter()
+        try:
+            resps = asyncio.run(run_all())
+        finally:
+            set_async_transport(previous)
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertEqual([resp.status_code for resp in resps], [200] * 4)
+        self.assertEqual([call[1] for call in transport.calls],
+                         [f'{helpers.BASE_URL}/users/{i}' for i in range(4)])
+        self.assertTrue(all(call[2] is threading.main_thread() for call in transport.calls))
+        self.assertIsNone(aio.EXECUTOR['executor'])
+
+    def test_async_httpx_transport(self):
+        """Should convert httpx responses for the request contract"""
+        requests = []
+
+        def handler(req):
+            requests.append(req)
+            return httpx.Response(200, headers={'ETag': '"v1"'}, text='<p>ok</p>')
+
+        async def fetch():
+            transport = AsyncHttpxTransport(http2=False)
+            transport.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            previous = set_async_transport(transport)
+            try:
+                return await arequest(session=helpers.get_session(), url='/contests', token='t')
+            finally:
+                set_async_transport(previous)
+                await transport.aclose()
+
+        resp = asyncio.run(fetch())
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers['etag'], '"v1"')
+        self.assertEqual(resp.html.find('p', first=True).text, 'ok')
+        self.assertEqual(str(requests[0].url), f'{helpers.BASE_URL}/contests')
+        self.assertEqual(requests[0].headers['X-CSRF-Token'], 't')
@@ -0,0 +1,162 @@
+import io
+from contextlib import redirect_stdout
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import api
+from codechefcli.api import (CodeChef, CodeChefError, ContestProblem, Problem, ProblemSummary,
+                             Rating, Solution, Submission, User)
+from codechefcli.helpers import SHARED_SESSION, NetworkError
+
+PROBLEM_JSON = {
+    'status': 'success',
+    'problem_code': 'WEICOM',
+    'problem_name': 'Welcome',
+    'problem_author': 'admin',
+    'date_added': '1-1-2020',
+    'max_timelimit': '1.5',
+    'source_sizelimit': '50000',
+    'languages_supported': 'C, CPP17, PYTH 3',
+    'tags': '<a>easy</a><a>basics</a>',
+    'body': 'Sample Input\n```\n1\n```\nSample Output\n```\n2\n```',
+}
+USER_RECORD = {
+    'username': 'u1', 'header': 'User One', 'details': {'Country': 'India'},
+    'star_rating': '3★', 'rating': '1700', 'global_rank': '10', 'country_rank': '2',
+    'teams_url': 'teams', 'url': 'url'
+}
+
+
+class APITestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.client = CodeChef(use_cache=False)
+
+    def tearDown(self):
+        self.client.close()
+        self.monkeypatch.undo()
+
+    def test_session(self):
+        """Should run every call on the client's own session, apart from other clients"""
+        sessions = []
+
+        def mock_get_tag_names():
+            sessions.append(SHARED_SESSION['session'])
+            return ['dp']
+
+        self.monkeypatch.setattr(api, "get_tag_names", mock_get_tag_names)
+        with CodeChef() as other_client:
+            self.client.tags()
+            other_client.tags()
+        self.client.tags()
+        self.assertEqual(sessions, [self.client.session, other_client.session, self.client.session])
+        self.assertIsNot(self.client.session, other_client.session)
+        self.assertIsNone(SHARED_SESSION['session'])
+
+    def test_network_error(self):
+        """Should raise network errors & unreadable answers as CodeChefError"""
+        def mock_get_tag_names():
+            raise NetworkError('down')
+
+        self.monkeypatch.setattr(api, "get_tag_names", mock_get_tag_names)
+        with self.assertRaises(CodeChefError) as context:
+            self.client.tags()
+        self.assertEqual(context.exception.code, 503)
+
+        self.monkeypatch.setattr(api, "get_tagged_problems_json", lambda tags: None)
+        with self.assertRaises(CodeChefError):
+            self.client.tagged_problems(['dp'])
+
+    def test_tagged_problems(self):
+        """Should count successful submissions, like the search & archive listings"""
+        self.monkeypatch.setattr(api, "get_tagged_problems_json", lambda tags: {
+            'KNAP': {'code': 'KNAP', 'name': 'Knapsack', 'attempted_by': 100, 'solved_by': 50}})
+        self.assertEqual(self.client.tagged_problems(['dp']),
+                         [ProblemSummary('KNAP', 'Knapsack', submissions=50, accuracy=50.0)])
+
+    def test_problem(self):
+        """Should return a typed problem"""
+        self.monkeypatch.setattr(api, "get_problem_json", lambda *args: PROBLEM_JSON)
+        problem = self.client.problem('WEICOM')
+        self.assertIsInstance(problem, Problem)
+        self.assertEqual(problem.name, 'Welcome')
+        self.assertEqual(problem.time_limit, 1.5)
+        self.assertEqual(problem.source_limit, 50000)
+        self.assertEqual(problem.languages, ['C', 'CPP17', 'PYTH 3'])
+        self.assertEqual(problem.tags, ['easy', 'basics'])
+        self.assertEqual(problem.sample_cases, [('1\n', '2\n')])
+
+    def test_problem_errors(self):
+        """Should raise CodeChefError with the response code"""
+        self.monkeypatch.setattr(api, "get_problem_json", lambda *args: {'status': 'error'})
+        with self.assertRaises(CodeChefError) as e:
+            self.client.problem('NOPE')
+        self.assertEqual(e.exception.code, 404)
+
+        self.monkeypatch.setattr(api, "get_problem_json", lambda *args: None)
+        with self.assertRaises(CodeChefError) as e:
+            self.client.problem('NOPE')
+        self.assertEqual(e.exception.code, 503)
+
+    def test_contest(self):
+        """Should return contest details with typed problems"""
+        self.monkeypatch.setattr(api, "get_contest_json", lambda code: {
+            'status': 'success', 'name': 'Cook-Off', 'announcements': 'hi',
+            'problems': {'A': {'code': 'A', 'name': 'Aa', 'problem_url': '/A',
+                               'successful_submissions': '12', 'accuracy': '33.5',
+                               'category_name': 'main'}}
+        })
+        contest = self.client.contest('cook1')
+        self.assertEqual(contest.code, 'COOK1')
+        self.assertEqual(contest.problems, [
+            ContestProblem('A', 'Aa', 'https://www.codechef.com/A', 12, 33.5, True)])
+
+    def test_ratings(self):
+        """Should return typed ratings"""
+        self.monkeypatch.setattr(api, "get_ratings_csrf_token", lambda: 'token')
+        self.monkeypatch.setattr(api, "get_ratings_json", lambda *args: {'list': [
+            {'username': 'u1', 'global_rank': 1, 'country_rank': 1, 'rating': 2000, 'diff': -5}]})
+        self.assertEqual(self.client.ratings(country='India'), [Rating('u1', 1, 1, 2000, -5)])
+
+    def test_solutions(self):
+        """Should return a typed page of solutions"""
+        self.monkeypatch.setattr(api, "get_solutions_params", lambda *args: {})
+        self.monkeypatch.setattr(api, "get_solutions_page", lambda *args: (200, [
+            ['ID', 'DATE', 'USER', 'RESULT', 'TIME', 'MEM', 'LANG'],
+            ['1', 'd', 'u1', 'accepted', '0.1', '2M', 'C++14']
+        ], '1 of 3'))
+        page = self.client.solutions('WEICOM')
+        self.assertEqual(
+            page.solutions, [Solution('1', 'd', 'u1', 'accepted', '0.1', '2M', 'C++14')])
+        self.assertEqual(page.page_info, '1 of 3')
+
+        self.monkeypatch.setattr(api, "get_solutions_page", lambda *args: (404, None, None))
+        with self.assertRaises(CodeChefError):
+            self.client.solutions('NOPE')
+
+    def test_user(self):
+        """Should return a typed user"""
+        self.monkeypatch.setattr(api, "get_user_record", lambda username: {'data': USER_RECORD})
+        self.assertEqual(self.client.user('u1'), User(**USER_RECORD))
+
+        self.monkeypatch.setattr(
+            api, "get_user_record", lambda username: {'code': 404, 'data': 'User not found.'})
+        with self.assertRaises(CodeChefError) as e:
+            self.client.user('u2')
+        self.assertEqual(str(e.exception), 'User not found.')
+
+    def test_submit_no_output(self):
+        """Should return the submission result without printing anything"""
+        def mock_submit_solution(problem_code, solution_file, language, on_progress):
+            return {'data': {'status_code': '42', 'status': {'result_code': 'compile'}}}
+
+        self.monkeypatch.setattr(api, "submit_solution", mock_submit_solution)
+        self.monkeypatch.setattr(api, "get_status_table", lambda code: None)
+        self.monkeypatch.setattr(api, "get_compilation_error", lambda code: 'error: x')
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            submission = self.client.submit('WEICOM', 'a.cpp', 'C++')
+        self.assertEqual(submission, Submission('42', 'compile', compile_error='error: x'))
+        self.assertEqual(stdout.getvalue(), '')
@@ -0,0 +1,103 @@
+import glob
+import os
+import shutil
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import archive
+from codechefcli.archive import (Archive, merge_search_rows, merge_tagged_problems, query_archive,
+                                 write_archive)
+
+archive_dir = '/tmp/codechefcli-archive'
+
+
+class ArchiveTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(archive, "ARCHIVE_DIR", archive_dir)
+
+        problems = {}
+        merge_search_rows(problems, [
+            ['NAME', 'CODE', 'SUCCESSFUL SUBMISSIONS', 'ACCURACY'],
+            ['Add Two', 'ADDTWO', '5,000', '70.5'],
+            ['Graph Walk', 'GWALK', '120', '15'],
+        ], 'easy')
+        merge_tagged_problems(problems, {
+            'GWALK': {'code': 'GWALK', 'name': 'Graph Walk', 'attempted_by': 800, 'solved_by': 120},
+            'DPPATH': {'code': 'DPPATH', 'name': 'Dp Path', 'attempted_by': 50, 'solved_by': 40},
+        }, 'graphs')
+        merge_tagged_problems(problems, {
+            'DPPATH': {'code': 'DPPATH', 'name': 'Dp Path', 'attempted_by': 50, 'solved_by': 40},
+        }, 'dp')
+        write_archive(list(problems.values()), ['graphs', 'dp'])
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        for path in glob.glob(f'{archive_dir}*'):
+            if os.path.islink(path):
+                os.remove(path)
+            else:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def test_read_columns(self):
+        """Should read back the problems written to the columnar files"""
+        with Archive() as problems:
+            self.assertEqual(problems.num_problems, 3)
+            self.assertEqual(problems.get_row(0), ['ADDTWO', 'Add Two', '5000', '70', 'easy'])
+            self.assertEqual(problems.get_row(1), ['DPPATH', 'Dp Path', '40', '80', ''])
+            self.assertEqual(problems.get_tags(1), ['graphs', 'dp'])
+            self.assertEqual(problems.get_row(2), ['GWALK', 'Graph Walk', '120', '15', 'easy'])
+
+    def test_filter(self):
+        """Should filter on accuracy, submissions & all given tags"""
+        with Archive() as problems:
+            self.assertEqual(problems.filter(min_accuracy=50), [0, 1])
+            self.assertEqual(problems.filter(max_submissions=1000), [1, 2])
+            self.assertEqual(problems.filter(tags=['GRAPHS']), [1, 2])
+            self.assertEqual(problems.filter(tags=['graphs', 'dp']), [1])
+            self.assertEqual(problems.filter(min_accuracy=50, tags=['graphs']), [1])
+            self.assertEqual(problems.filter(tags=['unknown']), [])
+
+    def test_query_archive(self):
+        """Should return matching archived problems as a table"""
+        resps = query_archive(None, None, min_accuracy=50, tags=['graphs'])
+        self.assertEqual(resps[0]['data_type'], 'table')
+        self.assertEqual([row[0] for row in resps[0]['data']], ['CODE', 'DPPATH'])
+
+        resps = query_archive(None, None, max_submissions=10)
+        self.assertEqual(resps[0]['code'], 404)
+
+    def test_query_archive_missing(self):
+        """Should ask for a sync when there is no archive"""
+        os.remove(archive_dir)
+        resps = query_archive(None, None)
+        self.assertEqual(resps[0]['code'], 404)
+
+    def test_write_archive_keeps_old_on_failure(self):
+        """Should keep the old archive when the new one cannot be swapped in"""
+        real_replace = archive.os.replace
+
+        def mock_replace(src, dst):
+            if src.endswith('.link'):
+                raise OSError('disk full')
+            real_replace(src, dst)
+        self.monkeypatch.setattr(archive.os, "replace", mock_replace)
+
+        with self.assertRaises(OSError):
+            write_archive([{'code': 'NEW', 'name': 'New', 'tags': set()}], [])
+        with Archive() as problems:
+            self.assertEqual(problems.num_problems, 3)
+        self.assertEqual(len(glob.glob(f'{archive_dir}.*')), 1)
+
+    def test_write_archive_swaps_versions(self):
+        """Should swap the archive link to each new version & keep only the one it replaced"""
+        with Archive() as first:
+            write_archive([{'code': 'NEW', 'name': 'New', 'tags': set()}], [])
+            self.assertEqual(first.get_row(0)[0], 'ADDTWO')
+        write_archive([{'code': 'NEWER', 'name': 'Newer', 'tags': set()}], [])
+
+        self.assertTrue(os.path.islink(archive_dir))
+        self.assertEqual(len(glob.glob(f'{archive_dir}.*')), 2)
+        with Archive() as problems:
+            self.assertEqual(problems.get_row(0)[0], 'NEWER')
@@ -1,16 +1,21 @@
+import os
+import shutil
 from unittest import TestCase
 
 from _pytest.monkeypatch import MonkeyPatch
 from requests_html import HTML
 
 from codechefcli import __main__ as entry_point
-from codechefcli import auth
+from codechefcli import auth, cache, statements
 from codechefcli.auth import (CSRF_TOKEN_MISSING, EMPTY_AUTH_DATA_MSG, INCORRECT_CREDS_MSG,
                               LOGIN_SUCCESS_MSG, LOGOUT_BUTTON_CLASS, SESSION_LIMIT_FORM_ID,
                               SESSION_LIMIT_MSG, disconnect_active_sessions, login)
 from codechefcli.helpers import CSRF_TOKEN_INPUT_ID
 from tests.utils import MockHTMLResponse
 
+cache_dir = '/tmp/codechefcli-cache'
+statements_db_file = '/tmp/codechefcli-statements.db'
+
 
 class EntryPointTests(TestCase):
     def setUp(self):
@@ -31,6 +36,32 @@ class EntryPointTests(TestCase):
         resps = entry_point.main(['codechefcli', '--problem', 'CCC'])
         self.assertEqual(resps[0]["data"], "Lots of description. Some math. Some meta info. Done.")
 
+    def test_show_problem_cached(self):
+        """Should render the problem once and serve later views from the cache"""
+        calls = []
+
+        def mock_get_desc(*args, **kwargs):
+            calls.append(args)
+            return {'Name: ': 'Welcome', 'Description: ': '<p>Say hi</p><img src="/a.png" />'}
+
+        self.monkeypatch.setattr(entry_point, "get_description", mock_get_desc)
+        self.monkeypatch.setattr(cache, "CACHE_DIR", cache_dir)
+        self.monkeypatch.setattr(statements, "STATEMENTS_DB_PATH", statements_db_file)
+        try:
+            first = entry_point.show_problem('WEICOM', 'PRACTICE')
+            second = entry_point.show_problem('WEICOM', 'PRACTICE')
+            entry_point.show_problem('WEICOM', 'PRACTICE', refresh=True)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            if os.path.exists(statements_db_file):
+                os.remove(statements_db_file)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 2)
+        rendered = entry_point.render_problem(first[0])
+        self.assertTrue('Say hi' in rendered)
+        self.assertTrue('image: /a.png' in rendered)
+
     def test_create_parser(self):
         """Should not explode when parser is parsing the args"""
 
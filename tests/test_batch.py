@@ -0,0 +1,112 @@
+import io
+import os
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import __main__ as entry_point
+from codechefcli.batch import read_commands, run_batch
+from codechefcli.helpers import BASE_URL, run_concurrently
+from codechefcli.stats import record_request, reset_stats
+
+batch_file = '/tmp/codechefcli-batch.txt'
+
+
+class BatchTestCase(TestCase):
+    def tearDown(self):
+        if os.path.exists(batch_file):
+            os.remove(batch_file)
+
+    def test_read_commands(self):
+        """Should split lines like a shell, skipping blanks & comments"""
+        with open(batch_file, 'w') as f:
+            f.write('# nightly\n--problem WEICOM\n\n--ratings --country "United States"  # us\n')
+        self.assertEqual(read_commands(batch_file), [
+            ['--problem', 'WEICOM'], ['--ratings', '--country', 'United States']])
+
+    def test_run_batch_keeps_order(self):
+        """Should run commands concurrently but print their output in input order"""
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def run_command(argv):
+            with lock:
+                running.append(argv)
+                max_running.append(len(running))
+            time.sleep(float(argv[1]))
+            print(argv[0])
+            with lock:
+                running.remove(argv)
+            if argv[0] == 'exit':
+                sys.exit(1)
+
+        commands = [['a', '0.3'], ['b', '0.1'], ['exit', '0'], ['c', '0.2'], ['d', '0']]
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            start = time.perf_counter()
+            self.assertEqual(run_batch(commands, run_command, lambda argv: False, 4), 5)
+            elapsed = time.perf_counter() - start
+            self.assertIs(sys.stdout, stdout)
+
+        self.assertEqual(stdout.getvalue(), 'a\nb\nexit\nc\nd\n')
+        self.assertGreater(max(max_running), 1)
+        self.assertLess(elapsed, 0.55)
+
+    def test_run_batch_barriers(self):
+        """Should run barrier commands alone, between the commands around them"""
+        events = []
+
+        def run_command(argv):
+            events.append(('start', argv[0]))
+            time.sleep(0.05)
+            events.append(('end', argv[0]))
+
+        commands = [['a'], ['b'], ['login'], ['c']]
+        with redirect_stdout(io.StringIO()):
+            run_batch(commands, run_command, lambda argv: argv[0] == 'login', 4)
+
+        login_start = events.index(('start', 'login'))
+        self.assertEqual(events[login_start + 1], ('end', 'login'))
+        self.assertEqual({event[1] for event in events[:login_start]}, {'a', 'b'})
+        self.assertEqual(events[login_start + 2:], [('start', 'c'), ('end', 'c')])
+
+    def test_run_batch_command_errors(self):
+        """Should report a crashing command in its own output and run the rest"""
+        def run_command(argv):
+            if argv[0] == 'crash':
+                raise AttributeError('no rating')
+            print(argv[0])
+
+        commands = [['a'], ['crash', 'x y'], ['b'], ['crash']]
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            run_batch(commands, run_command, lambda argv: argv == ['crash'], 2)
+        self.assertEqual(stdout.getvalue(), (
+            "a\n\x1b[91m`crash 'x y'` failed: AttributeError: no rating\x1b[0m\nb\n"
+            "\x1b[91m`crash` failed: AttributeError: no rating\x1b[0m\n"))
+
+    def test_run_batch_stats_per_command(self):
+        """Should show only the requests of each command with `--stats`"""
+        def mock_get_user(username):
+            record_request('GET', f'{BASE_URL}/users/{username}', None, 0.1, num_bytes=1)
+            run_concurrently(lambda page: record_request(
+                'GET', f'{BASE_URL}/users/{username}/{page}', None, 0.1, num_bytes=1), range(2))
+            return [{'data': username}]
+
+        monkeypatch = MonkeyPatch()
+        monkeypatch.setattr(entry_point, "get_user", mock_get_user)
+        stdout = io.StringIO()
+        try:
+            with redirect_stdout(stdout):
+                run_batch([['--user', 'u1', '--stats'], ['--user', 'u2', '--stats']],
+                          entry_point.run_batch_command, lambda argv: False, 2)
+        finally:
+            monkeypatch.undo()
+            reset_stats()
+        totals = [line for line in stdout.getvalue().split('\n') if line.startswith('TOTAL')]
+        self.assertEqual([line.split()[1] for line in totals], ['3', '3'])
@@ -0,0 +1,36 @@
+import shutil
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import cache
+from codechefcli.cache import get_cached, set_cached
+
+cache_dir = '/tmp/codechefcli-cache'
+
+
+class CacheTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(cache, "CACHE_DIR", cache_dir)
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_get_cached_miss(self):
+        """Should return None when key was never cached"""
+        self.assertIsNone(get_cached('ns', 'missing'))
+
+    def test_set_get_cached(self):
+        """Should return the cached value"""
+        set_cached('ns', 'key', {'a': [1, 2]})
+        self.assertEqual(get_cached('ns', 'key'), {'a': [1, 2]})
+        self.assertIsNone(get_cached('other', 'key'))
+
+    def test_get_cached_expired(self):
+        """Should return None when the cached value is older than ttl"""
+        set_cached('ns', 'key', 'value')
+        self.monkeypatch.setattr(cache.time, "time", lambda: 10 ** 11)
+        self.assertIsNone(get_cached('ns', 'key', ttl=60))
+        self.assertEqual(get_cached('ns', 'key'), 'value')
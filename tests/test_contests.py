@@ -0,0 +1,86 @@
+from unittest import TestCase
+
+from codechefcli.contests import (get_contest_rows, get_db, is_stale, parse_contest_date,
+                                  parse_duration, query_contests, sync_contests)
+
+NOW = parse_contest_date('2020-05-18 12:00:00')
+
+
+class ContestsDBTestCase(TestCase):
+    def setUp(self):
+        self.conn = get_db(':memory:')
+        self.rows = get_contest_rows([
+            ['CODE', 'NAME', 'START', 'END'],
+            ['START1', 'Starters 1', '2020-05-18 20:00:00', '2020-05-18 23:00:00'],
+            ['COOK1', 'Cook-Off 1', '2020-05-25 21:30:00', '2020-05-26 00:00:00'],
+            ['START2', 'Starters 2', '2020-05-29 20:00:00', '2020-05-29 23:00:00'],
+        ], 'future')
+
+    def tearDown(self):
+        self.conn.close()
+
+    def test_parse_duration(self):
+        """Should convert duration strings to seconds, hours being the default unit"""
+        self.assertEqual(parse_duration('90m'), 90 * 60)
+        self.assertEqual(parse_duration('24'), 24 * 60 * 60)
+        self.assertEqual(parse_duration('2d'), 2 * 24 * 60 * 60)
+        with self.assertRaises(ValueError):
+            parse_duration('soon')
+
+    def test_parse_contest_date(self):
+        """Should read contest times as IST whatever the local timezone"""
+        self.assertEqual(parse_contest_date('2020-05-18 12:00:00'), 1589783400)
+        self.assertEqual(parse_contest_date('18 May 2020 12:00'), 1589783400)
+        self.assertIsNone(parse_contest_date('soon'))
+
+    def test_get_contest_rows_missing_columns(self):
+        """Should return no rows when the table does not have contest columns"""
+        self.assertEqual(get_contest_rows([['A', 'B'], ['a1', 'b1']], 'past'), [])
+
+    def test_sync_contests_incremental(self):
+        """Should only write new or changed rows"""
+        self.assertEqual(sync_contests(self.conn, self.rows, now=NOW), 3)
+        self.assertEqual(sync_contests(self.conn, self.rows, now=NOW), 0)
+
+        changed = self.rows[:1] + [self.rows[1][:5] + ('present',)]
+        self.assertEqual(sync_contests(self.conn, changed, now=NOW), 1)
+
+    def test_sync_contests_removes_unlisted(self):
+        """Should delete contests of a synced listing that the page no longer lists"""
+        sync_contests(self.conn, self.rows, now=NOW)
+        self.assertEqual(sync_contests(self.conn, self.rows[1:], now=NOW, statuses=['future']), 1)
+        self.assertEqual([row[0] for row in query_contests(self.conn, now=NOW)],
+                         ['COOK1', 'START2'])
+
+        self.assertEqual(sync_contests(self.conn, [], now=NOW, statuses=['past']), 0)
+        self.assertEqual(len(query_contests(self.conn, now=NOW)), 2)
+
+    def test_is_stale(self):
+        """Should be stale before the first refresh and after the ttl"""
+        self.assertTrue(is_stale(self.conn, now=NOW))
+        sync_contests(self.conn, self.rows, now=NOW)
+        self.assertFalse(is_stale(self.conn, ttl=60, now=NOW + 30))
+        self.assertTrue(is_stale(self.conn, ttl=60, now=NOW + 61))
+
+    def test_query_contests(self):
+        """Should filter by start time window and code prefix"""
+        sync_contests(self.conn, self.rows, now=NOW)
+
+        within_day = query_contests(self.conn, starting_within=parse_duration('24h'), now=NOW)
+        self.assertEqual([row[0] for row in within_day], ['START1'])
+
+        starters = query_contests(self.conn, code_prefix='start', now=NOW)
+        self.assertEqual([row[0] for row in starters], ['START1', 'START2'])
+
+        self.assertEqual(query_contests(self.conn, statuses=['past'], now=NOW), [])
+
+    def test_query_past_contests(self):
+        """Should match past contests that started within the duration before now"""
+        sync_contests(self.conn, get_contest_rows([
+            ['CODE', 'NAME', 'START', 'END'],
+            ['LTIME1', 'Lunchtime 1', '2020-05-17 19:30:00', '2020-05-17 22:30:00'],
+            ['LTIME0', 'Lunchtime 0', '2020-04-17 19:30:00', '2020-04-17 22:30:00'],
+        ], 'past'), now=NOW)
+        past = query_contests(
+            self.conn, statuses=['past'], starting_within=parse_duration('2d'), now=NOW)
+        self.assertEqual([row[0] for row in past], ['LTIME1'])
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import __main__ as entry_point
+from codechefcli import cache, crawl
+from codechefcli.crawl import get_db, get_progress, list_crawls, resume_crawl, start_crawl
+from codechefcli.helpers import NetworkError
+
+cache_dir = '/tmp/codechefcli-cache'
+crawl_db_file = '/tmp/codechefcli-crawls.db'
+output_file = '/tmp/codechefcli-crawl.jsonl'
+
+
+def get_contest_json(contest_code, problems):
+    return {'status': 'success', 'problems': {code: {
+        'name': code.title(), 'code': code, 'problem_url': f'/problems/{code}',
+        'successful_submissions': 10, 'accuracy': 50, 'category_name': 'main'
+    } for code in problems}}
+
+
+class CrawlTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(cache, "CACHE_DIR", cache_dir)
+        self.monkeypatch.setattr(crawl, "CRAWL_DB_PATH", crawl_db_file)
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        for file_path in [crawl_db_file, output_file]:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def test_resume_crawl(self):
+        """Should checkpoint each contest and fetch only the failed ones on resume"""
+        requested = []
+        is_down = {'C2': True}
+
+        def mock_get_contest_json(contest_code):
+            requested.append(contest_code)
+            if is_down.get(contest_code):
+                raise NetworkError('down')
+            if contest_code == 'C3':
+                return {'status': 'error'}
+            return get_contest_json(contest_code, [f'{contest_code}P1', f'{contest_code}P2'])
+
+        self.monkeypatch.setattr(crawl, "get_contest_json", mock_get_contest_json)
+        resps = start_crawl('contests', ['c1', 'c2', 'c3'], num_workers=2, retry_delay=0)
+        self.assertEqual(resps[0]['data'], 'Crawl #1 (contests): 2 of 3 items done. Run '
+                                           '`--resume 1` to fetch the rest.')
+        self.assertEqual(sorted(requested), ['C1', 'C2', 'C2', 'C2', 'C3'])
+
+        is_down['C2'] = False
+        requested.clear()
+        resps = resume_crawl(output_file=output_file, retry_delay=0)
+        self.assertEqual(requested, ['C2'])
+        self.assertEqual(resps[0]['data'], 'Crawl #1 (contests): 3 of 3 items done. Wrote 4 '
+                                           f'records into {output_file}')
+        with open(output_file) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([(record['CONTEST'], record['CODE']) for record in records], [
+            ('C1', 'C1P1'), ('C1', 'C1P2'), ('C2', 'C2P1'), ('C2', 'C2P2')])
+
+        self.assertEqual(resume_crawl()[0]['code'], 404)
+        self.assertEqual(resume_crawl(1, retry_delay=0)[0]['data'],
+                         'Crawl #1 (contests): 3 of 3 items done.')
+        self.assertEqual(requested, ['C2'])
+        self.assertEqual(list_crawls()[0]['data'][1][1:3], ['contests', 'c1 c2 c3'])
+
+    def test_crawl_item_errors(self):
+        """Should fail only the item that raised and give up on it after the max attempts"""
+        requested = []
+
+        def mock_get_contest_json(contest_code):
+            requested.append(contest_code)
+            if contest_code == 'C2':
+                raise KeyError('problems')
+            return get_contest_json(contest_code, [f'{contest_code}P1'])
+
+        self.monkeypatch.setattr(crawl, "CRAWL_MAX_ATTEMPTS", 4)
+        self.monkeypatch.setattr(crawl, "get_contest_json", mock_get_contest_json)
+        resps = start_crawl('contests', ['c1', 'c2'], num_workers=2, retry_delay=0)
+        self.assertEqual(resps[0]['data'], 'Crawl #1 (contests): 1 of 2 items done. Run '
+                                           '`--resume 1` to fetch the rest.')
+
+        requested.clear()
+        resps = resume_crawl(retry_delay=0)
+        self.assertEqual(requested, ['C2'])
+        self.assertEqual(resps[0]['data'], 'Crawl #1 (contests): 1 of 2 items done. Gave up '
+                                           'on 1 item(s) after 4 attempts.')
+        self.assertEqual(resume_crawl()[0]['code'], 404)
+        self.assertEqual(requested, ['C2'])
+
+    def test_crawl_ratings(self):
+        """Should queue every ratings page after the first and keep the first page's users"""
+        pages = []
+
+        def mock_get_ratings_json(csrf_token, filter_by, page, lines):
+            pages.append(page)
+            return {'availablePages': 3, 'list': [{'username': f'u{page}'}]}
+
+        self.monkeypatch.setattr(crawl, "get_ratings_csrf_token", lambda: 'token')
+        self.monkeypatch.setattr(crawl, "get_ratings_json", mock_get_ratings_json)
+        entry_point.main(['codechefcli', '--crawl', 'ratings', '--country', 'India', '-o',
+                          output_file])
+        self.assertEqual(sorted(pages), [1, 2, 3])
+        with open(output_file) as f:
+            self.assertEqual([json.loads(line)['username'] for line in f], ['u1', 'u2', 'u3'])
+
+        conn = get_db()
+        try:
+            self.assertEqual(get_progress(conn, 1), (3, 0, 0))
+        finally:
+            conn.close()
+
+    def test_crawl_command_errors(self):
+        """Should reject unknown kinds & missing targets"""
+        self.assertEqual(entry_point.main(['codechefcli', '--crawl', 'teams'])[0]['code'], 400)
+        self.assertEqual(entry_point.main(['codechefcli', '--crawl', 'solutions'])[0]['code'], 400)
+        self.assertEqual(entry_point.main(['codechefcli', '--crawls'])[0]['code'], 404)
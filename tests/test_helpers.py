@@ -1,12 +1,27 @@
+import io
+import os
 from http.cookiejar import Cookie
 from unittest import TestCase
 
+from _pytest.monkeypatch import MonkeyPatch
+from requests.exceptions import ConnectionError
 from requests_html import HTML, HTMLSession
 
-from codechefcli.helpers import (SERVER_DOWN_MSG, UNAUTHORIZED_MSG, get_csrf_token, get_session,
-                                 get_username, html_to_list, init_session_cookie, print_response,
-                                 print_table)
-from tests.utils import fake_login, fake_logout
+from codechefcli import helpers
+from codechefcli.helpers import (SERVER_DOWN_MSG, SHARED_SESSION, UNAUTHORIZED_MSG,
+                                 MultipartFileStream, NetworkError, Validators, get_csrf_token,
+                                 get_session, get_username, html_to_list, init_session_cookie,
+                                 persistent_session, print_response, print_table, read_until,
+                                 request, run_concurrently, stream_tables)
+from tests.utils import MockStreamResponse, fake_login, fake_logout
+
+upload_file = '/tmp/codechefcli-upload.txt'
+pager_file = '/tmp/codechefcli-pager.txt'
+
+
+class MockTerminal(io.StringIO):
+    def isatty(self):
+        return True
 
 
 class HelpersTestCase(TestCase):
@@ -67,6 +82,71 @@ class HelpersTestCase(TestCase):
             'A    V    \n\na1   v1   \n\na2   v2   '
         )
 
+    def test_print_table_pager(self):
+        """Should stream the table into the pager only, on a terminal"""
+        monkeypatch = MonkeyPatch()
+        terminal = MockTerminal()
+        monkeypatch.setattr(helpers.sys, "stdout", terminal)
+        monkeypatch.setenv("PAGER", f"cat > {pager_file}")
+        try:
+            table = print_table([['A', 'V'], ['a1', 'v1']])
+        finally:
+            monkeypatch.undo()
+
+        with open(pager_file) as f:
+            self.assertEqual(f.read(), f'{table}\n')
+        os.remove(pager_file)
+        self.assertEqual(terminal.getvalue(), '')
+
+    def test_get_pager_command(self):
+        """Should page with `less -R` unless a pager is set, and not page on a dumb terminal"""
+        monkeypatch = MonkeyPatch()
+        monkeypatch.delenv("MANPAGER", raising=False)
+        monkeypatch.delenv("PAGER", raising=False)
+        monkeypatch.delenv("LESS", raising=False)
+        monkeypatch.setenv("TERM", "xterm")
+        monkeypatch.setattr(helpers.shutil, "which", lambda command: f'/usr/bin/{command}')
+        try:
+            command, env = helpers.get_pager_command()
+            self.assertEqual((command, env['LESS']), ('less', '-R'))
+
+            monkeypatch.setenv("LESS", "-X")
+            self.assertEqual(helpers.get_pager_command()[1]['LESS'], '-X')
+
+            monkeypatch.setenv("TERM", "dumb")
+            self.assertIsNone(helpers.get_pager_command())
+
+            monkeypatch.setenv("PAGER", "most")
+            self.assertEqual(helpers.get_pager_command(), ('most', None))
+        finally:
+            monkeypatch.undo()
+
+    def test_wait_for_pager_ignores_interrupt(self):
+        """Should keep waiting for the pager when ctrl-c is hit"""
+        class MockPager:
+            num_waits = 0
+
+            def wait(self):
+                self.num_waits += 1
+                if self.num_waits == 1:
+                    raise KeyboardInterrupt()
+
+        proc = MockPager()
+        helpers.wait_for_pager(proc)
+        self.assertEqual(proc.num_waits, 2)
+
+    def test_print_table_pager_quit(self):
+        """Should stop rendering once the pager exits"""
+        monkeypatch = MonkeyPatch()
+        monkeypatch.setattr(helpers.sys, "stdout", MockTerminal())
+        monkeypatch.setenv("PAGER", "true")
+        data_rows = [['A', 'V']] + [[str(i), 'v' * 50] for i in range(20000)]
+        try:
+            table = print_table(data_rows)
+        finally:
+            monkeypatch.undo()
+        self.assertLess(table.count('\n\n'), len(data_rows) - 1)
+
     def test_print_response_503(self):
         """Should set color 'FAIL' and data when 503 code is provided"""
         self.assertEqual(print_response(code=503)[0], f'\x1b[91m{SERVER_DOWN_MSG}\x1b[0m')
@@ -106,3 +186,132 @@ class HelpersTestCase(TestCase):
         """Should return token from html element's value"""
         html = HTML(html="<input id='a' value='b' />")
         self.assertEqual(get_csrf_token(html, "a"), 'b')
+
+    def test_read_until_stops_early(self):
+        """Should stop reading the stream once all selectors matched complete elements"""
+        resp = MockStreamResponse([
+            b"<html><body><div class='a'>A</div>",
+            b"<table><tr><td>1</td></tr></table>",
+            b"<div class='rest'>never read</div></body></html>"
+        ])
+        read_until(resp, ['.a', 'table'])
+        self.assertEqual(resp.num_chunks_read, 2)
+        self.assertTrue(resp.closed)
+        self.assertNotIn(b'never read', resp._content)
+
+    def test_read_until_reads_all_when_not_found(self):
+        """Should read the complete stream when a selector never matches"""
+        resp = MockStreamResponse([b"<div class='a'>A</div>", b"<p>B</p>"])
+        read_until(resp, ['.missing'])
+        self.assertEqual(resp.num_chunks_read, 2)
+        self.assertEqual(resp._content, b"<div class='a'>A</div><p>B</p>")
+
+    def test_stream_tables_matches_html_to_list(self):
+        """Should yield the same rows as html_to_list for each table, in order"""
+        html = "<table><tr><th>a b</th><th>c</th></tr><tr><td>1<br>2</td><td> 3 </td></tr>" \
+            "<tr><td>4</td><td>5</td></tr></table><table><tr><td>x</td></tr></table>"
+        resp = MockStreamResponse([html[i:i + 7].encode() for i in range(0, len(html), 7)])
+        tables = list(stream_tables(resp))
+        expected = [html_to_list(table) for table in HTML(html=html).find('table')]
+        self.assertEqual(tables, list(enumerate(expected)))
+        self.assertTrue(resp.closed)
+
+    def test_stream_tables_texts_and_early_stop(self):
+        """Should fill in selector texts and stop reading when the consumer stops"""
+        resp = MockStreamResponse([
+            b"<table><tr><th>A</th></tr><tr><td>1</td></tr></table>",
+            b"<div class='info'>Page 1 of 3</div>",
+            b"<table><tr><td>never read</td></tr></table>"
+        ])
+        texts = {'.info': None}
+        for index, data_rows in stream_tables(resp, texts=texts):
+            self.assertEqual(data_rows, [['A'], ['1']])
+            break
+        self.assertEqual(resp.num_chunks_read, 1)
+        self.assertTrue(resp.closed)
+        self.assertIsNone(texts['.info'])
+
+        resp = MockStreamResponse(resp.chunks)
+        self.assertEqual(len(list(stream_tables(resp, texts=texts))), 2)
+        self.assertEqual(texts['.info'], 'Page 1 of 3')
+
+    def test_stream_tables_last_table(self):
+        """Should stop reading once the last table & every text are in, tables or not"""
+        resp = MockStreamResponse([
+            b"<table><tr><td>1</td></tr></table>", b"<div class='info'>Page 1 of 3</div>",
+            b"<div>footer</div>", b"<p>never read</p>"
+        ])
+        texts = {'.info': None}
+        self.assertEqual(list(stream_tables(resp, texts=texts, last_table=0)), [(0, [['1']])])
+        self.assertEqual(texts['.info'], 'Page 1 of 3')
+        self.assertEqual(resp.num_chunks_read, 2)
+        self.assertTrue(resp.closed)
+
+    def test_persistent_session_revalidates(self):
+        """Should send validators of the previous response and reuse it on 304"""
+        sent_headers = []
+
+        class MockValidatedResponse:
+            def __init__(self, status_code):
+                self.status_code = status_code
+                self.headers = {'ETag': '"v1"'}
+
+        def mock_session_req(*args, **kwargs):
+            sent_headers.append(kwargs.get('headers'))
+            return MockValidatedResponse(304 if kwargs.get('headers') else 200)
+
+        with persistent_session() as session:
+            session.request = mock_session_req
+            first_resp = request(url='/contests')
+            second_resp = request(url='/contests')
+
+        self.assertEqual(sent_headers, [None, {'If-None-Match': '"v1"'}])
+        self.assertIs(second_resp, first_resp)
+        self.assertIsNone(SHARED_SESSION['session'])
+
+    def test_validators_bounded(self):
+        """Should drop the least recently used pages beyond the size limit"""
+        validators = Validators(max_size=2)
+        validators['a'], validators['b'] = 1, 2
+        self.assertEqual(validators.get('a'), 1)
+        validators['c'] = 3
+        self.assertEqual(len(validators), 2)
+        self.assertIsNone(validators.get('b'))
+        self.assertEqual((validators.get('a'), validators.get('c')), (1, 3))
+
+    def test_request_network_error(self):
+        """Should raise NetworkError instead of exiting when the connection fails"""
+        def mock_session_req(*args, **kwargs):
+            raise ConnectionError()
+
+        with persistent_session() as session:
+            session.request = mock_session_req
+            with self.assertRaises(NetworkError):
+                request(url='/contests')
+
+    def test_run_concurrently_keeps_order(self):
+        """Should return results in the order of the items"""
+        self.assertEqual(run_concurrently(lambda x: x * 2, range(20), num_workers=4),
+                         [x * 2 for x in range(20)])
+        self.assertEqual(run_concurrently(lambda x: x, []), [])
+
+    def test_multipart_file_stream(self):
+        """Should stream a multipart body of the fields and the (memory-mapped) file"""
+        monkeypatch = MonkeyPatch()
+        monkeypatch.setattr(helpers, "UPLOAD_MMAP_MIN_SIZE", 1)
+        with open(upload_file, 'w') as f:
+            f.write('print(1)\n' * 10)
+
+        stream = MultipartFileStream({'a': 'b'}, 'file', upload_file, chunk_size=7)
+        with stream as body:
+            chunks = [bytes(chunk) for chunk in body]
+            self.assertEqual(len(body), len(b''.join(chunks)))
+        monkeypatch.undo()
+
+        content = b''.join(chunks).decode()
+        self.assertTrue(stream.content_type.endswith(stream.boundary))
+        self.assertTrue(f'--{stream.boundary}\r\nContent-Disposition: form-data; name="a"\r\n\r\nb'
+                        in content)
+        self.assertTrue('filename="codechefcli-upload.txt"' in content)
+        self.assertTrue(content.endswith(f'print(1)\n\r\n--{stream.boundary}--\r\n'))
+        self.assertTrue(stream.file.closed)
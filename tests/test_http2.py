@@ -0,0 +1,51 @@
+from unittest import TestCase, skipIf
+
+from codechefcli import http2
+from codechefcli.helpers import BASE_URL, get_session, request, set_transport
+from codechefcli.http2 import Http2Transport, is_http2_available
+
+httpx = http2.httpx
+
+
+@skipIf(not is_http2_available(), 'httpx[http2] is not installed')
+class Http2TransportTestCase(TestCase):
+    def setUp(self):
+        self.requests = []
+
+        def handler(req):
+            self.requests.append(req)
+            return httpx.Response(
+                200, headers={'ETag': '"v1"'},
+                content=b'<html><body><div id="a">a</div><div id="b">b</div>' + b'x' * 20000)
+
+        self.transport = Http2Transport()
+        self.transport.client = httpx.Client(transport=httpx.MockTransport(handler))
+        self.previous = set_transport(self.transport)
+        self.session = get_session()
+
+    def tearDown(self):
+        set_transport(self.previous)
+        self.transport.close()
+
+    def test_send(self):
+        """Should return a requests-compatible HTML response"""
+        resp = request(session=self.session, url='/contests', token='t', params={'page': 2})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers['etag'], '"v1"')
+        self.assertEqual(resp.html.find('#b', first=True).text, 'b')
+        self.assertEqual(str(self.requests[0].url), f'{BASE_URL}/contests?page=2')
+        self.assertEqual(self.requests[0].headers['X-CSRF-Token'], 't')
+
+    def test_send_streamed(self):
+        """Should stream the body, so reads can stop once the elements are parsed"""
+        resp = request(session=self.session, url='/status/A', until=['#b'])
+        self.assertEqual(resp.html.find('#a', first=True).text, 'a')
+        self.assertLess(len(resp.content), 20000)
+
+    def test_send_body(self):
+        """Should send forms as form data & other bodies as raw content"""
+        request(session=self.session, method='POST', url='/submit', data={'a': '1'})
+        request(session=self.session, method='POST', url='/submit', data=iter([b'ab', b'cd']),
+                headers={'Content-Type': 'text/plain'})
+        self.assertEqual(self.requests[0].content, b'a=1')
+        self.assertEqual(self.requests[1].content, b'abcd')
@@ -0,0 +1,62 @@
+import os
+from unittest import TestCase
+
+from codechefcli.judge import JUDGE_TABLE_HEADINGS, get_sample_cases, judge_solution
+
+solution_file = '/tmp/codechefcli_solution.py'
+
+
+class JudgeTestCase(TestCase):
+    def tearDown(self):
+        if os.path.exists(solution_file):
+            os.remove(solution_file)
+
+    def write_solution(self, code):
+        with open(solution_file, 'w') as f:
+            f.write(code)
+
+    def test_get_sample_cases_components(self):
+        """Should prefer sample cases from problem components"""
+        problem_json = {
+            'problemComponents': {'sampleTestCases': [{'input': '1 2', 'output': '3'}]},
+            'body': '### Sample Input\n```\n5 5\n```\n### Sample Output\n```\n10\n```'
+        }
+        self.assertEqual(get_sample_cases(problem_json), [('1 2', '3')])
+
+    def test_get_sample_cases_markdown(self):
+        """Should extract sample cases from markdown code blocks"""
+        problem_json = {'body': (
+            '### Sample Input 1\n```\n1 2\n```\n\n### Sample Output 1\n```\n3\n```\n'
+            '### Sample Input 2\n```\n2 2\n```\n### Sample Output 2\n```\n4\n```'
+        )}
+        self.assertEqual(get_sample_cases(problem_json), [('1 2\n', '3\n'), ('2 2\n', '4\n')])
+
+    def test_get_sample_cases_html(self):
+        """Should extract sample cases from labelled pre blocks"""
+        problem_json = {'body': '<pre><b>Input:</b>\n1 2\n<b>Output:</b>\n3\n</pre>'}
+        self.assertEqual(
+            [tuple(part.strip() for part in case) for case in get_sample_cases(problem_json)],
+            [('1 2', '3')])
+
+    def test_judge_solution_invalid_language(self):
+        """Should return 400 response when language is not supported"""
+        self.write_solution('')
+        self.assertEqual(judge_solution(solution_file, 'brainfuck', [('', '')])[0]['code'], 400)
+
+    def test_judge_solution_no_cases(self):
+        """Should return 404 response when problem has no sample cases"""
+        self.write_solution('')
+        self.assertEqual(judge_solution(solution_file, 'python3', [])[0]['code'], 404)
+
+    def test_judge_solution(self):
+        """Should run all samples and report verdict, time & memory per case"""
+        self.write_solution('import sys\na, b = map(int, sys.stdin.read().split())\n'
+                            'if a < 0: raise ValueError\nif a > 100: import time; time.sleep(5)\n'
+                            'print(a + b)\n')
+        cases = [('1 2', '3'), ('2 2', '5'), ('-1 2', '1'), ('101 1', '102')]
+        resps = judge_solution(solution_file, 'Python3', cases, time_limit=1)
+
+        data_rows = resps[0]['data']
+        self.assertEqual(data_rows[0], JUDGE_TABLE_HEADINGS)
+        self.assertEqual([row[1] for row in data_rows[1:]], ['AC', 'WA', 'RTE', 'TLE'])
+        self.assertTrue('1/4 sample cases passed.' in resps[1]['data'])
@@ -0,0 +1,128 @@
+import os
+import shutil
+import socket
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import __main__ as cli
+from codechefcli import cache, helpers
+from codechefcli.cache import get_cached, set_cached
+from codechefcli.helpers import NetworkError, print_table, request
+from codechefcli.metrics import (METRICS, enable_metrics, get_endpoint_label, inc, observe,
+                                 parse_address, reset_metrics, send_statsd, to_prometheus,
+                                 to_statsd_lines)
+
+cache_dir = '/tmp/codechefcli-cache'
+metrics_file = '/tmp/codechefcli-metrics.prom'
+
+
+class MockResponse:
+    status_code = 200
+    headers = {}
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(cache, "CACHE_DIR", cache_dir)
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        reset_metrics()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        if os.path.exists(metrics_file):
+            os.remove(metrics_file)
+
+    def test_disabled(self):
+        """Should record nothing until metrics are enabled"""
+        inc('a_total')
+        observe('b_seconds', 1)
+        print_table([['A'], ['1']], is_pager=False)
+        self.assertEqual(METRICS['counters'], {})
+        self.assertEqual(METRICS['histograms'], {})
+        self.assertEqual(to_prometheus(), '')
+
+    def test_get_endpoint_label(self):
+        """Should keep the route of a url, without per-page segments"""
+        self.assertEqual(get_endpoint_label('https://www.codechef.com/users/abc'), '/users')
+        self.assertEqual(get_endpoint_label('/api/contests/START1/problems/P1'), '/api/contests')
+        self.assertEqual(get_endpoint_label('https://www.codechef.com/'), '/')
+
+    def test_to_prometheus(self):
+        """Should write counters & cumulative histogram buckets in Prometheus text format"""
+        enable_metrics()
+        inc('a_total', 2, kind='x"y')
+        observe('b_seconds', 0.01)
+        observe('b_seconds', 3)
+        lines = to_prometheus().splitlines()
+        self.assertEqual(lines[:2], ['# TYPE codechefcli_a_total counter',
+                                     'codechefcli_a_total{kind="x\\"y"} 2'])
+        self.assertIn('codechefcli_b_seconds_bucket{le="0.01"} 1', lines)
+        self.assertIn('codechefcli_b_seconds_bucket{le="2.5"} 1', lines)
+        self.assertIn('codechefcli_b_seconds_bucket{le="+Inf"} 2', lines)
+        self.assertEqual(lines[-2:], ['codechefcli_b_seconds_sum 3.01',
+                                      'codechefcli_b_seconds_count 2'])
+
+    def test_instrumented_calls(self):
+        """Should count requests, network errors, cache lookups and rendered rows"""
+        enable_metrics()
+
+        class MockTransport:
+            def send(self, session, method, url, **kwargs):
+                if 'down' in url:
+                    raise helpers.ConnectionError()
+                return MockResponse()
+
+        self.monkeypatch.setattr(helpers, "TRANSPORT", {'transport': MockTransport()})
+        request(session=object(), url='/users/a')
+        request(session=object(), url='/users/b')
+        with self.assertRaises(NetworkError):
+            request(session=object(), url='/down')
+
+        get_cached('ns', 'key')
+        set_cached('ns', 'key', 1)
+        get_cached('ns', 'key')
+        print_table([['A'], ['1'], ['2']], is_pager=False)
+
+        counters = METRICS['counters']
+        self.assertEqual(counters[('http_requests_total', (
+            ('endpoint', '/users'), ('method', 'GET'), ('status', '200')))], 2)
+        self.assertEqual(counters[('http_errors_total', (
+            ('endpoint', '/down'), ('error', 'ConnectionError')))], 1)
+        self.assertEqual(counters[('cache_requests_total', (
+            ('namespace', 'ns'), ('result', 'hit')))], 1)
+        self.assertEqual(counters[('cache_requests_total', (
+            ('namespace', 'ns'), ('result', 'miss')))], 1)
+        self.assertEqual(counters[('rows_rendered_total', ())], 3)
+        self.assertEqual(
+            len(METRICS['histograms'][('http_request_duration_seconds', (
+                ('endpoint', '/users'),))]), 2)
+
+    def test_send_statsd(self):
+        """Should send counters & timers with DogStatsD tags over UDP"""
+        enable_metrics()
+        inc('a_total', kind='x')
+        observe('b_seconds', 0.25)
+        self.assertEqual(to_statsd_lines(), [
+            'codechefcli.a_total:1|c|#kind:x', 'codechefcli.b_seconds:250.0|ms'])
+
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.bind(('127.0.0.1', 0))
+            sock.settimeout(5)
+            address = parse_address(f'127.0.0.1:{sock.getsockname()[1]}')
+            self.assertEqual(send_statsd(address), 1)
+            self.assertEqual(
+                sock.recv(4096).decode(),
+                'codechefcli.a_total:1|c|#kind:x\ncodechefcli.b_seconds:250.0|ms')
+
+    def test_main_metrics_file(self):
+        """Should write the metrics file when the run ends, even on network errors"""
+        def mock_get_contests(*args, **kwargs):
+            raise NetworkError('down')
+
+        self.monkeypatch.setattr(cli, "get_contests", mock_get_contests)
+        with self.assertRaises(SystemExit):
+            cli.main(['codechefcli', '--contests', '--metrics-file', metrics_file])
+        with open(metrics_file) as f:
+            self.assertIn('codechefcli_runs_total{status="network_error"} 1', f.read())
@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import __main__ as entry_point
+from codechefcli import cache, problems, team_index, teams, users
+from codechefcli.parse_pool import (is_parse_pool_running, shutdown_parse_pool,
+                                    start_parse_pool)
+from codechefcli.problems import PAGE_INFO_CLASS, get_solutions_page
+from tests.test_teams import TEAM_HTML
+from tests.test_users import USER_PROFILE_HTML
+from tests.utils import MockHTMLResponse
+
+cache_dir = '/tmp/codechefcli-cache'
+teams_db_file = '/tmp/codechefcli-teams.db'
+usernames_file = '/tmp/codechefcli-usernames.txt'
+
+SOLUTIONS_HTML = f'<table></table><table></table><table> \
+    <tr><th>A</th><th>B</th><th>C</th><th>D</th><th>E</th></tr> \
+    <tr><td>a1</td><td>b1</td><td>c1</td><td>d\n1</td><td>e1</td></tr> \
+</table><div class="{PAGE_INFO_CLASS[1:]}">1 of 4</div>'
+
+
+class ParsePoolTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(cache, "CACHE_DIR", cache_dir)
+        self.monkeypatch.setattr(team_index, "TEAMS_DB_PATH", teams_db_file)
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        shutdown_parse_pool()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        for file_path in [teams_db_file, usernames_file]:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def fetch_all(self):
+        users_resps = users.get_users(usernames_file)
+        team = teams.get_team_record('t1')
+        solutions_page = get_solutions_page('P1', {})
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return users_resps, team, solutions_page
+
+    def test_pooled_parsing(self):
+        """Should parse profiles, team & solutions pages in worker processes like in-thread"""
+        with open(usernames_file, 'w') as f:
+            f.write('abcd\nefgh\n')
+
+        self.monkeypatch.setattr(users, "request", lambda **kwargs: MockHTMLResponse(
+            data=USER_PROFILE_HTML, url=kwargs['url']))
+        self.monkeypatch.setattr(teams, "request", lambda **kwargs: MockHTMLResponse(
+            data=TEAM_HTML.format(name='t1', member='u2', problem='P2')))
+        self.monkeypatch.setattr(problems, "request", lambda **kwargs: MockHTMLResponse(
+            data=SOLUTIONS_HTML, url='/status/P1'))
+
+        expected = self.fetch_all()
+        start_parse_pool(2)
+        self.assertEqual(self.fetch_all(), expected)
+
+        users_resps, team, solutions_page = expected
+        self.assertEqual([json.loads(line)['username'] for line in
+                          users_resps[0]['data'].split('\n')], ['abcd', 'efgh'])
+        self.assertEqual(team['data']['members'], ['u1', 'u2'])
+        self.assertEqual(solutions_page, (200, [['A', 'B', 'C', 'D'], ['a1', 'b1', 'c1', 'd 1']],
+                                          '1 of 4'))
+
+    def test_main_parse_processes(self):
+        """Should run the pool only for the command that asked for it"""
+        resps = entry_point.main(['codechefcli', '--parse-processes', '--users-from', '/tmp/x/y'])
+        self.assertEqual(resps[0]['code'], 400)
+        self.assertFalse(is_parse_pool_running())
@@ -0,0 +1,116 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import cache, prefetch, problems
+from codechefcli.prefetch import (cancel_prefetch, prefetch_ratings, prefetch_solutions,
+                                  read_pid, start_prefetch)
+from codechefcli.problems import get_ratings, get_solutions
+
+cache_dir = '/tmp/codechefcli-cache'
+pid_path = '/tmp/codechefcli-prefetch.pid'
+HEADING = ['ID', 'DATE/TIME', 'USER', 'RESULT', 'TIME', 'MEM', 'LANG']
+
+
+class PrefetchTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(cache, "CACHE_DIR", cache_dir)
+        self.monkeypatch.setattr(prefetch, "PREFETCH_PID_PATH", pid_path)
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        if os.path.exists(pid_path):
+            os.remove(pid_path)
+
+    def test_prefetch_solutions(self):
+        """Should cache the next pages until the last one and serve each of them once"""
+        requested_pages = []
+
+        def mock_get_solutions_page(problem_code, params):
+            requested_pages.append(params['page'])
+            if params['page'] > 2:
+                return 200, [HEADING], None
+            return 200, [HEADING, [str(params['page'])] + ['x'] * 6], f"{params['page']} of 3"
+
+        self.monkeypatch.setattr(prefetch, "get_solutions_params", lambda *args: {'status': 15})
+        self.monkeypatch.setattr(prefetch, "get_solutions_page", mock_get_solutions_page)
+        self.assertEqual(prefetch_solutions('P1', 1, None, 'AC', None, 5, delay=0), 2)
+        self.assertEqual(requested_pages, [1, 2, 3])
+
+        self.assertEqual(prefetch_solutions('P1', 1, None, 'AC', None, 2, delay=0), 0)
+        self.assertEqual(requested_pages, [1, 2, 3])
+
+        def fail(*args, **kwargs):
+            raise AssertionError('should be served from the prefetched page')
+
+        self.monkeypatch.setattr(problems, "get_solutions_params", fail)
+        resps = get_solutions(None, None, 'p1', 2, None, 'AC', None)
+        self.assertEqual(resps[0]['data'][1][0], '1')
+        self.assertEqual(resps[0]['extra'], '\nPage: 1 of 3')
+
+        self.monkeypatch.setattr(problems, "get_solutions_params", lambda *args: None)
+        self.assertEqual(get_solutions(None, None, 'p1', 2, None, 'AC', None)[0]['code'], 503)
+
+    def test_prefetch_ratings(self):
+        """Should fetch the CSRF token once and stop at the first empty page"""
+        num_tokens = []
+
+        def mock_get_ratings_csrf_token():
+            num_tokens.append(1)
+            return 'token'
+
+        def mock_get_ratings_json(csrf_token, filter_by, page, lines):
+            users = [] if page > 3 else [{
+                'global_rank': page, 'country_rank': page, 'username': f'u{page}', 'rating': 1,
+                'diff': 0}]
+            return {'list': users}
+
+        self.monkeypatch.setattr(prefetch, "get_ratings_csrf_token", mock_get_ratings_csrf_token)
+        self.monkeypatch.setattr(prefetch, "get_ratings_json", mock_get_ratings_json)
+        self.assertEqual(prefetch_ratings('India', None, None, 1, 20, 4, delay=0), 2)
+        self.assertEqual(len(num_tokens), 1)
+
+        self.monkeypatch.setattr(problems, "get_ratings_csrf_token", lambda: None)
+        self.assertEqual(get_ratings(None, None, 'India', None, None, 3, 20,
+                                     use_prefetched=False)[0]['code'], 503)
+        resps = get_ratings(None, None, 'India', None, None, 3, 20)
+        self.assertEqual(resps[0]['data'][1][1], 'u3')
+        self.assertEqual(get_ratings(None, None, 'India', None, None, 3, 20)[0]['code'], 503)
+
+    def test_cancel_prefetch(self):
+        """Should stop the running prefetch process and start none for zero pages"""
+        proc = subprocess.Popen([sys.executable, '-c', (
+            'import time\n'
+            'from codechefcli import prefetch\n'
+            f'prefetch.PREFETCH_PID_PATH = {pid_path!r}\n'
+            'prefetch.PREFETCHERS["sleep"] = lambda num_pages: time.sleep(30)\n'
+            'prefetch.run_prefetch("sleep", [], 1)\n')])
+        for _ in range(100):
+            if read_pid() == proc.pid:
+                break
+            time.sleep(0.05)
+
+        self.assertIsNone(start_prefetch('ratings', [None, None, None, 1, 20], 0))
+        self.assertEqual(proc.wait(timeout=5), 0)
+        self.assertIsNone(read_pid())
+        self.assertFalse(cancel_prefetch())
+
+    def test_cancel_stale_pid(self):
+        """Should leave alone a process whose pid was left over by a dead prefetch"""
+        proc = subprocess.Popen(['sleep', '30'])
+        with open(pid_path, 'w') as f:
+            f.write(str(proc.pid))
+
+        try:
+            self.assertFalse(cancel_prefetch())
+            self.assertIsNone(proc.poll())
+        finally:
+            proc.kill()
+            proc.wait()
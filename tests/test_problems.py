@@ -1,29 +1,42 @@
+import os
 from os import environ
 from platform import platform
 from unittest import TestCase
 
 from _pytest.monkeypatch import MonkeyPatch
 
-from codechefcli import problems
+from codechefcli import contests, helpers, problems, statements
 from codechefcli.auth import LOGIN_FORM_ID
+from codechefcli.helpers import persistent_session
 from codechefcli.problems import (COMPILATION_ERROR_CLASS, INVALID_SOLUTION_ID_MSG,
                                   LANGUAGE_DROPDOWN_ID, LANGUAGE_SELECTOR, PAGE_INFO_CLASS,
                                   PROBLEM_SUBMISSION_FORM_ID, SOLUTION_ERR_MSG_CLASS,
-                                  build_request_params, get_contest_problems, get_contests,
-                                  get_description, get_ratings, get_solution, get_solutions,
-                                  get_tags, search_problems, submit_problem)
-from tests.utils import HTML, MockHTMLResponse, fake_login
+                                  build_request_params, get_contest_problems, get_contest_range,
+                                  get_contests, get_contests_problems, get_description,
+                                  get_ratings, get_solution, get_solutions, get_tags,
+                                  search_problems, submit_problem)
+from tests.utils import HTML, MockHTMLResponse, MockStreamResponse, fake_login
 
 temp_file_a = '/tmp/a'
+contests_db_file = '/tmp/codechefcli-contests.db'
+statements_db_file = '/tmp/codechefcli-statements.db'
 if 'Windows' in platform():
     temp_file_a = environ['TMP'] + r'\a'
+    contests_db_file = environ['TMP'] + r'\codechefcli-contests.db'
+    statements_db_file = environ['TMP'] + r'\codechefcli-statements.db'
 
 
 class ProblemsTestCase(TestCase):
     def setUp(self):
         self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(statements, "STATEMENTS_DB_PATH", statements_db_file)
         fake_login()
 
+    def tearDown(self):
+        self.monkeypatch.undo()
+        if os.path.exists(statements_db_file):
+            os.remove(statements_db_file)
+
     def test_get_problem_desc_invalid_json(self):
         """Should return 503 when response is not JSON-parsable"""
         def mock_req(*args, **kwargs):
@@ -86,6 +99,28 @@ class ProblemsTestCase(TestCase):
         self.monkeypatch.setattr(problems, "request", mock_req)
         self.assertEqual(submit_problem("A", "invalid_path/invalid_path", "a")[0]['code'], 400)
 
+    def test_submit_problem_source_limit_exceeded(self):
+        """Should return 400 response without submitting when file exceeds the source limit"""
+        methods = []
+
+        def mock_req(*args, **kwargs):
+            methods.append(kwargs.get('method', 'GET'))
+            return MockHTMLResponse(data=f" \
+                <form id='{PROBLEM_SUBMISSION_FORM_ID[1:]}'> \
+                    <select id='{LANGUAGE_DROPDOWN_ID[1:]}'> \
+                        <option value='a'>a(A)</option> \
+                    </select> \
+                </form> \
+            ", json='{"source_sizelimit": "3"}')
+        self.monkeypatch.setattr(problems, "request", mock_req)
+
+        with open(temp_file_a, 'w') as f:
+            f.write('abcd')
+        resps = submit_problem("A", temp_file_a, "a")
+        self.assertEqual(resps[0]['code'], 400)
+        self.assertTrue('Source limit: 3 Bytes' in resps[0]['data'])
+        self.assertNotIn('POST', methods)
+
     def test_submit_problem_status_not_200(self):
         """Should return 503 response when status code is not 200"""
         def mock_req(*args, **kwargs):
@@ -295,6 +330,49 @@ class SearchTestCase(TestCase):
         self.assertEqual(resps[2]['data'], "\n\x1b[1mAnnouncements\x1b[0m:\n---")
 
 
+class ContestsProblemsTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+
+    def mock_get_contest_json(self, contest_code):
+        if contest_code == 'START3':
+            return {'status': 'error'}
+        return {'status': 'success', 'problems': {
+            f'{contest_code}{index}': {
+                'name': f'N{index}', 'code': f'{contest_code}P{index}',
+                'problem_url': f'/{contest_code}P{index}', 'successful_submissions': index,
+                'accuracy': accuracy, 'category_name': 'main'
+            }
+            for index, accuracy in enumerate([9.5, 10, 55.25] if contest_code == 'START1' else [-1])
+        }}
+
+    def test_get_contest_range(self):
+        """Should expand a prefix & number range into contest codes"""
+        self.assertEqual(get_contest_range('start', 9, 11), ['START9', 'START10', 'START11'])
+        self.assertEqual(get_contest_range('START', 2, 1), [])
+
+    def test_get_contests_problems(self):
+        """Should merge the problems of all contests, sort them by value & report missing ones"""
+        self.monkeypatch.setattr(problems, "get_contest_json", self.mock_get_contest_json)
+        resps = get_contests_problems(
+            'accuracy', 'desc', ['start1', 'start2', 'start3'], max_accuracy=50)
+        self.assertEqual(resps[0]['data'][0][0], 'CONTEST')
+        self.assertEqual([row[:3] + row[5:6] for row in resps[0]['data'][1:]], [
+            ['START1', 'N1', 'START1P1', '10 %'],
+            ['START1', 'N0', 'START1P0', '9.5 %'],
+            ['START2', 'N0', 'START2P0', '-1 %'],
+        ])
+        self.assertEqual(resps[1], {'code': 404, 'data': 'Contests not found: START3'})
+
+        resps = get_contests_problems(None, 'asc', ['start1'], min_accuracy=60)
+        self.assertEqual(resps[0]['code'], 404)
+
+    def test_get_contests_problems_down(self):
+        """Should return 503 response when no contest could be fetched"""
+        self.monkeypatch.setattr(problems, "get_contest_json", lambda code: None)
+        self.assertEqual(get_contests_problems(None, 'asc', ['START1'])[0]['code'], 503)
+
+
 class TagsTestCase(TestCase):
     def setUp(self):
         self.monkeypatch = MonkeyPatch()
@@ -409,9 +487,23 @@ class RatingsTestCase(TestCase):
             ['GLOBAL(COUNTRY)', 'USER NAME', 'RATING', 'GAIN/LOSS'], ['1 (1)', 'u1', '1', '2']])
 
 
+def get_contests_page(*tables):
+    return MockHTMLResponse(data='<table></table>' + ''.join(
+        '<table><tr><th>Code</th><th>Name</th><th>Start</th><th>End</th></tr>' + ''.join(
+            f'<tr><td>{code}</td><td>{code.title()}</td><td>{start}</td><td>{end}</td></tr>'
+            for code, start, end in rows) + '</table>'
+        for rows in tables))
+
+
 class ContestsTestCase(TestCase):
     def setUp(self):
         self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(contests, "CONTESTS_DB_PATH", contests_db_file)
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        if os.path.exists(contests_db_file):
+            os.remove(contests_db_file)
 
     def test_get_contests_status_not_200(self):
         """Should return 503 response when status code is not 200"""
@@ -421,41 +513,72 @@ class ContestsTestCase(TestCase):
         self.assertEqual(get_contests(False)[0]['code'], 503)
 
     def test_get_contests_no_past(self):
-        """Should return present & future contests"""
+        """Should return present & future contests from the contests cache"""
+        num_reqs = []
+
         def mock_req(*args, **kwargs):
-            return MockHTMLResponse(data="<table></table> \
-                <table> \
-                    <tr><th>A</th><th>B</th></tr> \
-                    <tr><td>a1</td><td>b1</td></tr> \
-                </table> \
-                <table> \
-                    <tr><th>Af</th><th>Bf</th></tr> \
-                    <tr><td>af1</td><td>bf1</td></tr> \
-                </table> \
-            ")
+            num_reqs.append(1)
+            return get_contests_page(
+                [('START1', '2020-05-18 20:00:00', '2020-05-18 23:00:00')],
+                [('COOK1', '2020-05-25 21:30:00', '2020-05-26 00:00:00')])
         self.monkeypatch.setattr(problems, "request", mock_req)
         resps = get_contests(False)
         self.assertEqual(resps[0]['data'], "\x1b[1mPresent Contests:\n\x1b[0m")
         self.assertEqual(resps[1]['data_type'], "table")
-        self.assertEqual(resps[1]['data'], [['A', 'B'], ['a1', 'b1']])
+        self.assertEqual(resps[1]['data'], [
+            ['CODE', 'NAME', 'START', 'END'],
+            ['START1', 'Start1', '2020-05-18 20:00:00', '2020-05-18 23:00:00']])
         self.assertEqual(resps[2]['data'], "\x1b[1mFuture Contests:\n\x1b[0m")
-        self.assertEqual(resps[3]['data_type'], "table")
-        self.assertEqual(resps[3]['data'], [['AF', 'BF'], ['af1', 'bf1']])
+        self.assertEqual(resps[3]['data'][1][0], 'COOK1')
+        self.assertEqual(get_contests(False), resps)
+        self.assertEqual(len(num_reqs), 1)
 
     def test_get_contests_show_past(self):
-        """Should return past contests"""
+        """Should return past contests, started within the duration when one is given"""
+        now = contests.parse_contest_date('2020-05-18 12:00:00')
+
+        def mock_req(*args, **kwargs):
+            return get_contests_page([], [], [], [
+                ('LTIME1', '2020-05-17 19:30:00', '2020-05-17 22:30:00'),
+                ('LTIME0', '2020-04-17 19:30:00', '2020-04-17 22:30:00')])
+        self.monkeypatch.setattr(problems, "request", mock_req)
+        self.monkeypatch.setattr(contests.time, "time", lambda: now)
+        resps = get_contests(True)
+        self.assertEqual(resps[0]['data'], '\x1b[1mPast Contests:\n\x1b[0m')
+        self.assertEqual([row[0] for row in resps[1]['data']], ['CODE', 'LTIME0', 'LTIME1'])
+
+        resps = get_contests(True, starting_within=contests.parse_duration('2d'))
+        self.assertEqual([row[0] for row in resps[1]['data']], ['CODE', 'LTIME1'])
+
+    def test_get_contests_cached(self):
+        """Should refresh the contests cache once and answer filtered queries from it"""
+        num_reqs = []
+
         def mock_req(*args, **kwargs):
+            num_reqs.append(1)
             return MockHTMLResponse(data="<table></table> \
                 <table> \
-                    <tr><th>A</th><th>B</th></tr> \
-                    <tr><td>a1</td><td>b1</td></tr> \
+                    <tr><th>Code</th><th>Name</th><th>Start</th><th>End</th></tr> \
+                    <tr><td>START1</td><td>S1</td><td>2020-05-18 20:00:00</td> \
+                        <td>2020-05-18 23:00:00</td></tr> \
+                </table> \
+                <table> \
+                    <tr><th>Code</th><th>Name</th><th>Start</th><th>End</th></tr> \
+                    <tr><td>COOK1</td><td>C1</td><td>2020-05-25 21:30:00</td> \
+                        <td>2020-05-26 00:00:00</td></tr> \
                 </table> \
             ")
         self.monkeypatch.setattr(problems, "request", mock_req)
-        resps = get_contests(True)
-        self.assertEqual(resps[0]['data'], '\x1b[1mPast Contests:\n\x1b[0m')
+
+        resps = get_contests(False, code_prefix='START')
         self.assertEqual(resps[1]['data_type'], "table")
-        self.assertEqual(resps[1]['data'], [['A', 'B'], ['a1', 'b1']])
+        self.assertEqual(resps[1]['data'], [
+            ['CODE', 'NAME', 'START', 'END'],
+            ['START1', 'S1', '2020-05-18 20:00:00', '2020-05-18 23:00:00']
+        ])
+        self.assertEqual(get_contests(False, code_prefix='COOK')[1]['data'][1][0], 'COOK1')
+        self.assertEqual(get_contests(False, code_prefix='LTIME')[0]['code'], 404)
+        self.assertEqual(len(num_reqs), 1)
 
 
 class SolutionsTestCase(TestCase):
@@ -501,6 +624,44 @@ class SolutionsTestCase(TestCase):
         self.assertEqual(resps[0]['data'], [['A', 'B', 'C', 'D'], ['a1', 'b1', 'c1', 'd1']])
         self.assertEqual(resps[0]['extra'], '\nPage: 111')
 
+    def test_parse_solutions_page_stops_early(self):
+        """Should stop reading once the solutions table & the page info are in"""
+        resp = MockStreamResponse([
+            b'<table></table>', b'<table></table>',
+            b'<table><tr><th>A</th><th>B</th><th>C</th><th>D</th><th>E</th></tr>'
+            b'<tr><td>a1</td><td>b1</td><td>c1</td><td>d1</td><td>e1</td></tr></table>',
+            f'<div class="{PAGE_INFO_CLASS[1:]}">1 of 5</div>'.encode(),
+            b'<div>footer</div>', b'<p>more footer</p>', b'</body></html>'
+        ])
+        data_rows, page_info = problems.parse_solutions_page(resp)
+        self.assertEqual(data_rows, [['A', 'B', 'C', 'D'], ['a1', 'b1', 'c1', 'd1']])
+        self.assertEqual(page_info, '1 of 5')
+        self.assertEqual(resp.num_chunks_read, 4)
+        self.assertTrue(resp.closed)
+
+    def test_get_solutions_page_revalidates(self):
+        """Should revalidate a streamed solutions page and replay its rows on 304"""
+        sent_headers = []
+
+        def mock_session_req(*args, **kwargs):
+            sent_headers.append(kwargs.get('headers'))
+            resp = MockHTMLResponse(url='/status/P1', data='<table></table><table></table><table>'
+                                    '<tr><th>A</th><th>B</th><th>C</th><th>D</th><th>E</th></tr>'
+                                    '<tr><td>a1</td><td>b1</td><td>c1</td><td>d1</td><td>e1</td>'
+                                    '</tr></table>', status_code=304 if sent_headers[-1] else 200)
+            resp.headers = {'ETag': '"v1"'}
+            return resp
+
+        self.monkeypatch.setattr(problems, "request", helpers.request)
+        with persistent_session() as session:
+            session.request = mock_session_req
+            first = problems.get_solutions_page('P1', {})
+            second = problems.get_solutions_page('P1', {})
+
+        self.assertEqual(sent_headers, [None, {'If-None-Match': '"v1"'}])
+        self.assertEqual(first, (200, [['A', 'B', 'C', 'D'], ['a1', 'b1', 'c1', 'd1']], None))
+        self.assertEqual(second, first)
+
     def test_build_solution_filters(self):
         """Should return params dict containing solution filters"""
         params = build_request_params(
@@ -0,0 +1,91 @@
+import os
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import ratings_history
+from codechefcli.ratings_history import (get_db, get_delta, get_delta_rows, get_ratings_delta,
+                                         get_snapshots, save_snapshot, take_snapshot)
+
+ratings_db_file = '/tmp/codechefcli-ratings.db'
+
+
+def get_user(username, global_rank, rating):
+    return {'username': username, 'global_rank': global_rank, 'rating': rating}
+
+
+OLD_BOARD = [get_user('a', 1, 2500), get_user('b', 2, 2400), get_user('c', 3, 2300)]
+NEW_BOARD = [get_user('b', 1, 2550), get_user('A', 2, 2490), get_user('d', 3, 2350),
+             get_user('d', 4, 2350)]
+
+
+class RatingsHistoryTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(ratings_history, "RATINGS_DB_PATH", ratings_db_file)
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        if os.path.exists(ratings_db_file):
+            os.remove(ratings_db_file)
+
+    def test_save_snapshot_dedup(self):
+        """Should keep the first row per username & store usernames once"""
+        conn = get_db(':memory:')
+        save_snapshot(conn, 'all', OLD_BOARD, now=1)
+        save_snapshot(conn, 'all', NEW_BOARD, now=2)
+        self.assertEqual(get_snapshots(conn), [(1, 'all', 1, 3), (2, 'all', 2, 3)])
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0], 4)
+        conn.close()
+
+    def test_get_delta(self):
+        """Should compute rank movement, rating change, new entrants & leavers"""
+        conn = get_db(':memory:')
+        old_id = save_snapshot(conn, 'all', OLD_BOARD)
+        new_id = save_snapshot(conn, 'all', NEW_BOARD)
+        self.assertEqual(get_delta_rows(*get_delta(conn, old_id, new_id)), [
+            ['USER NAME', 'RANK', 'RANK MOVE', 'RATING', 'RATING CHANGE'],
+            ['b', '1', '+1', '2550', '+150'],
+            ['a', '2', '-1', '2490', '-10'],
+            ['d', '3', 'NEW', '2350', 'NEW'],
+            ['c', '-', 'LEFT', '2300', 'LEFT'],
+        ])
+        conn.close()
+
+    def test_take_snapshot_and_delta(self):
+        """Should fetch every board page into a snapshot & compare the latest two"""
+        boards = [OLD_BOARD, NEW_BOARD]
+
+        def mock_get_ratings_json(csrf_token, filter_by, page, lines):
+            self.assertEqual(filter_by, 'Country=India;')
+            board = boards[0]
+            return {'list': board[page - 1:page], 'availablePages': len(board)}
+
+        self.monkeypatch.setattr(ratings_history, "get_ratings_csrf_token", lambda: 'token')
+        self.monkeypatch.setattr(ratings_history, "get_ratings_json", mock_get_ratings_json)
+
+        self.assertEqual(get_ratings_delta(None, None, [], 'India')[0]['code'], 404)
+        take_snapshot('India', None, None, num_workers=1)
+        boards.pop(0)
+        resps = take_snapshot('India', None, None, num_workers=1)
+        self.assertIn('#2', resps[0]['data'])
+
+        resps = get_ratings_delta(None, None, [], 'India')
+        self.assertEqual(len(resps[0]['data']), 5)
+        self.assertIn(
+            '1 new entrants, 1 left the board, 1 moved up, 1 moved down', resps[0]['extra'])
+        self.assertEqual(get_ratings_delta(None, None, [2, 1])[0]['data'][1][:3], ['a', '1', '+1'])
+        self.assertEqual(get_ratings_delta(None, None, [1, 9])[0]['code'], 404)
+        self.assertEqual(get_ratings_delta(None, None, [1])[0]['code'], 400)
+
+    def test_take_snapshot_page_failed(self):
+        """Should not save a snapshot when any page fails"""
+        def mock_get_ratings_json(csrf_token, filter_by, page, lines):
+            return {'list': OLD_BOARD[:1], 'availablePages': 2} if page == 1 else None
+
+        self.monkeypatch.setattr(ratings_history, "get_ratings_csrf_token", lambda: 'token')
+        self.monkeypatch.setattr(ratings_history, "get_ratings_json", mock_get_ratings_json)
+        self.assertEqual(take_snapshot(None, None, None, num_workers=1)[0]['code'], 503)
+        conn = get_db()
+        self.assertEqual(get_snapshots(conn), [])
+        conn.close()
@@ -0,0 +1,101 @@
+import math
+import shutil
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import cache, solution_stats
+from codechefcli.solution_stats import (build_columns, get_language_rows, get_num_pages,
+                                        get_percentile, get_solutions_stats, get_timeline_rows,
+                                        get_verdict_rows, parse_memory)
+
+cache_dir = '/tmp/codechefcli-cache'
+
+HEADING = ['ID', 'DATE/TIME', 'USER', 'RESULT', 'TIME', 'MEM', 'LANG']
+PAGES = [
+    [
+        HEADING,
+        ['1', '10:00 PM 18/05/20', 'u1', 'accepted (100)', '0.10', '2.0M', 'C++14'],
+        ['2', '11:00 PM 18/05/20', 'u2', 'wrong answer', '0.20', '3M', 'C++14'],
+    ],
+    [
+        HEADING,
+        ['3', '10:00 AM 19/05/20', 'u3', 'accepted', '0.30', '1024K', 'C++14'],
+        ['4', '11:00 AM 19/05/20', 'u4', 'accepted', '1.00', '9.5M', 'PYTH 3'],
+    ],
+]
+
+
+class SolutionStatsTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(cache, "CACHE_DIR", cache_dir)
+        self.columns, self.verdicts, self.languages = build_columns(
+            PAGES[0][1:] + PAGES[1][1:])
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def test_parsers(self):
+        """Should parse page counts, memory units & percentiles"""
+        self.assertEqual(get_num_pages('1 of 25'), 25)
+        self.assertEqual(get_num_pages(None), 1)
+        self.assertEqual(parse_memory('2.5M'), 2560)
+        self.assertEqual(parse_memory('300K'), 300)
+        self.assertTrue(math.isnan(parse_memory('-')))
+        self.assertEqual(get_percentile([1, 2, 3, 4], 50), 2.5)
+        self.assertEqual(get_percentile([1, 2, 3, 4], 100), 4)
+
+    def test_verdict_rows(self):
+        """Should count verdicts with their share"""
+        self.assertEqual(get_verdict_rows(self.columns, self.verdicts), [
+            ['VERDICT', 'COUNT', 'SHARE (%)'], ['AC', '3', '75.0'], ['WA', '1', '25.0']])
+
+    def test_language_rows(self):
+        """Should compute percentiles of accepted runs per language"""
+        data_rows = get_language_rows(self.columns, self.verdicts, self.languages)
+        self.assertEqual(data_rows[1][:3], ['C++14', '2', '0.20'])
+        self.assertEqual(data_rows[1][5:], ['1536.00', '1945.60', '2037.76'])
+        self.assertEqual(data_rows[2], ['PYTH 3', '1'] + ['1.00'] * 3 + ['9728.00'] * 3)
+
+    def test_timeline_rows(self):
+        """Should count submissions per day"""
+        self.assertEqual(get_timeline_rows(self.columns), [
+            ['DATE', 'SUBMISSIONS'], ['2020-05-18', '2'], ['2020-05-19', '2']])
+
+    def test_get_solutions_stats(self):
+        """Should fetch all pages once & serve repeated calls from the cache"""
+        params = []
+
+        def mock_get_solutions_page(problem_code, page_params):
+            params.append(page_params)
+            page = page_params.get('page', 0)
+            return 200, [row[:] for row in PAGES[page]], '1 of 2'
+        self.monkeypatch.setattr(solution_stats, "get_solutions_page", mock_get_solutions_page)
+
+        resps = get_solutions_stats('weicom', num_workers=1)
+        self.assertEqual(params, [{}, {'page': 1}])
+        self.assertEqual(resps[2]['data'][1], ['AC', '3', '75.0'])
+        self.assertEqual(get_solutions_stats('WEICOM'), resps)
+        self.assertEqual(len(params), 2)
+
+    def test_get_solutions_stats_invalid_problem(self):
+        """Should return 404 when the problem code is invalid"""
+        self.monkeypatch.setattr(
+            solution_stats, "get_solutions_page", lambda *args: (404, None, None))
+        self.assertEqual(get_solutions_stats('nope')[0]['code'], 404)
+
+    def test_get_solutions_stats_partial(self):
+        """Should report capped & failed pages and not cache a partial result"""
+        def mock_get_solutions_page(problem_code, page_params):
+            page = page_params.get('page', 0)
+            if page:
+                return 503, None, None
+            return 200, [row[:] for row in PAGES[page]], '1 of 80'
+        self.monkeypatch.setattr(solution_stats, "get_solutions_page", mock_get_solutions_page)
+
+        resps = get_solutions_stats('weicom', num_workers=4)
+        self.assertIn('only the first 50 of 80 pages were read', resps[0]['data'])
+        self.assertIn('49 page(s) could not be fetched: 2, 3,', resps[0]['data'])
+        self.assertIsNone(cache.get_cached(solution_stats.SOLUTIONS_STATS_NAMESPACE, 'WEICOM'))
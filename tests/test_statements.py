@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+from rich.console import Console
+
+from codechefcli import __main__ as entry_point
+from codechefcli import cache, problems, statements
+from codechefcli.statements import (CHANGED, NEW, UNCHANGED, get_changed_statements, get_db,
+                                    record_statement)
+from tests.utils import MockHTMLResponse
+
+cache_dir = '/tmp/codechefcli-cache'
+statements_db_file = '/tmp/codechefcli-statements.db'
+
+
+class StatementsTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(cache, "CACHE_DIR", cache_dir)
+        self.monkeypatch.setattr(statements, "STATEMENTS_DB_PATH", statements_db_file)
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        if os.path.exists(statements_db_file):
+            os.remove(statements_db_file)
+
+    def test_record_statement(self):
+        """Should tell new, unchanged & changed statements apart and list recent changes"""
+        conn = get_db()
+        try:
+            self.assertEqual(record_statement(conn, 'C1', 'P1', {'Name: ': 'A'}, now=100), NEW)
+            self.assertEqual(record_statement(conn, 'C1', 'P2', {'Name: ': 'B'}, now=100), NEW)
+            self.assertEqual(
+                record_statement(conn, 'C1', 'P1', {'Name: ': 'A'}, now=5000), UNCHANGED)
+            self.assertEqual(
+                record_statement(conn, 'C1', 'P2', {'Name: ': 'B2'}, now=5000), CHANGED)
+        finally:
+            conn.close()
+
+        resps = get_changed_statements(None, 'asc', 1000, now=5500)
+        self.assertEqual([row[:3] for row in resps[0]['data']], [
+            ['CONTEST', 'CODE', 'NAME'], ['C1', 'P2', 'B2']])
+        self.assertEqual(len(get_changed_statements(None, 'asc', 6000, now=5500)[0]['data']), 3)
+        self.assertEqual(get_changed_statements(None, 'asc', 100, now=5500)[0]['code'], 404)
+
+    def test_show_problem_unchanged(self):
+        """Should lay a stale problem out again only when its statement changed or on refresh"""
+        problem = {'Name: ': 'Welcome', 'Description: ': '<p>Say hi</p>'}
+        rendered = []
+
+        def mock_render_problem(problem):
+            rendered.append(problem['Description: '])
+            return problem['Description: ']
+
+        self.monkeypatch.setattr(entry_point, "PROBLEMS_CACHE_TTL", -1)
+        self.monkeypatch.setattr(entry_point, "get_description", lambda *args: dict(problem))
+        self.monkeypatch.setattr(entry_point, "render_problem", mock_render_problem)
+
+        entry_point.show_problem('WEICOM', 'PRACTICE')
+        entry_point.show_problem('WEICOM', 'PRACTICE')
+        self.assertEqual(rendered, ['<p>Say hi</p>'])
+
+        entry_point.show_problem('WEICOM', 'PRACTICE', refresh=True)
+        self.assertEqual(rendered, ['<p>Say hi</p>'] * 2)
+
+        problem['Description: '] = '<p>Say hello</p>'
+        entry_point.show_problem('WEICOM', 'PRACTICE')
+        self.assertEqual(rendered, ['<p>Say hi</p>'] * 2 + ['<p>Say hello</p>'])
+
+    def test_show_problem_per_terminal(self):
+        """Should lay the problem out again for another terminal width or color mode"""
+        rendered = []
+        self.monkeypatch.setattr(entry_point, "get_description",
+                                 lambda *args: {'Name: ': 'Welcome', 'Description: ': '<p>Hi</p>'})
+        self.monkeypatch.setattr(entry_point, "render_problem",
+                                 lambda problem: rendered.append(entry_point.c.width) or 'x')
+
+        for width, color_system in [(80, 'standard'), (80, 'standard'), (40, 'standard'),
+                                    (80, None)]:
+            self.monkeypatch.setattr(
+                entry_point, "c", Console(width=width, color_system=color_system))
+            entry_point.show_problem('WEICOM', 'PRACTICE')
+        self.assertEqual(rendered, [80, 40, 80])
+
+    def test_fetched_statements_recorded(self):
+        """Should record the statement hash whenever a problem is fetched"""
+        resp_json = {'status': 'success', 'problem_name': 'Welcome', 'body': '<p>Say hi</p>'}
+        self.monkeypatch.setattr(
+            problems, "request", lambda **kwargs: MockHTMLResponse(json=json.dumps(resp_json)))
+
+        problems.get_problem_json('weicom', 'PRACTICE')
+        resps = get_changed_statements(None, 'asc', 60)
+        self.assertEqual(resps[0]['data'][1][:3], ['PRACTICE', 'WEICOM', 'Welcome'])
@@ -0,0 +1,118 @@
+import json
+import os
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import helpers
+from codechefcli.helpers import BASE_URL, request
+from codechefcli.stats import (REQUEST_STATS, STATS_TABLE_HEADINGS, enable_stats,
+                               get_stats_table, record_request, reset_stats, stats_scope,
+                               write_stats_log)
+
+stats_log_file = '/tmp/codechefcli-stats.jsonl'
+
+
+class MockRaw:
+    def __init__(self, num_bytes):
+        self.num_bytes = num_bytes
+
+    def tell(self):
+        return self.num_bytes
+
+
+class MockResponse:
+    def __init__(self, content, wire_bytes, encoding='gzip'):
+        self._content = content
+        self.raw = MockRaw(wire_bytes)
+        self.status_code = 200
+        self.headers = {'Content-Encoding': encoding}
+
+
+class MockStreamedResponse(MockResponse):
+    def __init__(self, chunks, wire_bytes):
+        super().__init__(None, wire_bytes)
+        self.chunks = chunks
+
+    def iter_content(self, chunk_size=1):
+        yield from self.chunks
+
+    def close(self):
+        pass
+
+
+class MockTransport:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def send(self, session, method, url, **kwargs):
+        return MockStreamedResponse(self.chunks, 7)
+
+
+class StatsTestCase(TestCase):
+    def setUp(self):
+        reset_stats()
+        enable_stats()
+
+    def tearDown(self):
+        reset_stats()
+        if os.path.exists(stats_log_file):
+            os.remove(stats_log_file)
+
+    def test_get_stats_table_empty(self):
+        """Should return empty table when no requests were recorded"""
+        self.assertEqual(get_stats_table(), [])
+
+    def test_get_stats_table(self):
+        """Should aggregate wire & decompressed bytes per endpoint"""
+        record_request('GET', f'{BASE_URL}/status/A?page=1', MockResponse(b'a' * 10, 4), 0.1)
+        record_request('GET', f'{BASE_URL}/status/A?page=2', MockResponse(b'a' * 20, 6), 0.2)
+        record_request('GET', f'{BASE_URL}/users/u', MockResponse(b'a' * 5, 5, 'br'), 0.3)
+
+        self.assertEqual(get_stats_table(), [
+            STATS_TABLE_HEADINGS,
+            ['/status/A', '2', '10', '30', 'gzip', '300.0'],
+            ['/users/u', '1', '5', '5', 'br', '300.0'],
+            ['TOTAL', '3', '15', '35', '', '600.0']
+        ])
+
+    def test_record_request_disabled(self):
+        """Should keep nothing unless stats are enabled or a scope is open"""
+        reset_stats()
+        record_request('GET', f'{BASE_URL}/contests', MockResponse(b'abc', 2), 0.01)
+        self.assertEqual(REQUEST_STATS, [])
+
+        with stats_scope() as stats:
+            record_request('GET', f'{BASE_URL}/contests', MockResponse(b'abc', 2), 0.01)
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(REQUEST_STATS, [])
+
+    def test_write_stats_log(self):
+        """Should append one JSON line per request"""
+        record_request('GET', f'{BASE_URL}/contests', MockResponse(b'abc', 2), 0.01)
+        write_stats_log(stats_log_file, '--contests')
+
+        with open(stats_log_file) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]['command'], '--contests')
+        self.assertEqual(lines[0]['wire_bytes'], 2)
+        self.assertEqual(lines[0]['bytes'], 3)
+
+    def test_record_streamed_request(self):
+        """Should record a streamed request once its body is read or it's closed"""
+        monkeypatch = MonkeyPatch()
+        monkeypatch.setattr(
+            helpers, "TRANSPORT", {'transport': MockTransport([b'<p>ab</p>', b'cd'])})
+        try:
+            resp = request(session=object(), url='/contests', stream=True)
+            self.assertEqual(REQUEST_STATS, [])
+            self.assertEqual(b''.join(resp.iter_content()), b'<p>ab</p>cd')
+            resp.close()
+
+            request(session=object(), url='/users/u', until=['p'])
+        finally:
+            monkeypatch.undo()
+
+        self.assertEqual([(stat['endpoint'], stat['bytes'], stat['wire_bytes'])
+                          for stat in REQUEST_STATS], [('/contests', 11, 7), ('/users/u', 9, 7)])
@@ -0,0 +1,120 @@
+import os
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import tag_index
+from codechefcli.tag_index import (TagIndex, is_tag_expression, load_tag_index, query_tags,
+                                   refresh_tag_index, save_tag_index)
+
+index_path = '/tmp/codechefcli-tag-index.json'
+
+TAGGED_PROBLEMS = {
+    'dp': {
+        'KNAP': {'code': 'KNAP', 'name': 'Knapsack', 'attempted_by': 100, 'solved_by': 50},
+        'LIS': {'code': 'LIS', 'name': 'Longest', 'attempted_by': 10, 'solved_by': 9},
+    },
+    'greedy': {
+        'LIS': {'code': 'LIS', 'name': 'Longest', 'attempted_by': 10, 'solved_by': 9},
+        'COIN': {'code': 'COIN', 'name': 'Coins', 'attempted_by': 4, 'solved_by': 1},
+    },
+    'graphs': {
+        'BFS': {'code': 'BFS', 'name': 'Bfs', 'attempted_by': 0, 'solved_by': 0},
+    },
+}
+
+
+class TagIndexTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(tag_index, "TAG_INDEX_PATH", index_path)
+        self.fetched = []
+
+        def mock_get_tagged_problems_json(tag):
+            self.fetched.append(tag)
+            return TAGGED_PROBLEMS.get(tag, {})
+
+        self.tags = [{'tag': 'dp', 'count': 2}, {'tag': 'greedy', 'count': 2},
+                     {'tag': 'graphs', 'count': 1}]
+        self.monkeypatch.setattr(tag_index, "get_tags_json", lambda: self.tags)
+        self.monkeypatch.setattr(
+            tag_index, "get_tagged_problems_json", mock_get_tagged_problems_json)
+
+        self.index = TagIndex()
+        refresh_tag_index(self.index, num_workers=1)
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        if os.path.exists(index_path):
+            os.remove(index_path)
+
+    def get_codes(self, expression):
+        return sorted(row[0] for row in self.index.get_rows(self.index.evaluate(expression))[1:])
+
+    def test_is_tag_expression(self):
+        """Should only treat tags with operators as expressions"""
+        self.assertTrue(is_tag_expression(['dp & !greedy']))
+        self.assertTrue(is_tag_expression(['dp', '|', 'greedy']))
+        self.assertFalse(is_tag_expression(['dp', 'greedy']))
+
+    def test_evaluate(self):
+        """Should answer AND/OR/NOT expressions with precedence & parentheses"""
+        self.assertEqual(self.get_codes('dp & greedy'), ['LIS'])
+        self.assertEqual(self.get_codes('dp & !greedy'), ['KNAP'])
+        self.assertEqual(self.get_codes('DP | graphs'), ['BFS', 'KNAP', 'LIS'])
+        self.assertEqual(self.get_codes('!dp'), ['BFS', 'COIN'])
+        self.assertEqual(self.get_codes('graphs | dp & greedy'), ['BFS', 'LIS'])
+        self.assertEqual(self.get_codes('!(dp | greedy)'), ['BFS'])
+
+    def test_evaluate_invalid(self):
+        """Should raise ValueError on malformed expressions & unknown tags"""
+        for expression in ['dp &', '(dp | greedy', 'dp greedy)', '& dp', '', 'unknown & dp']:
+            with self.assertRaises(ValueError):
+                self.index.evaluate(expression)
+
+    def test_refresh_incremental(self):
+        """Should only fetch tags that are new or whose count changed, and drop removed tags"""
+        self.fetched = []
+        self.tags = [{'tag': 'dp', 'count': 3}, {'tag': 'greedy', 'count': 2},
+                     {'tag': 'trees', 'count': 0}]
+        refresh_tag_index(self.index, num_workers=1)
+        self.assertEqual(sorted(self.fetched), ['dp', 'trees'])
+        self.assertNotIn('graphs', self.index.tags)
+        self.assertIsNone(self.index.tags['trees']['count'])
+        self.assertEqual(self.get_codes('greedy'), ['COIN', 'LIS'])
+
+    def test_refresh_failed_fetch(self):
+        """Should keep a tag's problems when fetching it fails, and fetch it again next time"""
+        self.tags[0]['count'] = 3
+        self.monkeypatch.setattr(tag_index, "get_tagged_problems_json", lambda tag: None)
+        refresh_tag_index(self.index, num_workers=1)
+        self.assertIsNone(self.index.tags['dp']['count'])
+        self.assertEqual(self.get_codes('dp'), ['KNAP', 'LIS'])
+
+        self.fetched = []
+        self.monkeypatch.setattr(tag_index, "get_tagged_problems_json",
+                                 lambda tag: self.fetched.append(tag) or TAGGED_PROBLEMS[tag])
+        refresh_tag_index(self.index, num_workers=1)
+        self.assertEqual(self.fetched, ['dp'])
+        self.assertEqual(self.index.tags['dp']['count'], 3)
+
+    def test_save_load(self):
+        """Should round-trip the compressed bitsets through the index file"""
+        save_tag_index(self.index)
+        loaded = load_tag_index()
+        self.assertEqual(loaded.problems, self.index.problems)
+        self.assertEqual(loaded.tags, self.index.tags)
+
+    def test_query_tags(self):
+        """Should return matching problems as a table, refreshing a stale index"""
+        resps = query_tags(None, None, 'dp & !greedy', num_workers=1)
+        self.assertEqual(resps[0]['data'], [
+            ['CODE', 'NAME', 'SUBMISSION', 'ACCURACY'], ['KNAP', 'Knapsack', '100', '50']])
+        self.assertTrue(os.path.exists(index_path))
+
+        self.fetched = []
+        self.assertEqual(query_tags(None, None, 'dp & greedy & graphs')[0]['code'], 404)
+        self.assertEqual(query_tags(None, None, 'dp &')[0]['code'], 400)
+        self.assertEqual(query_tags(None, None, 'dp & !dpp')[0],
+                         {'code': 400, 'data': 'Unknown tag: dpp'})
+        self.assertEqual(self.fetched, [])
@@ -1,10 +1,27 @@
+import json
+import os
 from unittest import TestCase
 
 from _pytest.monkeypatch import MonkeyPatch
 
-from codechefcli import teams
+from codechefcli import team_index, teams
+from codechefcli.helpers import NetworkError
 from tests.utils import MockHTMLResponse
 
+teams_db_file = '/tmp/codechefcli-teams.db'
+team_names_file = '/tmp/codechefcli-team-names.txt'
+teams_output_file = '/tmp/codechefcli-teams.jsonl'
+
+TEAM_HTML = "<table></table><table><h1>{name}</h1></table><table> \
+    <tr><td>Team Name:</td><td>{name}</td></tr> \
+    <tr><td>Members:</td><td>u1, {member}</td></tr> \
+    <tr><td>Information for G:</td><td>G</td></tr> \
+    <tr><td>xx</td></tr> \
+</table><table> \
+    <tr><td>Contest</td><td>Problems</td></tr> \
+    <tr><td>C1</td><td>P1, {problem}</td></tr> \
+</table>"
+
 
 class TeamsTestCase(TestCase):
     def setUp(self):
@@ -51,3 +68,80 @@ class TeamsTestCase(TestCase):
             '\nABCD\n\nA: C\nB: D\nE: F\n\nInformation for G: G\n\nProblems Successfully Solved:\n'
         )
         self.assertListEqual(resps[1]["data"], [['T', 'U'], ['t1', 'u1'], ['t2', 'u2']])
+
+    def test_get_team_record(self):
+        """Should extract members & solved problems of the team"""
+        def mock_req_team(*args, **kwargs):
+            return MockHTMLResponse(data=TEAM_HTML.format(name='t1', member='u2', problem='P2'))
+        self.monkeypatch.setattr(teams, "request", mock_req_team)
+
+        team = teams.get_team_record("t1")['data']
+        self.assertEqual(team['members'], ['u1', 'u2'])
+        self.assertEqual(team['problems_solved'], ['P1', 'P2'])
+
+
+class BatchTeamsTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(team_index, "TEAMS_DB_PATH", teams_db_file)
+        with open(team_names_file, 'w') as f:
+            f.write("t1\nt2\nmissing\n")
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        for file_path in [teams_db_file, team_names_file, teams_output_file]:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def test_get_teams_and_query_index(self):
+        """Should fetch teams concurrently and answer membership queries from the index"""
+        def mock_req_team(*args, **kwargs):
+            name = kwargs['url'].split('/')[-1]
+            if name == 'missing':
+                return MockHTMLResponse(status_code=404)
+            problem = 'P2' if name == 't1' else 'P3'
+            return MockHTMLResponse(data=TEAM_HTML.format(name=name, member=name, problem=problem))
+        self.monkeypatch.setattr(teams, "request", mock_req_team)
+
+        resps = teams.get_teams(team_names_file, teams_output_file, num_workers=2)
+        self.assertTrue('3 teams (1 failed)' in resps[0]['data'])
+        with open(teams_output_file) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record['name'] for record in records], ['t1', 't2', 'missing'])
+        self.assertEqual(records[2]['code'], 404)
+
+        self.assertEqual(
+            teams.get_indexed_teams(member='U1')[0]['data'], '\nTeams with member U1:\nt1\nt2')
+        self.assertTrue(teams.get_indexed_teams(problem_code='p3')[0]['data'].endswith(':\nt2'))
+        self.assertEqual(teams.get_indexed_teams(problem_code='P9')[0]['code'], 404)
+
+    def test_get_teams_keeps_failures(self):
+        """Should keep unreadable team pages & network errors as failed records"""
+        with open(team_names_file, 'w') as f:
+            f.write('t1\nbroken\ndown\n')
+
+        def mock_req_team(*args, **kwargs):
+            name = kwargs['url'].split('/')[-1]
+            if name == 'down':
+                raise NetworkError('down')
+            if name == 'broken':
+                return MockHTMLResponse(data='<table></table>')
+            return MockHTMLResponse(data=TEAM_HTML.format(name=name, member=name, problem='P2'))
+        self.monkeypatch.setattr(teams, "request", mock_req_team)
+
+        resps = teams.get_teams(team_names_file, teams_output_file)
+        self.assertTrue('3 teams (2 failed)' in resps[0]['data'])
+        with open(teams_output_file) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[1], {'name': 'broken', 'code': 503,
+                                      'error': 'Could not read the team page.'})
+        self.assertEqual(records[2], {'name': 'down', 'code': 503, 'error': 'down'})
+
+    def test_index_teams_replaces_previous_crawl(self):
+        """Should drop stale memberships when a team is indexed again"""
+        conn = team_index.get_db(':memory:')
+        team_index.index_teams(conn, [{'name': 't1', 'members': ['a'], 'problems_solved': []}])
+        team_index.index_teams(conn, [{'name': 't1', 'members': ['b'], 'problems_solved': []}])
+        self.assertEqual(team_index.get_teams_with_member(conn, 'a'), [])
+        self.assertEqual(team_index.get_teams_with_member(conn, 'b'), ['t1'])
+        conn.close()
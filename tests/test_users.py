@@ -1,12 +1,37 @@
+import json
+import os
+import shutil
 from unittest import TestCase
 
 from _pytest.monkeypatch import MonkeyPatch
 
-from codechefcli import users
+from codechefcli import cache, users
+from codechefcli.helpers import NetworkError
 from codechefcli.users import (HEADER, RATING_NUMBER_CLASS, RATING_RANKS_CLASS, STAR_RATING_CLASS,
-                               USER_DETAILS_CLASS, USER_DETAILS_CONTAINER_CLASS, get_user)
+                               USER_DETAILS_CLASS, USER_DETAILS_CONTAINER_CLASS, get_user,
+                               get_user_record, get_users)
 from tests.utils import MockHTMLResponse
 
+cache_dir = '/tmp/codechefcli-cache'
+usernames_file = '/tmp/codechefcli-usernames.txt'
+users_output_file = '/tmp/codechefcli-users.jsonl'
+
+USER_PROFILE_HTML = f"<div class='{USER_DETAILS_CONTAINER_CLASS[1:]}'> \
+    <{HEADER}>ABCD's Profile</{HEADER}> \
+    <div class='{USER_DETAILS_CLASS[1:]}'> \
+        <li>aa: 1</li> \
+        <li>bb: 2</li> \
+        <li>cc: 3</li> \
+        <li>dd: 4</li> \
+    </div> \
+    <div class='{STAR_RATING_CLASS[1:]}'>3star</div> \
+</div> \
+<div class='{RATING_NUMBER_CLASS[1:]}'>1111</div> \
+<div class='{RATING_RANKS_CLASS[1:]}'> \
+    <li><a>123</a></li> \
+    <li><a>11</a></li> \
+</div>"
+
 
 class UsersTestCase(TestCase):
     def setUp(self):
@@ -50,21 +75,7 @@ class UsersTestCase(TestCase):
     def test_get_user(self):
         """Should return user info"""
         def mock_req_user(*args, **kwargs):
-            return MockHTMLResponse(data=f"<div class='{USER_DETAILS_CONTAINER_CLASS[1:]}'> \
-                <{HEADER}>ABCD's Profile</{HEADER}> \
-                <div class='{USER_DETAILS_CLASS[1:]}'> \
-                    <li>aa: 1</li> \
-                    <li>bb: 2</li> \
-                    <li>cc: 3</li> \
-                    <li>dd: 4</li> \
-                </div> \
-                <div class='{STAR_RATING_CLASS[1:]}'>3star</div> \
-            </div> \
-            <div class='{RATING_NUMBER_CLASS[1:]}'>1111</div> \
-            <div class='{RATING_RANKS_CLASS[1:]}'> \
-                <li><a>123</a></li> \
-                <li><a>11</a></li> \
-            </div>", url="/users/abcd/")
+            return MockHTMLResponse(data=USER_PROFILE_HTML, url="/users/abcd/")
         self.monkeypatch.setattr(users, "request", mock_req_user)
 
         resps = get_user("abcd")
@@ -74,3 +85,78 @@ class UsersTestCase(TestCase):
             "User's Teams: https://www.codechef.com/users/abcd/teams/\n\nRating: 3star 1111\nGlobal"
             " Rank: 123\nCountry Rank: 11\n\nFind more at: https://www.codechef.com/users/abcd/\n"
         )
+
+    def test_get_user_record(self):
+        """Should return structured user info"""
+        def mock_req_user(*args, **kwargs):
+            return MockHTMLResponse(data=USER_PROFILE_HTML, url="/users/abcd/")
+        self.monkeypatch.setattr(users, "request", mock_req_user)
+
+        user = get_user_record("abcd")['data']
+        self.assertEqual(user['details'], {'bb': '2', 'cc': '3'})
+        self.assertEqual(user['star_rating'], '3star')
+        self.assertEqual(user['rating'], '1111')
+        self.assertEqual(user['global_rank'], '123')
+        self.assertEqual(user['country_rank'], '11')
+
+
+class BatchUsersTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(cache, "CACHE_DIR", cache_dir)
+        with open(usernames_file, 'w') as f:
+            f.write("abcd\n\nteam1\nabcd\n")
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        for file_path in [usernames_file, users_output_file]:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    def test_get_users_file_not_found(self):
+        """Should return 400 response when usernames file is missing"""
+        self.assertEqual(get_users("/invalid_path/invalid_path")[0]["code"], 400)
+
+    def test_get_users(self):
+        """Should write one JSON line per unique username and cache successful profiles"""
+        requested = []
+
+        def mock_req_user(*args, **kwargs):
+            requested.append(kwargs['url'])
+            if kwargs['url'] == '/users/team1':
+                return MockHTMLResponse(url="/teams/view/team1")
+            return MockHTMLResponse(data=USER_PROFILE_HTML, url="/users/abcd/")
+        self.monkeypatch.setattr(users, "request", mock_req_user)
+
+        resps = get_users(usernames_file, users_output_file, num_workers=2)
+        self.assertTrue('2 profiles (0 from cache, 1 failed)' in resps[0]['data'])
+        with open(users_output_file) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record['username'] for record in records], ['abcd', 'team1'])
+        self.assertEqual(records[0]['rating'], '1111')
+        self.assertEqual(records[1]['code'], 400)
+
+        resps = get_users(usernames_file, users_output_file, num_workers=2)
+        self.assertTrue('(1 from cache, 1 failed)' in resps[0]['data'])
+        self.assertEqual(sorted(requested), ['/users/abcd', '/users/team1', '/users/team1'])
+
+    def test_get_users_keeps_failures(self):
+        """Should keep unreadable profiles & network errors as failed records"""
+        with open(usernames_file, 'w') as f:
+            f.write('abcd\nbroken\ndown\n')
+
+        def mock_req_user(*args, **kwargs):
+            if kwargs['url'] == '/users/down':
+                raise NetworkError('down')
+            if kwargs['url'] == '/users/broken':
+                return MockHTMLResponse(data='<div>nothing here</div>', url='/users/broken')
+            return MockHTMLResponse(data=USER_PROFILE_HTML.replace('<li>bb: 2</li>', '<li>bb</li>'),
+                                    url='/users/abcd/')
+        self.monkeypatch.setattr(users, "request", mock_req_user)
+
+        records = [json.loads(line) for line in get_users(usernames_file)[0]['data'].split('\n')]
+        self.assertEqual(records[0]['details'], {'cc': '3'})
+        self.assertEqual(records[1], {'username': 'broken', 'code': 503,
+                                      'error': 'Could not read the profile page.'})
+        self.assertEqual(records[2], {'username': 'down', 'code': 503, 'error': 'down'})
@@ -0,0 +1,62 @@
+from unittest import TestCase
+
+from _pytest.monkeypatch import MonkeyPatch
+
+from codechefcli import __main__ as entry_point
+from codechefcli import watch as watch_module
+from codechefcli.watch import CHANGE_HEADING, diff_rows, get_table_rows, parse_interval, watch
+
+
+class WatchTestCase(TestCase):
+    def setUp(self):
+        self.monkeypatch = MonkeyPatch()
+        self.monkeypatch.setattr(watch_module.time, "sleep", lambda *args: None)
+
+    def tearDown(self):
+        self.monkeypatch.undo()
+
+    def test_get_table_rows_no_table(self):
+        """Should return None when there is no successful table response"""
+        self.assertIsNone(get_table_rows([{'code': 503}, {'data': 'text'}]))
+
+    def test_diff_rows(self):
+        """Should return added, changed and removed rows keyed on the key column"""
+        prev_rows = [['CODE', 'ACCURACY'], ['A', '10'], ['B', '20'], ['C', '30']]
+        rows = [['CODE', 'ACCURACY'], ['A', '10'], ['B', '25'], ['D', '40']]
+        self.assertEqual(diff_rows(prev_rows, rows, 'CODE'), [
+            [CHANGE_HEADING, 'CODE', 'ACCURACY'],
+            ['~', 'B', '25'],
+            ['+', 'D', '40'],
+            ['-', 'C', '30']
+        ])
+
+    def test_diff_rows_no_changes(self):
+        """Should return empty list when snapshots are the same"""
+        rows = [['CODE', 'ACCURACY'], ['A', '10']]
+        self.assertEqual(diff_rows(rows, [list(row) for row in rows], 'CODE'), [])
+
+    def test_watch_prints_only_changes(self):
+        """Should print the first snapshot fully and only the changes afterwards"""
+        snapshots = iter([
+            [{'data': [['CODE', 'SOLVED'], ['A', '1'], ['B', '2']], 'data_type': 'table'}],
+            [{'data': [['CODE', 'SOLVED'], ['A', '1'], ['B', '2']], 'data_type': 'table'}],
+            [{'data': [['CODE', 'SOLVED'], ['A', '3'], ['B', '2']], 'data_type': 'table'}],
+        ])
+        printed = []
+        self.monkeypatch.setattr(
+            watch_module, "print_response", lambda **kwargs: printed.append(kwargs['data']))
+
+        watch(lambda: next(snapshots), 'CODE', 0, num_polls=3)
+        self.assertEqual(len(printed), 3)
+        self.assertEqual(printed[0], [['CODE', 'SOLVED'], ['A', '1'], ['B', '2']])
+        self.assertIn('Changes at ', printed[1])
+        self.assertEqual(printed[2], [[CHANGE_HEADING, 'CODE', 'SOLVED'], ['~', 'A', '3']])
+
+    def test_parse_interval(self):
+        """Should only accept a positive number of seconds"""
+        self.assertEqual(parse_interval('30'), 30)
+        for value in ['0', '-5', 'soon']:
+            with self.assertRaises(ValueError):
+                parse_interval(value)
+        with self.assertRaises(SystemExit):
+            entry_point.main(['codechefcli', '--ratings', '--watch', '0'])
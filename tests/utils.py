@@ -9,6 +9,7 @@ from codechefcli.helpers import BASE_URL, COOKIES_FILE_PATH
 class MockHTMLResponse:
     def __init__(self, data='<html />', status_code=200, url='', json=""):
         self.html = HTML(html=data)
+        self.content = data.encode('utf-8')
         self.status_code = status_code
         self.url = f'{BASE_URL}{url}'
         self.text = json
@@ -16,6 +17,28 @@ class MockHTMLResponse:
     def json(self, **kwargs):
         return json.loads(self.text)
 
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class MockStreamResponse:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.num_chunks_read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        for chunk in self.chunks:
+            self.num_chunks_read += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
 
 def fake_login(init_cookies=[]):
     """Fake login by creating cookies file having a fake cookie"""